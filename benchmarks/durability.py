@@ -0,0 +1,65 @@
+"""
+Mede o custo de cada nível de durabilidade do save_all_clients
+
+Uso:
+    python benchmarks/durability.py [--clients 1000 10000] [--repeat 5]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.storage import DURABILITY_LEVELS, JournalClientStore, new_client  # noqa: E402
+
+
+def gerar_dados(n: int):
+    clients = []
+    for i in range(n):
+        client = new_client(f'Cliente {i}')
+        client['valor_total'] = 1000.0 + i
+        client['valores_reais'] = {k: round((i % 97) * 1.5, 2) for k in client['valores_reais']}
+        clients.append(client)
+    return {'clients': clients}
+
+
+def medir(n: int, durability: str, backups: int, repeat: int) -> float:
+    tmp = tempfile.mkdtemp()
+    try:
+        store = JournalClientStore(os.path.join(tmp, 'clients.json'), os.path.join(tmp, 'clients.journal'),
+                                   durability=durability, backup_count=backups)
+        data = gerar_dados(n)
+        store.save_all(data)
+        tempos = []
+        for _ in range(repeat):
+            inicio = time.perf_counter()
+            store.save_all(data)
+            tempos.append(time.perf_counter() - inicio)
+        return min(tempos)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backups', type=int, default=5, help='backups gzip mantidos (0 desativa)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("save_all_clients por nível de durabilidade (melhor de %d)" % args.repeat)
+    print("=" * 60)
+    print(f"{'clientes':>10} {'nível':>12} {'sem backup':>12} {'com backup':>12}")
+    for n in args.clients:
+        for durability in DURABILITY_LEVELS:
+            sem = medir(n, durability, 0, args.repeat)
+            com = medir(n, durability, args.backups, args.repeat)
+            print(f"{n:>10} {durability:>12} {sem * 1000:>10.2f}ms {com * 1000:>10.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Compara os backends de gráficos do PDF (matplotlib PNG vs reportlab vetorial)
+
+Mede o tempo de export_client_to_pdf e o tamanho do arquivo gerado com
+cada backend. O cache de imagens é desativado para medir a renderização.
+
+Uso:
+    python benchmarks/pdf_charts.py [--repeat 10] [--categorias 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.chart_cache import ChartCache, set_chart_cache  # noqa: E402
+from src.utils.pdf_exporter import CHART_BACKENDS, export_client_to_pdf, find_logo_path  # noqa: E402
+
+
+def gerar_cliente(categorias: int):
+    """Cliente com `categorias` categorias (contando o Lucro), todas com percentual positivo"""
+    base = ['Staff', 'Locação', 'CMV', 'Nota']
+    nomes = (base + [f'Categoria {i}' for i in range(max(0, categorias - 1 - len(base)))])[:categorias - 1]
+    perc = round(100.0 / categorias, 2)
+    percentuais = {n: perc for n in nomes}
+    percentuais['Lucro'] = round(100.0 - perc * len(nomes), 2)
+    return {
+        'name': 'Cliente Benchmark',
+        'percentuais': percentuais,
+        'valor_total': 50000.0,
+        'valores_reais': {n: 50000.0 * p / 100 * (0.8 + 0.05 * i) for i, (n, p) in enumerate(percentuais.items())},
+        'historico': [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--categorias', type=int, default=5, help='categorias do cliente, contando o Lucro')
+    args = parser.parse_args()
+    if args.categorias < 2:
+        parser.error('--categorias deve ser pelo menos 2 (contando o Lucro)')
+
+    client = gerar_cliente(args.categorias)
+    with contextlib.redirect_stdout(io.StringIO()):
+        logo_path = find_logo_path()
+    tmp = tempfile.mkdtemp()
+    try:
+        print("=" * 60)
+        print(f"export_client_to_pdf por backend de gráficos (melhor de {args.repeat})")
+        print("=" * 60)
+        print(f"{'backend':>12} {'tempo':>12} {'tamanho':>12}")
+        for backend in CHART_BACKENDS:
+            path = os.path.join(tmp, f'{backend}.pdf')
+            tempos = []
+            for _ in range(args.repeat):
+                # cache vazio: medir a renderização, não o acerto de cache
+                set_chart_cache(ChartCache(max_items=0))
+                inicio = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    export_client_to_pdf(client, path, logo_path=logo_path, chart_backend=backend)
+                tempos.append(time.perf_counter() - inicio)
+            print(f"{backend:>12} {min(tempos) * 1000:>10.1f}ms {os.path.getsize(path) / 1024:>10.1f}KB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
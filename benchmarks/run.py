@@ -0,0 +1,363 @@
+"""
+Suíte de benchmarks dos caminhos mais usados do aplicativo
+
+Roda sem tela (plataforma Qt offscreen, matplotlib Agg) e mede:
+
+- storage: save_all_clients / load_all_clients com 10, 1.000 e 100.000 clientes
+- calculadora: CalculadoraCustos.calcular
+- tabela: ResultsTableComponent.load_data e a edição de um valor real
+  (model.setData -> on_valor_real_alterado, que substituiu o on_cell_changed)
+- gráfico: ChartSectionComponent.atualizar_grafico recriando a figura e só
+  atualizando as barras
+- pdf: export_client_to_pdf (cache de gráficos desativado)
+
+Os dados vêm do gerador sintético (src.utils.synthetic) com semente fixa,
+então duas rodadas medem exatamente o mesmo trabalho. O resultado vai para
+um JSON (--saida); com --comparar o resultado é comparado com uma rodada
+anterior e o script falha se algum benchmark ficar mais lento que o limite
+(mediana).
+
+Uso:
+    python benchmarks/run.py --saida base.json
+    python benchmarks/run.py --saida atual.json --comparar base.json --limite 10
+    python benchmarks/run.py --comparar base.json --atual atual.json   # só compara
+    python benchmarks/run.py --filtro storage --tamanhos 10 1000
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.utils import storage  # noqa: E402
+from src.utils.constants import CORES, PERCENTUAIS  # noqa: E402
+from src.utils.synthetic import iter_clientes  # noqa: E402
+
+FORMATO = 1
+TAMANHOS = [10, 1000, 100000]
+# mais repetições para os casos rápidos, menos para os que levam segundos
+REPETICOES = {'rapido': 200, 'medio': 20, 'lento': 5}
+LIMITE_PADRAO = 10.0  # % de piora da mediana considerada regressão
+
+
+# ----------------------------------------------------------------------
+# Dados
+# ----------------------------------------------------------------------
+def gerar_clientes(n: int, seed: int = 42):
+    return list(iter_clientes(n, seed))
+
+
+# ----------------------------------------------------------------------
+# Medição
+# ----------------------------------------------------------------------
+def medir(func, repeticoes: int, aquecimento: int = 1, preparar=None):
+    """Tempos (ms) de func(); preparar() roda antes de cada chamada, fora da medição"""
+    for _ in range(aquecimento):
+        if preparar is not None:
+            preparar()
+        func()
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def estatisticas(tempos):
+    ordenados = sorted(tempos)
+    return {
+        'repeticoes': len(tempos),
+        'min_ms': ordenados[0],
+        'mediana_ms': statistics.median(ordenados),
+        'media_ms': statistics.mean(ordenados),
+        'p95_ms': ordenados[math.ceil(len(ordenados) * 0.95) - 1],
+        'max_ms': ordenados[-1],
+    }
+
+
+def _repeticoes(categoria: str, escala: float) -> int:
+    return max(1, int(REPETICOES[categoria] * escala))
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+def bench_storage(tamanhos, escala, tmp):
+    resultados = {}
+    for n in tamanhos:
+        data = {'clients': gerar_clientes(n)}
+        pasta = os.path.join(tmp, f'storage_{n}')
+        os.makedirs(pasta)
+        snapshot = os.path.join(pasta, 'clients.json')
+        journal = os.path.join(pasta, 'clients.journal')
+
+        def nova_store():
+            storage.set_store(storage.JournalClientStore(snapshot, journal, backup_count=0))
+
+        categoria = 'lento' if n >= 100000 else 'medio' if n >= 1000 else 'rapido'
+        nova_store()
+        resultados[f'storage.save_all_clients[{n}]'] = medir(
+            lambda: storage.save_all_clients(data), _repeticoes(categoria, escala))
+        # store nova a cada chamada: medir a leitura do disco, não o estado em memória
+        resultados[f'storage.load_all_clients[{n}]'] = medir(
+            storage.load_all_clients, _repeticoes(categoria, escala), preparar=nova_store)
+    storage.set_store(None)
+    return resultados
+
+
+def bench_calculadora(escala):
+    from src.utils.calculator import CalculadoraCustos
+
+    calc = CalculadoraCustos(PERCENTUAIS)
+    rng = random.Random(7)
+    valores = [round(rng.uniform(1000, 200000), 2) for _ in range(1000)]
+
+    def calcular():
+        for valor in valores:
+            calc.calcular(valor)
+
+    # 1000 chamadas por medição: o tempo de uma só fica no ruído do relógio
+    return {'calculadora.calcular[x1000]': medir(calcular, _repeticoes('medio', escala))}
+
+
+def _app():
+    from PySide6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+def bench_tabela(escala):
+    from src.components.results_table import ResultsTableComponent, ResultsTableModel
+
+    app = _app()
+    clients = gerar_clientes(50)
+    tabela = ResultsTableComponent(PERCENTUAIS)
+    tabela.resize(900, 300)
+    tabela.show()
+    app.processEvents()
+
+    posicao = iter(range(10 ** 9))
+
+    def carregar():
+        client = clients[next(posicao) % len(clients)]
+        tabela.load_data(client['percentuais'], client['valor_total'], client['valores_reais'])
+        app.processEvents()
+
+    resultados = {'tabela.load_data': medir(carregar, _repeticoes('rapido', escala))}
+
+    model = tabela.model
+    indice = model.index(2, ResultsTableModel.COL_VALOR_REAL)
+    valores = iter(range(10 ** 9))
+
+    def editar():
+        # valor sempre diferente, senão setData não faz nada
+        model.setData(indice, 1000.0 + next(valores))
+        app.processEvents()
+
+    resultados['tabela.editar_valor_real'] = medir(editar, _repeticoes('rapido', escala))
+    tabela.close()
+    return resultados
+
+
+def bench_grafico(escala):
+    from src.components.chart_section import ChartSectionComponent
+
+    app = _app()
+    grafico = ChartSectionComponent(CORES)
+    grafico.resize(900, 500)
+    grafico.show()
+    app.processEvents()
+    grafico._init_canvas()
+    app.processEvents()
+
+    client = gerar_clientes(1)[0]
+    esperados = {c: client['valor_total'] * p / 100 for c, p in client['percentuais'].items()}
+    outras = {f'{c} ': v for c, v in esperados.items()}
+    contador = iter(range(10 ** 9))
+
+    def recriar():
+        # categorias alternadas: a figura é recriada a cada chamada
+        i = next(contador)
+        esp = esperados if i % 2 else outras
+        grafico.atualizar_grafico({'valores_esperados': esp, 'valores_reais': esp})
+        app.processEvents()
+
+    resultados = {'grafico.recriar': medir(recriar, _repeticoes('medio', escala))}
+
+    grafico.atualizar_grafico({'valores_esperados': esperados, 'valores_reais': client['valores_reais']})
+    app.processEvents()
+
+    def atualizar():
+        # só um valor real muda (edição na tabela): barras atualizadas sem recriar a figura
+        reais = dict(client['valores_reais'])
+        categoria = next(iter(reais))
+        reais[categoria] = reais[categoria] * (1 + (next(contador) % 5) / 100)
+        grafico.atualizar_grafico({'valores_esperados': esperados, 'valores_reais': reais})
+        app.processEvents()
+
+    resultados['grafico.atualizar'] = medir(atualizar, _repeticoes('medio', escala))
+    grafico.close()
+    return resultados
+
+
+def bench_pdf(escala, tmp):
+    from src.utils.chart_cache import ChartCache, set_chart_cache
+    from src.utils.pdf_exporter import export_client_to_pdf, find_logo_path
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        logo_path = find_logo_path()
+    client = gerar_clientes(1)[0]
+    path = os.path.join(tmp, 'relatorio.pdf')
+    # cache vazio: medir a renderização dos gráficos, não o acerto de cache
+    set_chart_cache(ChartCache(max_items=0))
+
+    def exportar():
+        # o cabeçalho imprime uma linha por página ao desenhar a logo
+        with contextlib.redirect_stdout(io.StringIO()):
+            export_client_to_pdf(client, path, logo_path)
+
+    return {'pdf.export_client_to_pdf': medir(exportar, _repeticoes('lento', escala))}
+
+
+GRUPOS = ['storage', 'calculadora', 'tabela', 'grafico', 'pdf']
+
+
+def executar(grupos, tamanhos, escala):
+    tmp = tempfile.mkdtemp()
+    brutos = {}
+    try:
+        for grupo in grupos:
+            print(f'[{grupo}]', file=sys.stderr)
+            if grupo == 'storage':
+                brutos.update(bench_storage(tamanhos, escala, tmp))
+            elif grupo == 'calculadora':
+                brutos.update(bench_calculadora(escala))
+            elif grupo == 'tabela':
+                brutos.update(bench_tabela(escala))
+            elif grupo == 'grafico':
+                brutos.update(bench_grafico(escala))
+            elif grupo == 'pdf':
+                brutos.update(bench_pdf(escala, tmp))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {nome: estatisticas(tempos) for nome, tempos in brutos.items()}
+
+
+# ----------------------------------------------------------------------
+# Resultado e comparação
+# ----------------------------------------------------------------------
+def _commit():
+    try:
+        proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        return proc.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ambiente():
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def comparar(base, atual, limite: float):
+    """Lista (nome, mediana base, mediana atual, variação %, regressão?) dos benchmarks em comum"""
+    linhas = []
+    for nome, res in atual['resultados'].items():
+        anterior = base['resultados'].get(nome)
+        if anterior is None:
+            continue
+        antes, depois = anterior['mediana_ms'], res['mediana_ms']
+        variacao = (depois - antes) / antes * 100 if antes > 0 else 0.0
+        linhas.append((nome, antes, depois, variacao, variacao > limite))
+    return linhas
+
+
+def imprimir_resultados(resultados):
+    print("=" * 78)
+    print(f"{'benchmark':<38} {'mediana':>10} {'p95':>10} {'mín':>10} {'n':>6}")
+    print("=" * 78)
+    for nome, res in resultados.items():
+        print(f"{nome:<38} {res['mediana_ms']:>8.3f}ms {res['p95_ms']:>8.3f}ms {res['min_ms']:>8.3f}ms "
+              f"{res['repeticoes']:>6}")
+
+
+def imprimir_comparacao(linhas, limite: float) -> bool:
+    print()
+    print("=" * 78)
+    print(f"Comparação das medianas (regressão acima de +{limite:g}%)")
+    print("=" * 78)
+    for nome, antes, depois, variacao, regrediu in linhas:
+        marca = '  REGRESSÃO' if regrediu else ''
+        print(f"{nome:<38} {antes:>9.3f}ms -> {depois:>9.3f}ms {variacao:>+8.1f}%{marca}")
+    regressoes = [l for l in linhas if l[4]]
+    if regressoes:
+        print(f"\n{len(regressoes)} regressão(ões) acima de {limite:g}%")
+    return bool(regressoes)
+
+
+def _ler(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--saida', help='arquivo JSON com os resultados')
+    parser.add_argument('--comparar', metavar='BASE', help='JSON de uma rodada anterior para comparar')
+    parser.add_argument('--atual', help='com --comparar: JSON já gravado, em vez de rodar os benchmarks')
+    parser.add_argument('--limite', type=float, default=LIMITE_PADRAO,
+                        help='piora máxima da mediana, em %% (padrão: %(default)s)')
+    parser.add_argument('--filtro', nargs='+', choices=GRUPOS, default=GRUPOS, help='grupos a rodar')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS, help='clientes nos testes de storage')
+    parser.add_argument('--escala', type=float, default=1.0, help='multiplica o número de repetições')
+    args = parser.parse_args()
+
+    if args.atual:
+        if not args.comparar:
+            parser.error('--atual precisa de --comparar')
+        atual = _ler(args.atual)
+    else:
+        atual = {
+            'formato': FORMATO,
+            'ambiente': ambiente(),
+            'parametros': {'grupos': args.filtro, 'tamanhos': args.tamanhos, 'escala': args.escala},
+            'resultados': executar(args.filtro, args.tamanhos, args.escala),
+        }
+        imprimir_resultados(atual['resultados'])
+        if args.saida:
+            with open(args.saida, 'w', encoding='utf-8') as f:
+                json.dump(atual, f, ensure_ascii=False, indent=2)
+            print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        if imprimir_comparacao(comparar(_ler(args.comparar), atual, args.limite), args.limite):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Tempo por tecla da busca de clientes da sidebar
+
+Gera N clientes sintéticos (nomes em português, com acentos), monta o
+ClientSearchIndex e simula a digitação de algumas buscas letra por letra,
+medindo cada tecla: só o índice e, com PySide6 disponível, a sidebar inteira
+(filtro do modelo + repintura da lista, plataforma Qt offscreen).
+Com --max-ms o script falha se alguma tecla passar do limite.
+
+Uso:
+    python benchmarks/sidebar_search.py [--clientes 50000] [--max-ms 16] [--sem-qt]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.search_index import ClientSearchIndex  # noqa: E402
+from src.utils.storage import new_client  # noqa: E402
+
+NOMES = ['João', 'José', 'Maria', 'Ana', 'Antônio', 'Francisca', 'Márcia', 'Luís', 'Conceição', 'Sebastião',
+         'Letícia', 'Cecília', 'Júlia', 'Vinícius', 'Fábio', 'Inês', 'Simão', 'Lúcia', 'Caio', 'Helena']
+SOBRENOMES = ['Silva', 'Souza', 'Conceição', 'Gonçalves', 'Araújo', 'Magalhães', 'Assunção', 'Simões',
+              'Brandão', 'Loureiro', 'Falcão', 'Guimarães', 'Peçanha', 'Sá', 'Monteiro', 'Damião']
+EVENTOS = ['Casamento', 'Aniversário', 'Formatura', 'Batizado', 'Confraternização', 'Bodas', 'Chá de Bebê']
+
+# buscas digitadas letra por letra
+BUSCAS = ['joao silva', 'casamento', 'conceicao', 'ana ara', 'MAGALHÃES', 'formatura simoes', 'zzz']
+
+
+def gerar_clientes(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [new_client(f"{rng.choice(EVENTOS)} {rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {i}")
+            for i in range(n)]
+
+
+class _Repositorio:
+    """Somente leitura, o suficiente para o modelo da sidebar"""
+
+    def __init__(self, clients):
+        self._clients = clients
+
+    def count(self):
+        return len(self._clients)
+
+    def all(self):
+        return self._clients
+
+    def get(self, index):
+        return self._clients[index]
+
+
+def digitar(buscar):
+    """Chama buscar(prefixo) a cada tecla e retorna os tempos em ms"""
+    tempos = []
+    for busca in BUSCAS:
+        for i in range(1, len(busca) + 1):
+            inicio = time.perf_counter()
+            buscar(busca[:i])
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        # apagar a busca (como o botão de limpar)
+        buscar('')
+    return tempos
+
+
+def resumo(nome, tempos):
+    ordenados = sorted(tempos)
+    p95 = ordenados[int(len(ordenados) * 0.95) - 1]
+    print(f"{nome:<22} média {statistics.mean(tempos):6.2f}ms  p95 {p95:6.2f}ms  máx {max(tempos):6.2f}ms")
+    return max(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clientes', type=int, default=50000)
+    parser.add_argument('--max-ms', type=float, default=None, help='falha se alguma tecla demorar mais que isso')
+    parser.add_argument('--sem-qt', action='store_true', help='medir só o índice, sem a sidebar')
+    args = parser.parse_args()
+
+    clients = gerar_clientes(args.clientes)
+
+    print("=" * 60)
+    print(f"Busca na sidebar com {args.clientes} clientes ({sum(len(b) for b in BUSCAS)} teclas)")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    index = ClientSearchIndex(clients)
+    print(f"montar o índice: {(time.perf_counter() - inicio) * 1000:.1f}ms")
+
+    piores = [resumo('índice', digitar(index.search))]
+
+    if not args.sem_qt:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PySide6.QtWidgets import QApplication
+        from src.components.clients_sidebar import ClientsSidebar
+
+        app = QApplication.instance() or QApplication(sys.argv)
+        sidebar = ClientsSidebar(_Repositorio(clients))
+        sidebar.resize(200, 800)
+        sidebar.show()
+        app.processEvents()
+
+        def buscar_na_sidebar(texto):
+            sidebar.search.setText(texto)
+            # repintura agendada pelo filtro
+            app.processEvents()
+
+        piores.append(resumo('sidebar (com pintura)', digitar(buscar_na_sidebar)))
+        sidebar.close()
+
+    if args.max_ms is not None and max(piores) > args.max_ms:
+        print(f"\nREGRESSÃO: {max(piores):.2f}ms > {args.max_ms:.2f}ms por tecla")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Relatório de tempo de inicialização
+
+Roda `python -X importtime` importando a janela principal e mostra os módulos
+mais caros, e mede em um processo limpo o tempo até a janela ser exibida
+(plataforma Qt offscreen). Com --max-ms o script falha se o tempo até a
+janela passar do limite, para acompanhar regressões.
+
+Uso:
+    python benchmarks/startup_time.py [--top 15] [--max-ms 1500] [--json]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Mede do início do processo até o primeiro show() da janela
+_JANELA = r"""
+import time
+inicio = time.perf_counter()
+import sys
+from PySide6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from src import MainWindow
+window = MainWindow()
+window.show()
+fim = time.perf_counter()
+print((fim - inicio) * 1000)
+print(int('matplotlib' in sys.modules), int('reportlab' in sys.modules))
+app.processEvents()
+window.close()
+"""
+
+_LINHA_IMPORTTIME = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def medir_imports(modulo: str = 'src.main_window'):
+    """Retorna [(cumulativo_us, próprio_us, módulo)] de um import em processo limpo"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                          cwd=ROOT, env=_env(), capture_output=True, text=True, check=True)
+    linhas = []
+    for linha in proc.stderr.splitlines():
+        m = _LINHA_IMPORTTIME.match(linha)
+        if m:
+            linhas.append((int(m.group(2)), int(m.group(1)), m.group(4)))
+    return linhas
+
+
+def medir_janela():
+    proc = subprocess.run([sys.executable, '-c', _JANELA], cwd=ROOT, env=_env(),
+                          capture_output=True, text=True, check=True)
+    saida = proc.stdout.strip().splitlines()
+    mpl, rl = saida[1].split()
+    return float(saida[0]), bool(int(mpl)), bool(int(rl))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--top', type=int, default=15, help='quantidade de módulos mais caros listados')
+    parser.add_argument('--max-ms', type=float, default=None, help='falha se a janela demorar mais que isso')
+    parser.add_argument('--json', action='store_true', help='saída em JSON')
+    args = parser.parse_args()
+
+    imports = medir_imports()
+    # apenas pacotes de primeiro nível (o cumulativo já inclui os submódulos)
+    topo = sorted((l for l in imports if '.' not in l[2]), reverse=True)[:args.top]
+    total_import_ms = sum(l[1] for l in imports) / 1000
+    janela_ms, carregou_mpl, carregou_rl = medir_janela()
+
+    if args.json:
+        print(json.dumps({
+            'import_ms': total_import_ms,
+            'janela_ms': janela_ms,
+            'matplotlib_no_startup': carregou_mpl,
+            'reportlab_no_startup': carregou_rl,
+            'top_imports': [{'modulo': m, 'cumulativo_ms': c / 1000} for c, _, m in topo],
+        }, indent=2))
+    else:
+        print("=" * 60)
+        print("Tempo de inicialização")
+        print("=" * 60)
+        print(f"import src.main_window: {total_import_ms:.1f}ms")
+        print(f"até exibir a janela:    {janela_ms:.1f}ms")
+        print(f"matplotlib carregado antes da janela: {'sim' if carregou_mpl else 'não'}")
+        print(f"reportlab carregado antes da janela:  {'sim' if carregou_rl else 'não'}")
+        print(f"\nMódulos mais caros (cumulativo):")
+        for cumulativo, _, modulo in topo:
+            print(f"  {cumulativo / 1000:>8.1f}ms  {modulo}")
+
+    if args.max_ms is not None and janela_ms > args.max_ms:
+        print(f"\nREGRESSÃO: {janela_ms:.1f}ms > {args.max_ms:.1f}ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
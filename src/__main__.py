@@ -0,0 +1,9 @@
+"""python -m src: linha de comando sem interface gráfica (ver src.cli)"""
+import multiprocessing
+import sys
+
+from src.cli import main
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
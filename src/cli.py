@@ -0,0 +1,241 @@
+"""
+Linha de comando da calculadora (sem interface gráfica, não carrega o PySide6)
+
+Uso:
+    python -m src calcular 15000
+    python -m src calcular 15000 --percentuais tabela.json --json
+    python -m src clientes
+    python -m src cliente 3 [--resumo]
+    python -m src criar "Casamento Ana" --valor-total 25000
+    python -m src atualizar 3 --valor-total 30000 --real CMV=8200 --real Staff=3100
+    python -m src excluir 3
+    python -m src exportar 3 --saida relatorio.pdf
+    python -m src historico 3 [--em 2025-06-30] [--resumo mes]
+    python -m src servir --porta 8765 --workers 8
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from src.service import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_WORKERS, CalculadoraService
+
+
+def _formatar(valor: float) -> str:
+    return f"R$ {valor:_.2f}".replace('.', ',').replace('_', '.')
+
+
+def _imprimir_json(dados: Any):
+    print(json.dumps(dados, ensure_ascii=False, indent=2))
+
+
+def _pares(itens: List[str]) -> Dict[str, float]:
+    """['CMV=8200', ...] -> {'CMV': 8200.0, ...}"""
+    pares = {}
+    for item in itens:
+        categoria, sep, valor = item.partition('=')
+        if not sep:
+            raise ValueError(f"Use CATEGORIA=VALOR, não {item!r}")
+        pares[categoria] = float(valor.replace(',', '.'))
+    return pares
+
+
+def _carregar_percentuais(path: Optional[str]) -> Optional[Dict[str, float]]:
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _cmd_calcular(service: CalculadoraService, args) -> int:
+    resultado = service.calcular(args.valor_total, _carregar_percentuais(args.percentuais))
+    if args.json:
+        _imprimir_json(resultado)
+        return 0
+    print(f"Valor total: {_formatar(resultado['valor_total'])}")
+    for categoria, valor in resultado['valores'].items():
+        print(f"  {categoria:<12} {resultado['percentuais'][categoria]:>6.2f}%  {_formatar(valor):>18}")
+    return 0
+
+
+def _cmd_clientes(service: CalculadoraService, args) -> int:
+    clientes = service.listar()
+    if args.json:
+        _imprimir_json(clientes)
+        return 0
+    for cliente in clientes:
+        print(f"[{cliente['posicao']}] {cliente['name']} - {_formatar(cliente['valor_total'])}")
+    print(f'{len(clientes)} clientes')
+    return 0
+
+
+def _cmd_cliente(service: CalculadoraService, args) -> int:
+    if not args.resumo:
+        _imprimir_json(service.obter(args.posicao))
+        return 0
+    resumo = service.resumo(args.posicao)
+    if args.json:
+        _imprimir_json(resumo)
+        return 0
+    print(f"{resumo['name']} - valor total {_formatar(resumo['valor_total'])}")
+    for linha in resumo['categorias']:
+        print(f"  {linha['categoria']:<12} esperado {_formatar(linha['esperado']):>16}  "
+              f"real {_formatar(linha['real']):>16}  diferença {_formatar(linha['diferenca']):>16}")
+    print(f"  Lucro esperado {_formatar(resumo['lucro_esperado'])}, real {_formatar(resumo['lucro_real'])}")
+    return 0
+
+
+def _campos(args) -> Dict[str, Any]:
+    campos: Dict[str, Any] = json.loads(args.dados) if args.dados else {}
+    if args.nome is not None:
+        campos['name'] = args.nome
+    if args.valor_total is not None:
+        campos['valor_total'] = args.valor_total
+    if args.percentual:
+        campos['percentuais'] = _pares(args.percentual)
+    if args.real:
+        campos['valores_reais'] = _pares(args.real)
+    return campos
+
+
+def _cmd_criar(service: CalculadoraService, args) -> int:
+    args.nome = args.nome if args.nome is not None else args.nome_posicional
+    posicao, _ = service.criar(_campos(args))
+    print(f'Cliente criado na posição {posicao}')
+    return 0
+
+
+def _cmd_atualizar(service: CalculadoraService, args) -> int:
+    client = service.atualizar(args.posicao, _campos(args))
+    print(f"Cliente {args.posicao} ({client.get('name', '')}) atualizado")
+    return 0
+
+
+def _cmd_excluir(service: CalculadoraService, args) -> int:
+    service.excluir(args.posicao)
+    print(f'Cliente {args.posicao} excluído')
+    return 0
+
+
+def _cmd_exportar(service: CalculadoraService, args) -> int:
+    print(f'PDF gravado em {service.exportar_pdf(args.posicao, args.saida)}')
+    return 0
+
+
+def _cmd_historico(service: CalculadoraService, args) -> int:
+    from datetime import datetime
+
+    from src.utils.history import get_history
+
+    client = service.obter(args.posicao)
+    history = get_history()
+    if args.em:
+        ts = datetime.fromisoformat(args.em).timestamp()
+        if len(args.em) == 10:
+            ts += 86400 - 0.001  # data sem hora: estado no fim do dia
+        dados: Any = history.state_at(client, ts)
+        if dados is None:
+            print('Sem histórico para essa data', file=sys.stderr)
+            return 1
+    elif args.resumo:
+        dados = history.rollups(client, args.resumo)
+    else:
+        dados = history.events(client)
+        if not args.json:
+            for evento in dados:
+                data = datetime.fromtimestamp(evento['ts']).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"{data}  {evento['tipo']:<8} {json.dumps(evento['delta'], ensure_ascii=False)}")
+            print(f'{len(dados)} eventos')
+            return 0
+    _imprimir_json(dados)
+    return 0
+
+
+def _cmd_servir(service: CalculadoraService, args) -> int:
+    from src.service import serve
+
+    serve(args.host, args.porta, args.workers, service, args.silencioso)
+    return 0
+
+
+def _argumentos_cliente(parser: argparse.ArgumentParser):
+    parser.add_argument('--nome')
+    parser.add_argument('--valor-total', type=float)
+    parser.add_argument('--percentual', action='append', default=[], metavar='CATEGORIA=PERCENTUAL',
+                        help='pode ser repetido; a tabela completa precisa somar 100%%')
+    parser.add_argument('--real', action='append', default=[], metavar='CATEGORIA=VALOR',
+                        help='valor real de uma categoria (pode ser repetido)')
+    parser.add_argument('--dados', help='campos em JSON (name, valor_total, percentuais, valores_reais)')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m src', description='Calculadora de Eventos sem interface gráfica')
+    parser.add_argument('--graficos', choices=['matplotlib', 'reportlab'], default=None,
+                        help='backend dos gráficos do PDF')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('calcular', help='distribui um valor total entre as categorias')
+    p.add_argument('valor_total', type=float)
+    p.add_argument('--percentuais', help='arquivo JSON com a tabela de percentuais (padrão: a do aplicativo)')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=_cmd_calcular)
+
+    p = sub.add_parser('clientes', help='lista os clientes')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=_cmd_clientes)
+
+    p = sub.add_parser('cliente', help='mostra um cliente (JSON) ou seu resumo')
+    p.add_argument('posicao', type=int)
+    p.add_argument('--resumo', action='store_true', help='esperado x real por categoria')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=_cmd_cliente)
+
+    p = sub.add_parser('criar', help='cria um cliente com a tabela padrão')
+    p.add_argument('nome_posicional', nargs='?', metavar='nome')
+    _argumentos_cliente(p)
+    p.set_defaults(func=_cmd_criar)
+
+    p = sub.add_parser('atualizar', help='altera campos de um cliente')
+    p.add_argument('posicao', type=int)
+    _argumentos_cliente(p)
+    p.set_defaults(func=_cmd_atualizar)
+
+    p = sub.add_parser('excluir', help='exclui um cliente')
+    p.add_argument('posicao', type=int)
+    p.set_defaults(func=_cmd_excluir)
+
+    p = sub.add_parser('exportar', help='gera o relatório PDF de um cliente')
+    p.add_argument('posicao', type=int)
+    p.add_argument('--saida', required=True, help='arquivo PDF de saída')
+    p.set_defaults(func=_cmd_exportar)
+
+    p = sub.add_parser('historico', help='eventos, estado em uma data ou resumos de um cliente')
+    p.add_argument('posicao', type=int)
+    p.add_argument('--em', metavar='DATA', help='estado do cliente nessa data (AAAA-MM-DD[THH:MM])')
+    p.add_argument('--resumo', choices=['dia', 'mes'], help='resumos diários ou mensais')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=_cmd_historico)
+
+    p = sub.add_parser('servir', help='sobe o serviço HTTP/JSON local')
+    p.add_argument('--host', default=DEFAULT_HOST)
+    p.add_argument('--porta', type=int, default=DEFAULT_PORT)
+    p.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='threads atendendo requisições')
+    p.add_argument('--pdf-workers', type=int, default=None, help='processos renderizando PDFs (padrão: nº de CPUs)')
+    p.add_argument('--silencioso', action='store_true', help='não registra cada requisição')
+    p.set_defaults(func=_cmd_servir)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    service = CalculadoraService(chart_backend=args.graficos, pdf_workers=getattr(args, 'pdf_workers', None))
+    try:
+        return args.func(service, args)
+    except IndexError:
+        print('Cliente não encontrado', file=sys.stderr)
+        return 1
+    except (ValueError, OSError) as e:
+        print(f'Erro: {e}', file=sys.stderr)
+        return 1
+    finally:
+        service.close()
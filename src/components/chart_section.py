@@ -1,13 +1,34 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QGroupBox
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas # type: ignore
-from matplotlib.figure import Figure
-from typing import Dict, List, Any
+from PySide6.QtCore import QTimer
+from typing import Dict, List, Any, Optional
+import math
 
+from src.utils.tracing import span, traced
+
+
+class ChartSectionComponent(QWidget):
+    """Gráfico esperado vs real.
+
+    O matplotlib só é importado depois que a janela aparece (ver showEvent);
+    até lá um espaço vazio ocupa o lugar do canvas e o último payload recebido
+    fica guardado para ser desenhado quando o canvas existir.
+    """
 
-class ChartSectionComponent(QWidget):    
     def __init__(self, cores: List[str], parent=None):
         super().__init__(parent)
         self.cores = cores
+        self.figure = None
+        self.canvas = None
+        self._pending_payload: Optional[Dict[str, Any]] = None
+        # artistas do último gráfico desenhado, reaproveitados enquanto as categorias não mudam
+        self._labels = None
+        self._ax = None
+        self._barras_esp = []
+        self._barras_real = []
+        self._textos_esp = []
+        self._textos_real = []
+        self._animados = []
+        self._background = None
         self.setup_ui()
     
     def setup_ui(self):
@@ -33,25 +54,55 @@ class ChartSectionComponent(QWidget):
             }
         """)
         
-        group_layout = QVBoxLayout()
-        group_layout.setContentsMargins(5, 5, 5, 5)
+        self.group_layout = QVBoxLayout()
+        self.group_layout.setContentsMargins(5, 5, 5, 5)
+        
+        # Espaço reservado até o canvas do matplotlib ser criado
+        self._placeholder = QWidget()
+        self._placeholder.setMinimumHeight(400)
+        self.group_layout.addWidget(self._placeholder)
+        
+        group.setLayout(self.group_layout)
+        layout.addWidget(group)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.canvas is None:
+            # deixar a janela pintar antes de carregar o matplotlib
+            QTimer.singleShot(0, self._init_canvas)
+    
+    def _init_canvas(self):
+        if self.canvas is not None:
+            return
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas  # type: ignore
+        from matplotlib.figure import Figure
         
         self.figure = Figure(figsize=(7, 5), facecolor='white')
         self.canvas = FigureCanvas(self.figure)
         self.canvas.setMinimumHeight(400)
-        group_layout.addWidget(self.canvas)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.group_layout.replaceWidget(self._placeholder, self.canvas)
+        self._placeholder.deleteLater()
         
-        group.setLayout(group_layout)
-        layout.addWidget(group)
-        
-        self._criar_grafico_vazio()
+        payload, self._pending_payload = self._pending_payload, None
+        if payload is not None:
+            self.atualizar_grafico(payload)
+        else:
+            self._criar_grafico_vazio()
     
+    @traced()
     def atualizar_grafico(self, payload: Dict[str, Any]):
         """Desenha um gráfico de barras horizontais empilhadas comparando valores esperados vs reais.
         Espera um payload com chaves: 'valores_reais' e 'valores_esperados'.
+
+        Se as categorias não mudaram desde o último desenho, apenas as larguras
+        das barras e os textos são atualizados (sem recriar a figura). Quando só
+        os valores reais mudaram (edição na tabela), as barras reais são
+        redesenhadas por blitting sobre o fundo guardado.
         """
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
+        if self.canvas is None:
+            self._pending_payload = payload
+            return
 
         valores_reais = payload.get('valores_reais', {})
         valores_esperados = payload.get('valores_esperados', {})
@@ -68,9 +119,6 @@ class ChartSectionComponent(QWidget):
             self._criar_grafico_vazio()
             return
 
-        # Gráfico de barras horizontais empilhadas (melhor visualização)
-        y_pos = range(len(labels))
-        
         # Calcular percentuais para melhor visualização
         total_esp = sum(esperados) if sum(esperados) > 0 else 1
         total_real = sum(reais) if sum(reais) > 0 else 1
@@ -78,6 +126,31 @@ class ChartSectionComponent(QWidget):
         perc_esp = [(e / total_esp) * 100 for e in esperados]
         perc_real = [(r / total_real) * 100 for r in reais]
 
+        if self._labels == tuple(labels):
+            esperados_mudaram = self._atualizar_barras(self._barras_esp, self._textos_esp, perc_esp)
+            self._atualizar_barras(self._barras_real, self._textos_real, perc_real)
+            escala_mudou = self._ajustar_limite(perc_esp + perc_real)
+            if esperados_mudaram or escala_mudou or self._background is None:
+                # eixos/grade ou barras do fundo mudaram: desenho completo
+                self.canvas.draw_idle()
+            else:
+                self._blit()
+        else:
+            self._criar_grafico(labels, perc_esp, perc_real)
+
+    @staticmethod
+    def _fmt_perc(v: float) -> str:
+        # só mostrar se >= 2%
+        return f"{v:.1f}%" if v > 2 else ""
+
+    def _criar_grafico(self, labels: List[str], perc_esp: List[float], perc_real: List[float]):
+        """Recria a figura e guarda as barras/textos para as próximas atualizações"""
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+
+        # Gráfico de barras horizontais empilhadas (melhor visualização)
+        y_pos = range(len(labels))
+
         # Barras horizontais
         bar_height = 0.35
         
@@ -97,27 +170,74 @@ class ChartSectionComponent(QWidget):
         ax.legend(loc='lower right')
         ax.grid(axis='x', alpha=0.3, linestyle='--')
 
-        # função auxiliar para formatar percentual
-        def fmt_perc(v: float) -> str:
-            return f"{v:.1f}%" if v > 0 else ""
+        # um texto por barra (vazio quando a barra é pequena demais)
+        def criar_textos(barras):
+            return [ax.text(bar.get_width()/2, bar.get_y() + bar.get_height()/2, self._fmt_perc(bar.get_width()),
+                            ha='center', va='center', fontsize=9, color='white', fontweight='bold')
+                    for bar in barras]
 
-        # adicionar labels nas barras
-        for bar in barras_esp:
-            w = bar.get_width()
-            if w > 2:  # só mostrar se >= 2%
-                ax.text(w/2, bar.get_y() + bar.get_height()/2, fmt_perc(w),
-                       ha='center', va='center', fontsize=9, color='white', fontweight='bold')
+        self._ax = ax
+        self._barras_esp = list(barras_esp)
+        self._barras_real = list(barras_real)
+        self._textos_esp = criar_textos(barras_esp)
+        self._textos_real = criar_textos(barras_real)
+        self._labels = tuple(labels)
+        self._background = None
+        # barras reais (e a legenda, que fica por cima delas) ficam fora do desenho
+        # normal; são pintadas por cima do fundo em _on_draw/_blit
+        self._animados = self._barras_real + self._textos_real + [ax.get_legend()]
+        for artista in self._animados:
+            artista.set_animated(True)
+        self._ajustar_limite(perc_esp + perc_real)
 
-        for bar in barras_real:
-            w = bar.get_width()
-            if w > 2:  # só mostrar se >= 2%
-                ax.text(w/2, bar.get_y() + bar.get_height()/2, fmt_perc(w),
-                       ha='center', va='center', fontsize=9, color='white', fontweight='bold')
+        with span('ChartSectionComponent.tight_layout'):
+            self.figure.tight_layout()
+        with span('ChartSectionComponent.draw'):
+            self.canvas.draw()
 
-        self.figure.tight_layout()
-        self.canvas.draw()
+    def _atualizar_barras(self, barras, textos, larguras: List[float]) -> bool:
+        """Atualiza larguras e textos; retorna True se alguma largura mudou"""
+        mudou = False
+        for bar, texto, w in zip(barras, textos, larguras):
+            if bar.get_width() == w:
+                continue
+            bar.set_width(w)
+            texto.set_x(w/2)
+            texto.set_text(self._fmt_perc(w))
+            mudou = True
+        return mudou
+
+    def _ajustar_limite(self, larguras: List[float]) -> bool:
+        # arredondado para múltiplos de 10% para a escala (e o fundo) mudar raramente
+        limite = math.ceil(max(max(larguras), 1.0) * 1.05 / 10) * 10
+        if self._ax.get_xlim() == (0, limite):
+            return False
+        self._ax.set_xlim(0, limite)
+        return True
+
+    def _on_draw(self, event):
+        """Após cada desenho completo: guardar o fundo e pintar as barras por cima"""
+        if self._labels is None:
+            self._background = None
+            return
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._desenhar_barras()
+
+    def _desenhar_barras(self):
+        for artista in self._animados:
+            self._ax.draw_artist(artista)
+
+    def _blit(self):
+        with span('ChartSectionComponent.blit'):
+            self.canvas.restore_region(self._background)
+            self._desenhar_barras()
+            self.canvas.blit(self.figure.bbox)
     
     def _criar_grafico_vazio(self):
+        if self.canvas is None:
+            self._pending_payload = None
+            return
+        self._labels = None
         self.figure.clear()
         ax = self.figure.add_subplot(111)
         
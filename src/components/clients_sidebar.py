@@ -1,22 +1,230 @@
 """
 Sidebar com lista de clientes e botão Novo Cliente
+
+A lista é uma QTableView de uma coluna sobre o ClientsListModel, que lê os
+nomes direto do ClientRepository. Nenhum widget é criado por cliente: o
+ClientItemDelegate pinta o nome e o botão de excluir, e o editor de nome só
+é criado quando o usuário começa a renomear (duplo clique / F2). Criar e excluir inserem ou
+removem apenas a linha afetada.
+
+A caixa de busca filtra a lista pelo ClientSearchIndex (sem acentos, por
+prefixo de cada palavra). Com filtro ativo, as linhas da view são um
+subconjunto das posições do repositório; os sinais sempre emitem a posição
+no repositório. Enquanto a busca só restringe a anterior, as linhas que
+saíram são removidas em blocos (sem reset do modelo); a lista só é refeita
+quando a busca muda de outro jeito ou os blocos são muitos.
 """
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QListWidget, QListWidgetItem, QInputDialog, QWidgetItem, QHBoxLayout, QLineEdit, QMessageBox
-from PySide6.QtCore import Signal, Qt
-from typing import List
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QTableView, QHeaderView, QInputDialog, QLineEdit, QMessageBox,
+                               QStyledItemDelegate, QStyleOptionViewItem, QStyle, QApplication, QAbstractItemView)
+from PySide6.QtCore import Signal, Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent
+from PySide6.QtGui import QColor
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.repository import ClientRepository
+from src.utils.search_index import ClientSearchIndex
+
+# Enums do Qt resolvidos uma vez: cada acesso a Qt.X custa microssegundos no PySide6, e
+# data()/flags()/paint() rodam várias vezes por linha visível a cada repintura
+_ROLES_NOME = frozenset((Qt.DisplayRole, Qt.EditRole, Qt.ToolTipRole))
+_FLAGS = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+_EDIT_ROLE = Qt.EditRole
+_STATE_SELECTED = QStyle.State_Selected
+_ELIDE_RIGHT = Qt.ElideRight
+_ALIGN_NOME = Qt.AlignVCenter | Qt.AlignLeft
+_ALIGN_CENTRO = Qt.AlignCenter
+
+# Acima de tantos blocos de linhas removidas, um reset do modelo sai mais barato
+MAX_BLOCOS_REMOCAO = 64
+
+
+class ClientsListModel(QAbstractListModel):
+    """Modelo de lista sobre os clientes em memória do repositório"""
+
+    def __init__(self, repository: ClientRepository, parent=None):
+        super().__init__(parent)
+        self.repository = repository
+        self.search_index = ClientSearchIndex(repository.all())
+        self.filtro = ''
+        # posições visíveis (ordenadas) quando há filtro; None = todas
+        self._visiveis: Optional[List[int]] = None
+
+    def posicao(self, row: int) -> int:
+        """Posição no repositório do cliente exibido na linha"""
+        return row if self._visiveis is None else self._visiveis[row]
+
+    def linha(self, posicao: int) -> int:
+        """Linha da view que exibe o cliente (-1 se estiver oculto pelo filtro)"""
+        if self._visiveis is None:
+            return posicao if 0 <= posicao < self.repository.count() else -1
+        row = bisect_left(self._visiveis, posicao)
+        return row if row < len(self._visiveis) and self._visiveis[row] == posicao else -1
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.repository.count() if self._visiveis is None else len(self._visiveis)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role not in _ROLES_NOME or not index.isValid():
+            return None
+        return self.repository.get(self.posicao(index.row())).get('name', '')
+
+    def flags(self, index):
+        return _FLAGS
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != _EDIT_ROLE or not index.isValid():
+            return False
+        posicao = self.posicao(index.row())
+        self.repository.rename(posicao, str(value))
+        self.search_index.update(posicao, self.repository.get(posicao))
+        self.dataChanged.emit(index, index)
+        return True
+
+    def filtrar(self, texto: str):
+        """Mostra só os clientes que casam com a busca (vazio = todos)"""
+        self.filtro = texto
+        visiveis = self.search_index.search(texto)
+        if visiveis is None and self._visiveis is None:
+            return
+        if visiveis is not None and self._visiveis is not None:
+            if visiveis == self._visiveis:
+                return
+            blocos = self._blocos_removidos(visiveis)
+            if blocos is not None:
+                # do fim para o começo, para as linhas dos blocos seguintes não mudarem
+                for primeira, ultima in reversed(blocos):
+                    self.beginRemoveRows(QModelIndex(), primeira, ultima)
+                    del self._visiveis[primeira:ultima + 1]
+                    self.endRemoveRows()
+                return
+        self.beginResetModel()
+        self._visiveis = visiveis
+        self.endResetModel()
+
+    def _blocos_removidos(self, visiveis: List[int]) -> Optional[List[Tuple[int, int]]]:
+        """Linhas (primeira, última) que saem da lista atual para chegar em `visiveis`,
+        ou None se `visiveis` não for um subconjunto dela ou os blocos passarem de MAX_BLOCOS_REMOCAO"""
+        if len(visiveis) > len(self._visiveis):
+            return None
+        blocos: List[Tuple[int, int]] = []
+        inicio = -1
+        j = 0
+        for row, posicao in enumerate(self._visiveis):
+            if j < len(visiveis) and visiveis[j] == posicao:
+                j += 1
+                if inicio >= 0:
+                    blocos.append((inicio, row - 1))
+                    if len(blocos) > MAX_BLOCOS_REMOCAO:
+                        return None
+                    inicio = -1
+            elif inicio < 0:
+                inicio = row
+        if j < len(visiveis):
+            return None
+        if inicio >= 0:
+            blocos.append((inicio, len(self._visiveis) - 1))
+        return blocos if len(blocos) <= MAX_BLOCOS_REMOCAO else None
+
+    def insert_client(self, name: Optional[str] = None) -> Dict[str, Any]:
+        # o cliente novo fica visível mesmo que não case com o filtro atual
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        client = self.repository.create(name)
+        self.search_index.add(client)
+        if self._visiveis is not None:
+            self._visiveis.append(self.repository.count() - 1)
+        self.endInsertRows()
+        return client
+
+    def remove_client(self, row: int) -> Dict[str, Any]:
+        posicao = self.posicao(row)
+        client = self.repository.get(posicao)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.repository.delete(posicao)
+        self.search_index.remove(posicao)
+        if self._visiveis is not None:
+            del self._visiveis[row]
+            for i in range(row, len(self._visiveis)):
+                self._visiveis[i] -= 1
+        self.endRemoveRows()
+        return client
+
+    def reload(self):
+        self.beginResetModel()
+        self.search_index.rebuild(self.repository.all())
+        self._visiveis = self.search_index.search(self.filtro)
+        self.endResetModel()
+
+
+class ClientItemDelegate(QStyledItemDelegate):
+    """Pinta nome + lixeira de cada linha; cria o editor de nome só quando necessário"""
+    delete_requested = Signal(int)
+
+    ROW_HEIGHT = 34
+    DELETE_WIDTH = 30
+    COR_TEXTO = QColor('black')
+    COR_SELECIONADO = QColor('white')
+
+    def _delete_rect(self, rect: QRect) -> QRect:
+        return QRect(rect.right() - self.DELETE_WIDTH, rect.top(), self.DELETE_WIDTH, rect.height())
 
-from src.utils.storage import load_all_clients, create_client, update_client, save_all_clients
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        opt.text = ''
+        widget = opt.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        # fundo, seleção e hover conforme o stylesheet da lista
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, widget)
+
+        selected = bool(opt.state & _STATE_SELECTED)
+        painter.save()
+        painter.setPen(self.COR_SELECIONADO if selected else self.COR_TEXTO)
+        text_rect = opt.rect.adjusted(8, 0, -(self.DELETE_WIDTH + 4), 0)
+        elided = opt.fontMetrics.elidedText(text, _ELIDE_RIGHT, text_rect.width())
+        painter.drawText(text_rect, _ALIGN_NOME, elided)
+        painter.drawText(self._delete_rect(opt.rect), _ALIGN_CENTRO, '🗑')
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and self._delete_rect(option.rect).contains(event.position().toPoint())):
+            self.delete_requested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setFrame(False)
+        editor.setStyleSheet('QLineEdit { background: white; font-size: 13px; color: black; }')
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setText(index.data(Qt.EditRole) or '')
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text(), Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect.adjusted(4, 2, -(self.DELETE_WIDTH + 2), -2))
 
 
 class ClientsSidebar(QWidget):
     """Componente lateral com clientes"""
     cliente_selected = Signal(int)
     cliente_created = Signal(dict)
+    cliente_deleted = Signal(dict)
 
-    def __init__(self, parent=None):
+    def __init__(self, repository: ClientRepository, parent=None):
         super().__init__(parent)
+        self.repository = repository
         self.setup_ui()
-        self.load_clients()
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -32,7 +240,7 @@ class ClientsSidebar(QWidget):
             QPushButton {
                 background: qlineargradient(
                     x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #28431a, 
+                    stop:0 #28431a,
                     stop:1 #3d6329
                 );
                 color: white;
@@ -46,68 +254,94 @@ class ClientsSidebar(QWidget):
         """)
         layout.addWidget(self.btn_new)
 
-        self.list_widget = QListWidget()
-        self.list_widget.currentRowChanged.connect(self.on_select)
+        self.search = QLineEdit()
+        self.search.setPlaceholderText('Buscar cliente...')
+        self.search.setClearButtonEnabled(True)
+        self.search.setMinimumHeight(30)
+        self.search.setStyleSheet("""
+            QLineEdit {
+                background-color: white;
+                color: black;
+                border: 1px solid #ccc;
+                border-radius: 6px;
+                padding: 4px 8px;
+                font-size: 12px;
+            }
+            QLineEdit:focus { border: 1px solid #28431a; }
+        """)
+        self.search.textChanged.connect(self.on_search)
+        layout.addWidget(self.search)
+
+        self.model = ClientsListModel(self.repository, self)
+        self.delegate = ClientItemDelegate(self)
+        self.delegate.delete_requested.connect(self.on_delete_clicked)
+
+        # QTableView em vez de QListView: com linhas de altura fixa o layout não
+        # percorre o modelo linha a linha, o que pesa com dezenas de milhares de clientes
+        self.list_view = QTableView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.horizontalHeader().hide()
+        self.list_view.horizontalHeader().setStretchLastSection(True)
+        self.list_view.verticalHeader().hide()
+        self.list_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.list_view.verticalHeader().setDefaultSectionSize(ClientItemDelegate.ROW_HEIGHT)
+        self.list_view.setShowGrid(False)
+        self.list_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        self.list_view.setMouseTracking(True)
+        self.list_view.selectionModel().currentRowChanged.connect(lambda current, _previous: self.on_select(current.row()))
         # Forçar fundo branco e fonte preta
-        self.list_widget.setStyleSheet("""
-            QListWidget { 
-                background-color: white; 
-                color: black; 
+        self.list_view.setStyleSheet("""
+            QTableView {
+                background-color: white;
+                color: black;
+                border: 1px solid #ccc;
             }
-            QListWidget::item { 
-                background-color: white; 
-                color: black; 
+            QTableView::item {
+                background-color: white;
+                color: black;
                 padding: 4px;
             }
-            QListWidget::item:selected { 
-                background-color: #28431a; 
-                color: white; 
+            QTableView::item:selected {
+                background-color: #28431a;
+                color: white;
             }
-            QListWidget::item:hover { 
-                background-color: #f0f0f0; 
+            QTableView::item:hover {
+                background-color: #f0f0f0;
             }
         """)
-        layout.addWidget(self.list_widget, 1)
+        layout.addWidget(self.list_view, 1)
 
         # largura fixa da sidebar para liberar mais espaço à tabela
         self.setFixedWidth(200)
 
     def load_clients(self):
-        self.list_widget.blockSignals(True)
-        self.list_widget.clear()
-        data = load_all_clients()
-        clients = data.get('clients', [])
-
-        for idx, client in enumerate(clients):
-            item = QListWidgetItem()
-
-            row_widget = QWidget()
-            row_layout = QHBoxLayout(row_widget)
-            row_layout.setContentsMargins(6, 2, 6, 2)
-            row_layout.setSpacing(8)
-
-            name_edit = QLineEdit(client.get('name', ''))
-            name_edit.setFrame(False)
-            name_edit.setStyleSheet('QLineEdit { background: transparent; font-size: 13px; color: black; }')
-            # associar o item para encontrar a linha depois
-            name_edit._list_item = item
-            name_edit.editingFinished.connect(lambda ed=name_edit: self.on_name_edited(ed))
-
-            btn_delete = QPushButton('🗑')
-            btn_delete.setToolTip('Excluir cliente')
-            btn_delete.setFixedSize(26, 26)
-            btn_delete.setCursor(Qt.PointingHandCursor)  # type: ignore
-            btn_delete.setStyleSheet('QPushButton{ background: transparent; border: none; font-size: 14px; }')
-            btn_delete.clicked.connect(lambda _checked, it=item: self.on_delete_clicked(it))
-
-            row_layout.addWidget(name_edit)
-            row_layout.addWidget(btn_delete)
-
-            item.setSizeHint(row_widget.sizeHint())
-            self.list_widget.addItem(item)
-            self.list_widget.setItemWidget(item, row_widget)
-
-        self.list_widget.blockSignals(False)
+        """Recarrega a lista inteira (apenas se o repositório mudou por fora)"""
+        self.model.reload()
+
+    def on_search(self, texto: str):
+        # manter selecionado o cliente atual se ele continuar visível
+        current = self.list_view.currentIndex()
+        posicao = self.model.posicao(current.row()) if current.isValid() else -1
+        self.model.filtrar(texto)
+        if posicao >= 0:
+            row = self.model.linha(posicao)
+            if row >= 0:
+                self.select_row(row, notify=False)
+
+    def select_row(self, row: int, notify: bool = True):
+        self.list_view.blockSignals(not notify)
+        self.list_view.selectionModel().blockSignals(not notify)
+        self.list_view.setCurrentIndex(self.model.index(row, 0))
+        self.list_view.selectionModel().blockSignals(False)
+        self.list_view.blockSignals(False)
+        self.list_view.viewport().update()
+
+    def insert_client(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """Cria um cliente e adiciona só a nova linha à lista"""
+        return self.model.insert_client(name)
 
     def on_new_client(self):
         # Perguntar nome ao usuário
@@ -116,71 +350,37 @@ class ClientsSidebar(QWidget):
             return
 
         # criar cliente com nome informado
-        if name and name.strip():
-            client = create_client(name.strip())
-        else:
-            client = create_client()
-        self.load_clients()
+        client = self.insert_client(name.strip() if name and name.strip() else None)
         # selecionar último
-        last_index = self.list_widget.count() - 1
-        self.list_widget.setCurrentRow(last_index)
+        self.select_row(self.model.rowCount() - 1, notify=False)
         self.cliente_created.emit(client)
 
-    def on_name_edited(self, editor: QLineEdit):
-        item = getattr(editor, '_list_item', None)
-        if item is None:
-            return
-        row = self.list_widget.row(item)
-        try:
-            data = load_all_clients()
-            clients = data.get('clients', [])
-            if 0 <= row < len(clients):
-                clients[row]['name'] = editor.text()
-                update_client(row, clients[row])
-        except Exception:
-            pass
-
-    def on_delete_clicked(self, item: QListWidgetItem):
-        row = self.list_widget.row(item)
-        if row < 0:
+    def on_delete_clicked(self, row: int):
+        if row < 0 or row >= self.model.rowCount():
             return
 
-        reply = QMessageBox.question(self, 'Confirmar exclusão', f"Excluir cliente '{self.list_widget.item(row).text()}'?",
+        name = self.model.data(self.model.index(row, 0))
+        reply = QMessageBox.question(self, 'Confirmar exclusão', f"Excluir cliente '{name}'?",
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply != QMessageBox.Yes:
             return
 
         try:
-            data = load_all_clients()
-            clients = data.get('clients', [])
-            if 0 <= row < len(clients):
-                clients.pop(row)
-                save_all_clients({'clients': clients})
-                # recarregar a lista e selecionar próximo item
-                self.load_clients()
-                new_count = self.list_widget.count()
-                new_row = min(row, new_count - 1) if new_count > 0 else -1
-                if new_row >= 0:
-                    self.list_widget.setCurrentRow(new_row)
-                    self.cliente_selected.emit(new_row)
-                else:
-                    # sem clientes
-                    self.cliente_selected.emit(-1)
+            client = self.model.remove_client(row)
+            self.cliente_deleted.emit(client)
+            # selecionar próximo item
+            new_count = self.model.rowCount()
+            new_row = min(row, new_count - 1) if new_count > 0 else -1
+            if new_row >= 0:
+                self.select_row(new_row, notify=False)
+                self.cliente_selected.emit(self.model.posicao(new_row))
+            else:
+                # sem clientes
+                self.cliente_selected.emit(-1)
         except Exception:
             pass
 
     def on_select(self, idx: int):
+        # idx é a linha da view; o sinal leva a posição no repositório
         if idx >= 0:
-            self.cliente_selected.emit(idx)
-
-    def on_item_changed(self, item: QListWidgetItem):
-        """Quando o nome do cliente é alterado na lista, atualizar o storage"""
-        row = self.list_widget.row(item)
-        try:
-            data = load_all_clients()
-            clients = data.get('clients', [])
-            if 0 <= row < len(clients):
-                clients[row]['name'] = item.text()
-                update_client(row, clients[row])
-        except Exception:
-            pass
+            self.cliente_selected.emit(self.model.posicao(idx))
@@ -0,0 +1,166 @@
+"""
+Painel da carteira: totais de todos os clientes, esperado x real por
+categoria, lucro agregado e os clientes com maior estouro de orçamento
+
+Lê apenas o PortfolioAggregates (mantido por delta pelo repositório), então
+atualizar o painel depois de uma edição custa O(categorias + k),
+independente de quantos clientes existem.
+"""
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QGroupBox, QLabel, QTableWidget,
+                               QTableWidgetItem, QHeaderView, QListWidget, QListWidgetItem, QAbstractItemView)
+from PySide6.QtCore import Qt, Signal
+
+from src.components.results_table import format_brl
+from src.utils.portfolio import PortfolioAggregates, TOP_K
+from src.utils.summary import CATEGORIA_LUCRO
+
+
+class PortfolioDashboardComponent(QWidget):
+    # posição do cliente escolhido no ranking de estouro
+    cliente_selected = Signal(int)
+
+    def __init__(self, aggregates: PortfolioAggregates, parent=None):
+        super().__init__(parent)
+        self.aggregates = aggregates
+        self._categorias = []
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        group = QGroupBox("Visão da Carteira")
+        group.setStyleSheet("""
+            QGroupBox {
+                background-color: white;
+                border: 2px solid #e0e0e0;
+                border-radius: 12px;
+                padding: 20px;
+                font-size: 14px;
+                font-weight: bold;
+            }
+            QGroupBox::title {
+                color: #28431a;
+                subcontrol-origin: margin;
+                left: 15px;
+                top: 8px;
+                padding: 0 5px;
+            }
+        """)
+        group_layout = QVBoxLayout()
+
+        # Totais
+        grid = QGridLayout()
+        grid.setSpacing(10)
+        self.labels = {}
+        campos = [('clientes', 'Clientes'), ('valor_total', 'Valor total'),
+                  ('lucro_esperado', 'Lucro esperado'), ('lucro_real', 'Lucro real')]
+        for coluna, (chave, titulo) in enumerate(campos):
+            label_titulo = QLabel(titulo)
+            label_titulo.setStyleSheet("QLabel { color: #495057; font-size: 12px; font-weight: normal; }")
+            label_valor = QLabel('-')
+            label_valor.setStyleSheet("QLabel { color: #28431a; font-size: 15px; font-weight: bold; }")
+            grid.addWidget(label_titulo, 0, coluna)
+            grid.addWidget(label_valor, 1, coluna)
+            self.labels[chave] = label_valor
+        group_layout.addLayout(grid)
+
+        linha = QHBoxLayout()
+
+        # Esperado x real por categoria
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(['Categoria', 'Esperado', 'Real', 'Diferença'])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.table.setAlternatingRowColors(True)
+        self.table.setStyleSheet("""
+            QHeaderView::section {
+                background-color: #28431a;
+                color: white;
+                padding: 6px;
+                font-weight: bold;
+            }
+            QTableWidget {
+                background-color: white;
+                color: black;
+                gridline-color: #e0e0e0;
+                font-weight: normal;
+            }
+        """)
+        linha.addWidget(self.table, 3)
+
+        # Ranking de estouro
+        ranking = QVBoxLayout()
+        titulo = QLabel(f"Maiores estouros (top {TOP_K})")
+        titulo.setStyleSheet("QLabel { color: #2c3e50; font-size: 13px; font-weight: bold; }")
+        ranking.addWidget(titulo)
+        self.list_estouros = QListWidget()
+        self.list_estouros.setStyleSheet("""
+            QListWidget {
+                background-color: white;
+                color: black;
+                border: 1px solid #e0e0e0;
+                font-weight: normal;
+            }
+        """)
+        self.list_estouros.itemClicked.connect(self.on_item_clicked)
+        ranking.addWidget(self.list_estouros)
+        linha.addLayout(ranking, 2)
+
+        group_layout.addLayout(linha)
+        group.setLayout(group_layout)
+        layout.addWidget(group)
+        self.setMinimumHeight(320)
+
+    def _set_celula(self, row: int, col: int, texto: str, cor=None):
+        item = self.table.item(row, col)
+        if item is None:
+            item = QTableWidgetItem()
+            item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter if col == 0 else Qt.AlignRight | Qt.AlignVCenter)
+            self.table.setItem(row, col, item)
+        item.setText(texto)
+        if cor is not None:
+            item.setForeground(cor)
+
+    def refresh(self):
+        """Redesenha o painel a partir dos agregados (custo independe do nº de clientes)"""
+        snap = self.aggregates.snapshot()
+        self.labels['clientes'].setText(str(snap.clientes))
+        self.labels['valor_total'].setText(format_brl(snap.valor_total))
+        self.labels['lucro_esperado'].setText(format_brl(snap.lucro_esperado))
+        self.labels['lucro_real'].setText(format_brl(snap.lucro_real))
+
+        categorias = [c.categoria for c in snap.categorias]
+        if categorias != self._categorias:
+            self.table.setRowCount(len(categorias))
+            self._categorias = categorias
+        for row, cat in enumerate(snap.categorias):
+            diff = cat.diferenca
+            # lucro acima do esperado é bom; custo acima do esperado é estouro
+            favoravel = diff > 0 if cat.categoria == CATEGORIA_LUCRO else diff < 0
+            self._set_celula(row, 0, cat.categoria)
+            self._set_celula(row, 1, format_brl(cat.esperado))
+            self._set_celula(row, 2, format_brl(cat.real))
+            self._set_celula(row, 3, f"+{format_brl(diff)}" if diff > 0 else format_brl(diff),
+                             Qt.black if diff == 0 else Qt.darkGreen if favoravel else Qt.red)
+
+        self.list_estouros.clear()
+        for entrada in snap.maiores_estouros:
+            item = QListWidgetItem(f"{entrada.name} - {format_brl(entrada.estouro)} acima")
+            item.setData(Qt.UserRole, entrada.token)
+            self.list_estouros.addItem(item)
+        if not snap.maiores_estouros:
+            item = QListWidgetItem("Nenhum cliente acima do orçamento")
+            item.setFlags(Qt.NoItemFlags)
+            self.list_estouros.addItem(item)
+
+    def on_item_clicked(self, item: QListWidgetItem):
+        token = item.data(Qt.UserRole)
+        if token is None:
+            return
+        posicao = self.aggregates.posicao(token)
+        if posicao >= 0:
+            self.cliente_selected.emit(posicao)
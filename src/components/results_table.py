@@ -1,18 +1,40 @@
 """
 Tabela editável para substituir o gráfico de pizza
 Exibe percentuais iniciais, valores esperados e campos editáveis para valores reais
+
+Os dados ficam em colunas (listas) no ResultsTableModel e o texto de cada
+célula só é formatado quando a view pede para pintá-la; editar um valor real
+atualiza o total em O(1) e notifica apenas as células afetadas.
 """
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QStyledItemDelegate, QLineEdit
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QDoubleValidator
-from typing import Dict
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView, QStyledItemDelegate, QLineEdit, QAbstractItemView
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex
+from typing import Dict, List
 import re
 
+from src.utils import money
+from src.utils.tracing import traced
+
 
 def format_brl(valor: float) -> str:
     return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
 
 
+def format_percent(valor: float) -> str:
+    # sem casas se inteiro, com 2 casas se decimal
+    return f"{valor:.0f}%" if abs(valor - round(valor)) < 0.005 else f"{valor:.2f}%"
+
+
+def parse_brl(text: str) -> float:
+    """Aceita entradas com ou sem 'R$' e com '.' milhares e ',' decimal"""
+    raw = re.sub(r"[^0-9,\.]", '', text or '')
+    # transformar em formato python decimal (ponto)
+    raw = raw.replace('.', '').replace(',', '.')
+    try:
+        return float(raw) if raw else 0.0
+    except ValueError:
+        return 0.0
+
+
 class MoneyDelegate(QStyledItemDelegate):
     """Delegate para edição de valores monetários com máscara dinâmica (milhares + vírgula)"""
     def createEditor(self, parent, option, index):
@@ -30,20 +52,101 @@ class MoneyDelegate(QStyledItemDelegate):
         editor.setText(text)
 
     def setModelData(self, editor, model, index):
-        text = editor.text()
-        # aceitar entradas com ou sem 'R$' e com '.' milhares e ',' decimal
-        raw = re.sub(r"[^0-9,\.]", '', text)
-        # transformar em formato python decimal (ponto)
-        raw = raw.replace('.', '').replace(',', '.')
-        try:
-            val = float(raw) if raw else 0.0
-        except Exception:
-            val = 0.0
+        # o modelo guarda o número; a célula é formatada em BRL ao ser exibida
+        model.setData(index, parse_brl(editor.text()), Qt.EditRole)
 
-        # formatar para BRL na célula
-        model.setData(index, format_brl(val))
 
 
+class ResultsTableModel(QAbstractTableModel):
+    """Modelo colunar: categorias, percentuais, valores esperados e reais"""
+    COLUNAS = ['Categoria', 'Percentual (%)', 'Valor Esperado', 'Valor Real', 'Percentual Real (%)']
+    COL_VALOR_REAL = 3
+    COL_PERC_REAL = 4
+
+    # emitido após uma edição de valor real, com a linha alterada
+    valor_real_alterado = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.categorias: List[str] = []
+        self.percentuais: List[float] = []
+        self.esperados: List[float] = []
+        self.reais: List[float] = []
+        # total mantido em centavos para não acumular erro de float a cada edição
+        self._total_real_centavos = 0
+
+    @property
+    def total_real(self) -> float:
+        return money.from_cents(self._total_real_centavos)
+
+    def set_dados(self, percentuais: Dict[str, float], valor_total: float, valores_reais: Dict[str, float]):
+        valores_reais = valores_reais or {}
+        # antes do reset: uma tabela inválida (ValueError) deixa o modelo como estava
+        esperados = money.dividir(valor_total, percentuais)
+        self.beginResetModel()
+        self.categorias = list(percentuais.keys())
+        self.percentuais = [percentuais[c] for c in self.categorias]
+        self.esperados = [esperados[c] for c in self.categorias]
+        self.reais = [valores_reais.get(c, 0.0) for c in self.categorias]
+        # total calculado uma vez; depois mantido incrementalmente em setData
+        self._total_real_centavos = sum(money.to_cents(r) for r in self.reais)
+        self.endResetModel()
+
+    def valores_reais(self) -> Dict[str, float]:
+        return dict(zip(self.categorias, self.reais))
+
+    def valores_esperados(self) -> Dict[str, float]:
+        return dict(zip(self.categorias, self.esperados))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.categorias)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUNAS[section]
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == self.COL_VALOR_REAL:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        row, col = index.row(), index.column()
+        if col == 0:
+            return self.categorias[row]
+        if col == 1:
+            return format_percent(self.percentuais[row])
+        if col == 2:
+            return format_brl(self.esperados[row])
+        if col == self.COL_VALOR_REAL:
+            return format_brl(self.reais[row])
+        perc_real = (self.reais[row] / self.total_real) * 100 if self.total_real > 0 else 0.0
+        return format_percent(perc_real)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() != self.COL_VALOR_REAL:
+            return False
+        row = index.row()
+        novo = value if isinstance(value, (int, float)) else parse_brl(str(value))
+        antigo = self.reais[row]
+        if novo == antigo:
+            return False
+        self.reais[row] = float(novo)
+        self._total_real_centavos += money.to_cents(novo) - money.to_cents(antigo)
+        self.dataChanged.emit(index, index)
+        # o percentual real de todas as linhas depende do total
+        ultima = len(self.categorias) - 1
+        self.dataChanged.emit(self.index(0, self.COL_PERC_REAL), self.index(ultima, self.COL_PERC_REAL))
+        self.valor_real_alterado.emit(row)
+        return True
+
 
 class ResultsTableComponent(QWidget):
     dados_alterados = Signal(dict)
@@ -51,16 +154,19 @@ class ResultsTableComponent(QWidget):
     def __init__(self, percentuais: Dict[str, float], parent=None):
         super().__init__(parent)
         self.percentuais = percentuais
+        self.last_percentuais: Dict[str, float] = {}
+        self.last_valores_esperados: Dict[str, float] = {}
         self._init_ui()
 
     def _init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
-        self.table = QTableWidget()
-        
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(['Categoria', 'Percentual (%)', 'Valor Esperado', 'Valor Real', 'Percentual Real (%)'])
+        self.model = ResultsTableModel(self)
+        self.model.valor_real_alterado.connect(self.on_valor_real_alterado)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         # estilo com fundo branco e fonte preta forçados
         self.table.setStyleSheet("""
@@ -70,115 +176,45 @@ class ResultsTableComponent(QWidget):
                 padding: 6px; 
                 font-weight: bold; 
             }
-            QTableWidget { 
+            QTableView { 
                 background-color: white; 
                 color: black; 
                 gridline-color: #e0e0e0;
             }
-            QTableWidget::item { 
+            QTableView::item { 
                 background-color: white; 
                 color: black; 
             }
-            QTableWidget::item:alternate { 
+            QTableView::item:alternate { 
                 background-color: #f8f9fa; 
                 color: black; 
             }
         """)
         self.table.verticalHeader().setVisible(False)
         self.table.setAlternatingRowColors(True)
-        self.table.setEditTriggers(QTableWidget.AllEditTriggers)
-        # conectar sinais
-        self.table.cellChanged.connect(self.on_cell_changed)
+        self.table.setEditTriggers(QAbstractItemView.AllEditTriggers)
 
         # Delegate para editar valores reais
         self.money_delegate = MoneyDelegate()
         # Valor Real é coluna 3
-        self.table.setItemDelegateForColumn(3, self.money_delegate)
+        self.table.setItemDelegateForColumn(ResultsTableModel.COL_VALOR_REAL, self.money_delegate)
 
         layout.addWidget(self.table)
 
+    @traced()
     def load_data(self, percentuais: Dict[str, float], valor_total: float, valores_reais: Dict[str, float]):
-        self.table.blockSignals(True)
+        self.model.set_dados(percentuais, valor_total, valores_reais)
         # armazenar para uso no gráfico: valores esperados por categoria
         self.last_percentuais = percentuais
-        categorias = list(percentuais.keys())
-        self.table.setRowCount(len(categorias))
-
-        # calcular valores esperados
-        valores_esperados = {c: valor_total * (percentuais[c] / 100) for c in categorias}
-        self.last_valores_esperados = valores_esperados
-
-        for row, categoria in enumerate(categorias):
-            # Categoria
-            item_cat = QTableWidgetItem(categoria)
-            item_cat.setFlags(item_cat.flags() ^ Qt.ItemIsEditable)
-            self.table.setItem(row, 0, item_cat)
-
-            # Percentual inicial (formatado)
-            perc_text = f"{percentuais[categoria]:.0f}%" if abs(percentuais[categoria] - round(percentuais[categoria])) < 0.005 else f"{percentuais[categoria]:.2f}%"
-            item_perc = QTableWidgetItem(perc_text)
-            item_perc.setFlags(item_perc.flags() ^ Qt.ItemIsEditable)
-            self.table.setItem(row, 1, item_perc)
-
-            # Valor esperado (formatado como R$)
-            item_esp = QTableWidgetItem(f"R$ {valores_esperados[categoria]:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.'))
-            item_esp.setFlags(item_esp.flags() ^ Qt.ItemIsEditable)
-            self.table.setItem(row, 2, item_esp)
-
-            # Valor real (editável) - exibir em R$
-            val_real = valores_reais.get(categoria, 0.0) if valores_reais is not None else 0.0
-            item_real = QTableWidgetItem(f"R$ {val_real:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.'))
-            self.table.setItem(row, 3, item_real)
-
-            # Percentual real (calculado)
-            total_reais = sum(valores_reais.values()) if valores_reais and sum(valores_reais.values()) > 0 else 0.0
-            perc_real = (val_real / total_reais) * 100 if total_reais > 0 else 0.0
-            # Formatar percentual real: sem casas se inteiro, com 2 casas se decimal
-            perc_text_real = f"{perc_real:.0f}%" if abs(perc_real - round(perc_real)) < 0.005 else f"{perc_real:.2f}%"
-            item_perc_real = QTableWidgetItem(perc_text_real)
-            item_perc_real.setFlags(item_perc_real.flags() ^ Qt.ItemIsEditable)
-            self.table.setItem(row, 4, item_perc_real)
-
-        self.table.blockSignals(False)
-
-    def on_cell_changed(self, row: int, column: int):
-        # Apenas reagir se coluna de Valor Real foi alterada
-        if column != 3:
-            return
-
-        categorias = []
-        valores_reais = {}
-        for r in range(self.table.rowCount()):
-            item_cat = self.table.item(r, 0)
-            item_val = self.table.item(r, 3)
-            if item_cat is None:
-                continue
-            cat = item_cat.text()
-            categorias.append(cat)
-
-            text = item_val.text() if item_val is not None else ''
-            # Permitir entrada formatada com R$ e pontos e vírgulas
-            try:
-                val = float(text.replace('R$', '').replace('.', '').replace(',', '.').strip()) if text else 0.0
-            except Exception:
-                val = 0.0
-            valores_reais[cat] = val
-
-        total_real = sum(valores_reais.values())
-        # Atualizar percentuais reais
-        for r, cat in enumerate(categorias):
-            perc_real = (valores_reais.get(cat, 0.0) / total_real) * 100 if total_real > 0 else 0.0
-            perc_text_real = f"{perc_real:.0f}%" if abs(perc_real - round(perc_real)) < 0.005 else f"{perc_real:.2f}%"
-            self.table.blockSignals(True)
-            self.table.setItem(r, 4, QTableWidgetItem(perc_text_real))
-            self.table.blockSignals(False)
+        self.last_valores_esperados = self.model.valores_esperados()
 
+    def on_valor_real_alterado(self, row: int):
         # Emitir sinal com dados atualizados
         # incluir também percentuais e valores esperados para que o gráfico compare
         payload = {
-            'valores_reais': valores_reais,
-            'total_real': total_real,
-            'percentuais': getattr(self, 'last_percentuais', {}),
-            'valores_esperados': getattr(self, 'last_valores_esperados', {})
+            'valores_reais': self.model.valores_reais(),
+            'total_real': self.model.total_real,
+            'percentuais': self.last_percentuais,
+            'valores_esperados': self.last_valores_esperados
         }
         self.dados_alterados.emit(payload)
@@ -0,0 +1,96 @@
+"""
+Painel de depuração do rastreamento (CALCULADORA_TRACE=1)
+
+Mostra, para cada span do buffer, quantidade e p50/p95/p99/máximo em ms,
+atualizando enquanto está aberto, e exporta o trace para o Chrome/Perfetto.
+Aberto na janela principal com Ctrl+Shift+D.
+"""
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QAbstractItemView, QLabel, QFileDialog, QMessageBox)
+from PySide6.QtCore import Qt, QTimer
+
+from src.utils import tracing
+
+# Intervalo de atualização da tabela enquanto o painel está visível
+REFRESH_MS = 1000
+
+
+class TracePanel(QWidget):
+    COLUNAS = ['Span', 'N', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Máx (ms)', 'Total (ms)']
+    CHAVES = ['n', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'total_ms']
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Rastreamento")
+        self.resize(760, 420)
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.label_resumo = QLabel()
+        layout.addWidget(self.label_resumo)
+
+        self.table = QTableWidget(0, len(self.COLUNAS))
+        self.table.setHorizontalHeaderLabels(self.COLUNAS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # mais caros primeiro (o usuário pode reordenar clicando no cabeçalho)
+        self.table.horizontalHeader().setSortIndicator(len(self.COLUNAS) - 1, Qt.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table)
+
+        botoes = QHBoxLayout()
+        botoes.addStretch()
+        for texto, slot in (("Atualizar", self.refresh), ("Limpar", self.on_limpar),
+                            ("Exportar trace...", self.on_exportar)):
+            botao = QPushButton(texto)
+            botao.clicked.connect(slot)
+            botoes.addWidget(botao)
+        layout.addLayout(botoes)
+
+    def refresh(self):
+        stats = tracing.stats()
+        self.label_resumo.setText(f"{sum(s['n'] for s in stats.values())} spans no buffer "
+                                  f"(últimos {tracing.CAPACITY})")
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(stats))
+        for row, (nome, s) in enumerate(stats.items()):
+            self.table.setItem(row, 0, QTableWidgetItem(nome))
+            for col, chave in enumerate(self.CHAVES, start=1):
+                item = QTableWidgetItem()
+                # número (não texto) para a ordenação por coluna funcionar
+                item.setData(Qt.DisplayRole, s[chave] if chave == 'n' else round(s[chave], 3))
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+        self.table.setSortingEnabled(True)
+
+    def on_limpar(self):
+        tracing.clear()
+        self.refresh()
+
+    def on_exportar(self):
+        filename, _ = QFileDialog.getSaveFileName(self, 'Exportar trace', 'trace.json', 'Trace JSON (*.json)')
+        if not filename:
+            return
+        try:
+            total = tracing.dump_chrome_trace(filename)
+        except OSError as e:
+            QMessageBox.critical(self, 'Erro', f'Erro ao exportar trace:\n{e}')
+            return
+        QMessageBox.information(self, 'Sucesso', f'{total} spans exportados.\n\nAbra em chrome://tracing ou '
+                                                 f'ui.perfetto.dev:\n{filename}')
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
@@ -0,0 +1,346 @@
+import sys
+import os
+from typing import Dict
+from datetime import datetime
+
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFileDialog, QMessageBox, QScrollArea
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QKeySequence, QShortcut
+
+from src.components.header import HeaderComponent
+from src.components.input_section import InputSectionComponent
+from src.components.clients_sidebar import ClientsSidebar
+from src.components.results_table import ResultsTableComponent
+from src.components.chart_section import ChartSectionComponent
+from src.components.portfolio_dashboard import PortfolioDashboardComponent
+from src.utils.repository import ClientRepository
+from src.utils.persistence import PersistenceWorker
+from src.utils.portfolio import PortfolioAggregates
+from src.utils.history import TIPO_CALCULO, TIPO_EDICAO, close_history, get_history
+from src.utils import money, tracing
+from src.utils.tracing import traced
+from src.utils.constants import PERCENTUAIS, CORES
+from src.utils.calculator import CalculadoraCustos
+
+# Intervalo sem edições antes de gravar as alterações pendentes no disco
+SAVE_DEBOUNCE_MS = 800
+
+
+class MainWindow(QMainWindow):
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Calculadora de Eventos")
+        self.setMinimumSize(1200, 850)  # Aumentado para dar mais espaço à tabela
+
+        # Gravação adiada: cada alteração reinicia o timer e o flush acontece uma vez só
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DEBOUNCE_MS)
+        self._save_timer.timeout.connect(self.flush_pending)
+
+        # Histórico de cálculos e edições (banco próprio, fora do cliente)
+        self.history = get_history(prune=False)
+
+        # Gravação em segundo plano para não travar a interface em disco lento
+        self.persistence = PersistenceWorker(self, history=self.history)
+        self.persistence.save_failed.connect(self.on_save_failed)
+        self.persistence.start()
+        # limpeza por retenção do histórico fora da thread da interface
+        self.persistence.prune_history()
+
+        # Estado
+        self.repository = ClientRepository(on_dirty=self._save_timer.start, writer=self.persistence)
+        # atualizações que falharam voltam a ficar pendentes e são regravadas no próximo flush
+        self.persistence.update_failed.connect(self.repository.retry_failed)
+        self.current_client_index = 0 if self.repository.count() > 0 else -1
+
+        # Agregados da carteira, atualizados por delta a cada alteração no repositório
+        self.portfolio = PortfolioAggregates(self.repository.all())
+        self.repository.add_listener(self.portfolio)
+
+        # Calculadora padrão usada para cálculos iniciais
+        self.calculadora = CalculadoraCustos(PERCENTUAIS)
+
+        self.setup_ui()
+
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: #f0f2f5;
+            }
+        """)
+
+        # Painel de rastreamento (só com CALCULADORA_TRACE=1)
+        self.trace_panel = None
+        if tracing.ENABLED:
+            QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.show_trace_panel)
+
+        # Se já houver cliente, carregar
+        if self.current_client_index >= 0:
+            self.load_client(self.current_client_index)
+
+    def setup_ui(self):
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+
+        main_layout = QHBoxLayout(central_widget)
+        main_layout.setContentsMargins(10, 10, 10, 10)
+        main_layout.setSpacing(12)
+
+        # Sidebar de clientes
+        self.sidebar = ClientsSidebar(self.repository)
+        self.sidebar.cliente_selected.connect(self.on_client_selected)
+        self.sidebar.cliente_created.connect(self.on_client_created)
+        self.sidebar.cliente_deleted.connect(self.on_client_deleted)
+        main_layout.addWidget(self.sidebar, 0)
+
+        # Área principal com scroll
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        scroll_area.setStyleSheet("""
+            QScrollArea {
+                border: none;
+                background-color: #f0f2f5;
+            }
+            QScrollBar:vertical {
+                background-color: #f0f2f5;
+                width: 12px;
+                border-radius: 6px;
+            }
+            QScrollBar::handle:vertical {
+                background-color: #f0f2f5;
+                border-radius: 6px;
+                min-height: 20px;
+            }
+            QScrollBar::handle:vertical:hover {
+                background-color: #d0d2d5;
+            }
+            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+                height: 0px;
+            }
+            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
+                background: #f0f2f5;
+            }
+        """)
+        
+        # Widget de conteúdo dentro do scroll
+        content_widget = QWidget()
+        content_widget.setStyleSheet("background-color: #f0f2f5;")
+        area = QVBoxLayout(content_widget)
+        area.setContentsMargins(0, 0, 0, 0)
+
+        self.header = HeaderComponent()
+        area.addWidget(self.header)
+
+        self.input_section = InputSectionComponent()
+        self.input_section.calcular_clicked.connect(self.on_calcular)
+        self.input_section.exportar_clicked.connect(self.on_exportar_pdf)
+        area.addWidget(self.input_section)
+
+        # Results table
+        self.results_table = ResultsTableComponent(PERCENTUAIS)
+        self.results_table.dados_alterados.connect(self.on_dados_alterados)
+        area.addWidget(self.results_table)
+
+        # Chart abaixo da tabela
+        self.chart_section = ChartSectionComponent(CORES)
+        area.addWidget(self.chart_section)
+
+        self.dashboard = PortfolioDashboardComponent(self.portfolio)
+        self.dashboard.cliente_selected.connect(self.on_dashboard_client_selected)
+        self.portfolio.on_changed = self.dashboard.refresh
+        area.addWidget(self.dashboard)
+        
+        # Adicionar espaçador no final para não ficar apertado
+        area.addStretch()
+
+        scroll_area.setWidget(content_widget)
+        main_layout.addWidget(scroll_area, 1)
+
+    def on_client_selected(self, index: int):
+        self.current_client_index = index
+        self.load_client(index)
+
+    def on_dashboard_client_selected(self, index: int):
+        # limpar a busca se o cliente estiver filtrado na sidebar
+        row = self.sidebar.model.linha(index)
+        if row < 0:
+            self.sidebar.search.clear()
+            row = self.sidebar.model.linha(index)
+        self.sidebar.select_row(row, notify=False)
+        self.on_client_selected(index)
+
+    def on_client_created(self, client_data: Dict):
+        # selecionar último
+        self.current_client_index = self.repository.count() - 1
+        self.load_client(self.current_client_index)
+
+    def on_client_deleted(self, client_data: Dict):
+        self.persistence.forget_history(client_data)
+
+    def _registrar_historico(self, client: Dict, tipo: str):
+        # antes do repository.update, para o historico_id novo ir junto na gravação;
+        # o delta é calculado aqui e gravado pelo PersistenceWorker
+        try:
+            evento = self.history.prepare(client, tipo)
+        except Exception as e:
+            self.on_save_failed(f'histórico: {e}')
+            return
+        if evento is not None:
+            self.persistence.record_history(evento)
+
+    @traced()
+    def load_client(self, index: int):
+        try:
+            client = self.repository.get(index)
+        except Exception:
+            return
+
+        # Carregar percentuais, valor_total e valores_reais
+        percentuais = client.get('percentuais', PERCENTUAIS)
+        valor_total = client.get('valor_total', 0.0)
+        valores_reais = client.get('valores_reais', {k: 0.0 for k in percentuais.keys()})
+
+        # Atualizar UI
+        self.input_section.input_valor.setText(f"{valor_total:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.'))
+        if not self._carregar_tabela(percentuais, valor_total, valores_reais):
+            return
+        # atualizar gráfico com valores esperados + reais
+        try:
+            payload = {
+                'valores_reais': valores_reais,
+                'valores_esperados': money.dividir(valor_total, percentuais)
+            }
+            self.chart_section.atualizar_grafico(payload)
+        except Exception:
+            pass
+
+    def _carregar_tabela(self, percentuais: Dict, valor_total: float, valores_reais: Dict) -> bool:
+        """Mostra o cliente na tabela; com percentuais inválidos limpa a tabela e avisa"""
+        try:
+            self.results_table.load_data(percentuais, valor_total, valores_reais)
+            return True
+        except ValueError as e:
+            self.results_table.load_data({}, 0.0, {})
+            self.statusBar().showMessage(f'Percentuais inválidos neste cliente: {e}', 10000)
+            return False
+
+    @traced()
+    def on_calcular(self, valor_total: float):
+        # Recalcular valores esperados e salvar no cliente atual
+        if self.current_client_index < 0:
+            # Criar cliente padrão se nenhum existe
+            self.sidebar.insert_client('Cliente 1')
+            self.current_client_index = self.repository.count() - 1
+
+        client = self.repository.get(self.current_client_index)
+        client['valor_total'] = valor_total
+
+        # Calcular valores esperados
+        for cat, perc in client.get('percentuais', PERCENTUAIS).items():
+            # atualizar valores_reais somente se estiverem zerados
+            if 'valores_reais' not in client:
+                client['valores_reais'] = {k: 0.0 for k in client['percentuais'].keys()}
+            # não sobrescrever valores_reais aqui
+
+        self._registrar_historico(client, TIPO_CALCULO)
+
+        # Salvar (gravação adiada)
+        self.repository.update(self.current_client_index)
+
+        # Atualizar tabela
+        if not self._carregar_tabela(client.get('percentuais', PERCENTUAIS), valor_total,
+                                     client.get('valores_reais', {})):
+            return
+        try:
+            payload = {
+                'valores_reais': client.get('valores_reais', {}),
+                'valores_esperados': money.dividir(valor_total, client.get('percentuais', {}))
+            }
+            self.chart_section.atualizar_grafico(payload)
+        except Exception:
+            pass
+
+    @traced()
+    def on_dados_alterados(self, payload: Dict):
+        # Atualizar dados do cliente no storage
+        if self.current_client_index < 0:
+            return
+
+        client = self.repository.get(self.current_client_index)
+        client['valores_reais'] = payload.get('valores_reais', client.get('valores_reais', {}))
+        client['ultimo_total_real'] = payload.get('total_real', 0.0)
+        self._registrar_historico(client, TIPO_EDICAO)
+        self.repository.update(self.current_client_index)
+        # também atualizar gráfico com payload completo
+        try:
+            esperados = payload.get('valores_esperados') or money.dividir(client.get('valor_total', 0.0), client.get('percentuais', {}))
+            self.chart_section.atualizar_grafico({'valores_reais': client['valores_reais'], 'valores_esperados': esperados})
+        except Exception:
+            pass
+
+    def on_exportar_pdf(self):
+        """Exporta o cliente selecionado para PDF"""
+        if self.current_client_index < 0:
+            QMessageBox.warning(self, 'Aviso', 'Nenhum cliente selecionado!')
+            return
+        
+        try:
+            client = self.repository.get(self.current_client_index)
+            client_name = client.get('name', 'Cliente').replace(' ', '_')
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            default_filename = f"relatorio_{client_name}_{timestamp}.pdf"
+            
+            # Diálogo para escolher onde salvar
+            filename, _ = QFileDialog.getSaveFileName(
+                self,
+                'Salvar Relatório PDF',
+                default_filename,
+                'PDF Files (*.pdf)'
+            )
+            
+            if filename:
+                # Exportar para PDF (reportlab/matplotlib só são carregados aqui)
+                from src.utils.pdf_exporter import export_client_to_pdf
+                export_client_to_pdf(client, filename)
+                QMessageBox.information(self, 'Sucesso', f'Relatório exportado com sucesso!\n\n{filename}')
+        
+        except Exception as e:
+            QMessageBox.critical(self, 'Erro', f'Erro ao exportar PDF:\n{str(e)}')
+
+    def show_trace_panel(self):
+        if self.trace_panel is None:
+            from src.components.trace_panel import TracePanel
+            self.trace_panel = TracePanel(self)
+        self.trace_panel.show()
+        self.trace_panel.raise_()
+
+    def flush_pending(self):
+        """Grava no disco as alterações pendentes do repositório"""
+        self._save_timer.stop()
+        self.repository.flush()
+
+    def on_save_failed(self, message: str):
+        print(f"Erro ao salvar clientes: {message}")
+        self.statusBar().showMessage(f'Erro ao salvar alterações: {message}', 10000)
+
+    def closeEvent(self, event):
+        self.flush_pending()
+        self.persistence.stop()
+        close_history()
+        if tracing.ENABLED and tracing.TRACE_FILE:
+            try:
+                tracing.dump_chrome_trace(tracing.TRACE_FILE)
+            except OSError as e:
+                print(f"Erro ao gravar trace: {e}")
+        super().closeEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+
+
+__all__ = [
+    'MainWindow'
+]
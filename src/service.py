@@ -0,0 +1,367 @@
+"""
+Operações da calculadora sem interface gráfica e serviço HTTP/JSON local
+
+CalculadoraService reúne o que a janela faz (calcular a distribuição,
+criar/editar/excluir clientes, resumir e exportar o PDF) usando apenas
+CalculadoraCustos, storage e pdf_exporter: nada aqui importa o PySide6. É
+usada pela linha de comando (src.cli) e pelo servidor HTTP abaixo.
+
+O servidor usa o http.server da biblioteca padrão; cada conexão é atendida
+por um pool fixo de threads (as leituras e gravações passam pelos locks do
+storage) e os PDFs são renderizados num pool de processos separado, porque a
+renderização é CPU-bound e o pyplot não é thread-safe.
+
+Rotas (corpo e respostas em JSON, exceto o PDF):
+    POST   /calcular                {"valor_total": 1000, "percentuais": {...}}
+    GET    /clientes
+    POST   /clientes                {"name": "...", "valor_total": ...}
+    GET    /clientes/<posição>
+    PUT    /clientes/<posição>      campos a alterar
+    DELETE /clientes/<posição>
+    GET    /clientes/<posição>/resumo
+    GET    /clientes/<posição>/pdf
+
+Não rode o serviço ao mesmo tempo que o aplicativo sobre os mesmos dados: a
+janela mantém os clientes em memória e grava por cima.
+"""
+import json
+import math
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils import storage
+from src.utils.calculator import CalculadoraCustos
+from src.utils.constants import PERCENTUAIS
+from src.utils.summary import resumir_cliente
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+
+# Maior corpo de requisição aceito (bytes)
+MAX_CORPO = 1024 * 1024
+
+# Campos do cliente que podem ser alterados por atualizar()
+CAMPOS_EDITAVEIS = ('name', 'valor_total', 'percentuais', 'valores_reais')
+
+
+def _numero(valor: Any, campo: str) -> float:
+    """float(valor), recusando NaN e infinito (o json aceita os dois e eles quebrariam a conta em centavos)"""
+    numero = float(valor)
+    if not math.isfinite(numero):
+        raise ValueError(f'Valor inválido em {campo}: {valor!r}')
+    return numero
+
+
+class CalculadoraService:
+    """Operações sobre a calculadora e os clientes do storage, sem Qt"""
+
+    def __init__(self, percentuais: Optional[Dict[str, float]] = None, chart_backend: Optional[str] = None,
+                 pdf_workers: Optional[int] = None):
+        self.calculadora = CalculadoraCustos(dict(percentuais or PERCENTUAIS))
+        self.chart_backend = chart_backend
+        self.pdf_workers = pdf_workers
+        self._escrita = threading.Lock()
+        self._pdf_pool: Optional[ProcessPoolExecutor] = None
+        self._pdf_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Cálculo
+    # ------------------------------------------------------------------
+    def calcular(self, valor_total: float, percentuais: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        valor_total = _numero(valor_total, 'valor_total')
+        if percentuais:
+            calculadora = CalculadoraCustos({str(c): _numero(p, f'percentuais.{c}') for c, p in percentuais.items()})
+        else:
+            calculadora = self.calculadora
+        valores = calculadora.calcular(valor_total)
+        return {'valor_total': valor_total, 'percentuais': calculadora.percentuais, 'valores': valores}
+
+    # ------------------------------------------------------------------
+    # Clientes
+    # ------------------------------------------------------------------
+    def listar(self) -> List[Dict[str, Any]]:
+        return [{'posicao': posicao, 'name': client.get('name', ''), 'valor_total': client.get('valor_total', 0.0)}
+                for posicao, client in enumerate(storage.iter_clients())]
+
+    def obter(self, posicao: int) -> Dict[str, Any]:
+        return storage.get_client(posicao)
+
+    def criar(self, dados: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+        dados = dados or {}
+        client = storage.new_client(dados.get('name'))
+        client['percentuais'] = dict(self.calculadora.percentuais)
+        client['valores_reais'] = {categoria: 0.0 for categoria in client['percentuais']}
+        self._aplicar(client, dados)
+        with self._escrita:
+            storage.append_client(client)
+            return storage.count_clients() - 1, client
+
+    def atualizar(self, posicao: int, campos: Dict[str, Any]) -> Dict[str, Any]:
+        with self._escrita:
+            client = storage.get_client(posicao)
+            self._aplicar(client, campos)
+            storage.update_client(posicao, client)
+        return client
+
+    def excluir(self, posicao: int):
+        with self._escrita:
+            storage.delete_client(posicao)
+
+    @staticmethod
+    def _aplicar(client: Dict[str, Any], campos: Dict[str, Any]):
+        desconhecidos = set(campos) - set(CAMPOS_EDITAVEIS)
+        if desconhecidos:
+            raise ValueError(f"Campos não editáveis: {', '.join(sorted(desconhecidos))}")
+        if 'name' in campos:
+            client['name'] = str(campos['name'])
+        if 'valor_total' in campos:
+            valor_total = _numero(campos['valor_total'], 'valor_total')
+            if valor_total < 0:
+                raise ValueError('O valor total não pode ser negativo')
+            client['valor_total'] = valor_total
+        if 'percentuais' in campos:
+            percentuais = {str(c): _numero(p, f'percentuais.{c}') for c, p in campos['percentuais'].items()}
+            CalculadoraCustos(percentuais)  # valida a soma de 100%
+            client['percentuais'] = percentuais
+        if 'valores_reais' in campos:
+            client.setdefault('valores_reais', {}).update(
+                {str(c): _numero(v, f'valores_reais.{c}') for c, v in campos['valores_reais'].items()})
+
+    def resumo(self, posicao: int) -> Dict[str, Any]:
+        client = storage.get_client(posicao)
+        resumo = resumir_cliente(client)
+        return {
+            'posicao': posicao,
+            'name': client.get('name', ''),
+            'valor_total': resumo.valor_total,
+            'categorias': [{'categoria': linha.categoria, 'percentual': linha.percentual,
+                            'esperado': linha.esperado, 'real': linha.real, 'diferenca': linha.diferenca}
+                           for linha in resumo.linhas],
+            'total_esperado': resumo.total_esperado,
+            'total_real': resumo.total_real,
+            'total_diferenca': resumo.total_diferenca,
+            'lucro_esperado': resumo.lucro_esperado,
+            'lucro_real': resumo.lucro_real,
+            'lucro_diferenca': resumo.lucro_diferenca,
+        }
+
+    # ------------------------------------------------------------------
+    # PDF
+    # ------------------------------------------------------------------
+    def exportar_pdf(self, posicao: int, output_path: str) -> str:
+        """Grava o relatório do cliente em output_path (no próprio processo)"""
+        from src.utils.pdf_exporter import export_client_to_pdf
+
+        return export_client_to_pdf(storage.get_client(posicao), output_path, chart_backend=self.chart_backend)
+
+    def renderizar_pdf(self, posicao: int) -> bytes:
+        """Relatório do cliente em bytes, renderizado no pool de processos"""
+        client = storage.get_client(posicao)
+        with self._pdf_lock:
+            if self._pdf_pool is None:
+                self._pdf_pool = ProcessPoolExecutor(max_workers=self.pdf_workers, initializer=_init_pdf_worker)
+            pool = self._pdf_pool
+        return pool.submit(_render_pdf, client, self.chart_backend).result()
+
+    def close(self):
+        with self._pdf_lock:
+            if self._pdf_pool is not None:
+                self._pdf_pool.shutdown()
+                self._pdf_pool = None
+
+
+# Logo procurada uma vez por processo do pool de PDFs
+_worker_logo_path = None
+
+
+def _init_pdf_worker():
+    global _worker_logo_path
+    from src.utils.pdf_exporter import find_logo_path
+    _worker_logo_path = find_logo_path()
+
+
+def _render_pdf(client: Dict[str, Any], chart_backend: Optional[str]) -> bytes:
+    from src.utils.pdf_exporter import export_client_to_pdf
+
+    buffer = BytesIO()
+    export_client_to_pdf(client, buffer, logo_path=_worker_logo_path, chart_backend=chart_backend)
+    return buffer.getvalue()
+
+
+# ----------------------------------------------------------------------
+# HTTP
+# ----------------------------------------------------------------------
+class _RequestError(Exception):
+    def __init__(self, status: HTTPStatus, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'CalculadoraEventos'
+    # (método, padrão da rota, nome do método do handler)
+    rotas = [
+        ('POST', re.compile(r'/calcular'), '_calcular'),
+        ('GET', re.compile(r'/clientes'), '_listar'),
+        ('POST', re.compile(r'/clientes'), '_criar'),
+        ('GET', re.compile(r'/clientes/(\d+)'), '_obter'),
+        ('PUT', re.compile(r'/clientes/(\d+)'), '_atualizar'),
+        ('DELETE', re.compile(r'/clientes/(\d+)'), '_excluir'),
+        ('GET', re.compile(r'/clientes/(\d+)/resumo'), '_resumo'),
+        ('GET', re.compile(r'/clientes/(\d+)/pdf'), '_pdf'),
+    ]
+
+    @property
+    def service(self) -> CalculadoraService:
+        return self.server.service
+
+    def do_GET(self):
+        self._despachar('GET')
+
+    def do_POST(self):
+        self._despachar('POST')
+
+    def do_PUT(self):
+        self._despachar('PUT')
+
+    def do_DELETE(self):
+        self._despachar('DELETE')
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _despachar(self, metodo: str):
+        caminho = self.path.split('?', 1)[0].rstrip('/') or '/'
+        permitidos = []
+        for rota_metodo, padrao, nome in self.rotas:
+            encontrado = padrao.fullmatch(caminho)
+            if encontrado is None:
+                continue
+            if rota_metodo != metodo:
+                permitidos.append(rota_metodo)
+                continue
+            try:
+                getattr(self, nome)(*(int(g) for g in encontrado.groups()))
+            except _RequestError as e:
+                self._json({'erro': str(e)}, e.status)
+            except IndexError:
+                self._json({'erro': 'Cliente não encontrado'}, HTTPStatus.NOT_FOUND)
+            except (ValueError, TypeError, AttributeError) as e:
+                self._json({'erro': str(e)}, HTTPStatus.BAD_REQUEST)
+            except Exception as e:
+                self.log_error('%s', f'{type(e).__name__}: {e}')
+                self._json({'erro': 'Erro interno'}, HTTPStatus.INTERNAL_SERVER_ERROR)
+            return
+        if permitidos:
+            self._json({'erro': f'Método não permitido (use {", ".join(permitidos)})'},
+                       HTTPStatus.METHOD_NOT_ALLOWED, {'Allow': ', '.join(permitidos)})
+        else:
+            self._json({'erro': 'Rota não encontrada'}, HTTPStatus.NOT_FOUND)
+
+    def _corpo(self) -> Dict[str, Any]:
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        if tamanho > MAX_CORPO:
+            raise _RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Corpo da requisição muito grande')
+        if tamanho == 0:
+            return {}
+        try:
+            dados = json.loads(self.rfile.read(tamanho))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise _RequestError(HTTPStatus.BAD_REQUEST, 'JSON inválido') from None
+        if not isinstance(dados, dict):
+            raise _RequestError(HTTPStatus.BAD_REQUEST, 'O corpo deve ser um objeto JSON')
+        return dados
+
+    def _enviar(self, corpo: bytes, tipo: str, status: HTTPStatus = HTTPStatus.OK,
+                cabecalhos: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _json(self, dados: Any, status: HTTPStatus = HTTPStatus.OK, cabecalhos: Optional[Dict[str, str]] = None):
+        self._enviar(json.dumps(dados, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8',
+                     status, cabecalhos)
+
+    # Rotas
+    def _calcular(self):
+        dados = self._corpo()
+        if 'valor_total' not in dados:
+            raise ValueError("Informe 'valor_total'")
+        self._json(self.service.calcular(dados['valor_total'], dados.get('percentuais')))
+
+    def _listar(self):
+        self._json(self.service.listar())
+
+    def _criar(self):
+        posicao, client = self.service.criar(self._corpo())
+        self._json({'posicao': posicao, 'cliente': client}, HTTPStatus.CREATED)
+
+    def _obter(self, posicao: int):
+        self._json(self.service.obter(posicao))
+
+    def _atualizar(self, posicao: int):
+        self._json(self.service.atualizar(posicao, self._corpo()))
+
+    def _excluir(self, posicao: int):
+        self.service.excluir(posicao)
+        self._json({'excluido': posicao})
+
+    def _resumo(self, posicao: int):
+        self._json(self.service.resumo(posicao))
+
+    def _pdf(self, posicao: int):
+        pdf = self.service.renderizar_pdf(posicao)
+        self._enviar(pdf, 'application/pdf',
+                     cabecalhos={'Content-Disposition': f'attachment; filename="relatorio_{posicao}.pdf"'})
+
+
+class CalculadoraHTTPServer(HTTPServer):
+    """HTTPServer que atende as conexões num pool fixo de threads"""
+
+    def __init__(self, endereco: Tuple[str, int], service: CalculadoraService,
+                 workers: int = DEFAULT_WORKERS, quiet: bool = False):
+        super().__init__(endereco, _Handler)
+        self.service = service
+        self.quiet = quiet
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='calculadora-http')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._processar, request, client_address)
+
+    def _processar(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+        self.service.close()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS,
+          service: Optional[CalculadoraService] = None, quiet: bool = False):
+    """Sobe o servidor e atende até Ctrl+C"""
+    server = CalculadoraHTTPServer((host, port), service or CalculadoraService(), workers, quiet)
+    host, port = server.server_address[:2]
+    print(f'Servindo em http://{host}:{port} ({workers} workers) - Ctrl+C para parar')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,168 @@
+"""
+Exportação de relatórios PDF de vários clientes em paralelo
+
+A renderização (gráficos matplotlib + layout reportlab) é CPU-bound, então
+cada relatório é gerado em um processo separado de um ProcessPoolExecutor.
+
+Uso pela linha de comando (não carrega o PySide6):
+    python -m src.utils.batch_export --saida relatorios/
+    python -m src.utils.batch_export --saida relatorios/ --ids 0 3 5 --combinado todos.pdf
+    python -m src.utils.batch_export --saida relatorios/ --filtro "casamento" --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.storage import load_all_clients
+
+
+@dataclass
+class BatchExportResult:
+    """Resultado de uma exportação em lote"""
+    arquivos: Dict[int, str] = field(default_factory=dict)
+    falhas: Dict[int, str] = field(default_factory=dict)
+    combinado: Optional[str] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.arquivos) + len(self.falhas)
+
+
+def select_clients(clients: List[Dict], indices: Optional[Iterable[int]] = None,
+                   filtro: Optional[str] = None) -> List[Tuple[int, Dict]]:
+    """Seleciona clientes por posição e/ou por trecho do nome (sem diferenciar maiúsculas)"""
+    if indices is not None:
+        selecionados = [(i, clients[i]) for i in indices if 0 <= i < len(clients)]
+    else:
+        selecionados = list(enumerate(clients))
+    if filtro:
+        filtro = filtro.lower()
+        selecionados = [(i, c) for i, c in selecionados if filtro in c.get('name', '').lower()]
+    return selecionados
+
+
+def report_filename(index: int, client: Dict) -> str:
+    nome = re.sub(r'[^\w\-]+', '_', client.get('name', 'Cliente'), flags=re.UNICODE).strip('_') or 'Cliente'
+    return f"relatorio_{index:05d}_{nome}.pdf"
+
+
+# Logo procurada uma vez por processo (ver _init_worker)
+_worker_logo_path = None
+
+
+def _init_worker():
+    global _worker_logo_path
+    from src.utils.pdf_exporter import find_logo_path
+    _worker_logo_path = find_logo_path()
+
+
+def _export_job(index: int, client: Dict, output_path: str,
+                chart_backend: Optional[str] = None) -> Tuple[int, str, Optional[str]]:
+    from src.utils.pdf_exporter import export_client_to_pdf
+    try:
+        export_client_to_pdf(client, output_path, logo_path=_worker_logo_path, chart_backend=chart_backend)
+        return index, output_path, None
+    except Exception as e:
+        return index, output_path, f'{type(e).__name__}: {e}'
+
+
+def _pdf_writer():
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise RuntimeError('O PDF combinado precisa do pypdf (pip install -r requirements.txt)') from None
+    return PdfWriter
+
+
+def _merge_pdfs(paths: List[str], output_path: str):
+    """Junta os PDFs já gerados pelos workers, na ordem de `paths`"""
+    writer = _pdf_writer()()
+    for path in paths:
+        writer.append(path)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+
+
+def export_clients_batch(clients: List[Tuple[int, Dict]], output_dir: str, workers: Optional[int] = None,
+                         progress: Optional[Callable[[int, int, int, Optional[str]], None]] = None,
+                         combined_path: Optional[str] = None,
+                         chart_backend: Optional[str] = None) -> BatchExportResult:
+    """Exporta um PDF por cliente em paralelo.
+
+    clients: pares (índice, cliente), como retornado por select_clients.
+    progress: chamado a cada relatório concluído com (concluídos, total, índice, erro).
+    combined_path: se informado, junta também os relatórios gerados em um PDF único (requer pypdf).
+    chart_backend: 'matplotlib' ou 'reportlab' (ver pdf_exporter.CHART_BACKEND).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    result = BatchExportResult()
+    total = len(clients)
+    if total == 0:
+        return result
+    if combined_path:
+        # falhar antes de renderizar tudo, não depois
+        _pdf_writer()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(_export_job, index, client, os.path.join(output_dir, report_filename(index, client)),
+                        chart_backend)
+            for index, client in clients
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            index, path, erro = future.result()
+            if erro is None:
+                result.arquivos[index] = path
+            else:
+                result.falhas[index] = erro
+            if progress is not None:
+                progress(done, total, index, erro)
+
+    if combined_path:
+        ok = [result.arquivos[index] for index, _ in clients if index in result.arquivos]
+        if ok:
+            _merge_pdfs(ok, combined_path)
+            result.combinado = combined_path
+
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Exporta relatórios PDF de vários clientes em paralelo')
+    parser.add_argument('--saida', required=True, help='diretório onde os PDFs serão gravados')
+    parser.add_argument('--ids', type=int, nargs='*', help='posições dos clientes (padrão: todos)')
+    parser.add_argument('--filtro', help='exportar apenas clientes cujo nome contém este texto')
+    parser.add_argument('--workers', type=int, default=None, help='processos em paralelo (padrão: nº de CPUs)')
+    parser.add_argument('--combinado', help='gera também um PDF único com todos os relatórios')
+    parser.add_argument('--graficos', choices=['matplotlib', 'reportlab'], default=None,
+                        help='backend dos gráficos (reportlab = vetorial, mais rápido)')
+    args = parser.parse_args(argv)
+
+    clients = select_clients(load_all_clients().get('clients', []), args.ids, args.filtro)
+    if not clients:
+        print('Nenhum cliente selecionado')
+        return 1
+
+    def progress(done, total, index, erro):
+        status = 'ok' if erro is None else f'ERRO: {erro}'
+        print(f'[{done}/{total}] cliente {index}: {status}')
+
+    try:
+        result = export_clients_batch(clients, args.saida, args.workers, progress, args.combinado, args.graficos)
+    except RuntimeError as e:
+        print(f'Erro: {e}', file=sys.stderr)
+        return 1
+    print(f'{len(result.arquivos)} relatórios gerados, {len(result.falhas)} falhas')
+    if result.combinado:
+        print(f'PDF combinado: {result.combinado}')
+    return 1 if result.falhas else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
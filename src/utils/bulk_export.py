@@ -0,0 +1,305 @@
+"""
+Exportação em massa de todos os clientes para CSV ou arquivos colunares
+
+Cada cliente é lido do repositório, resumido (summary.resumir_cliente, a mesma
+conta do relatório PDF) e gravado na hora, um de cada vez: a memória usada não
+depende de quantos clientes existem.
+
+Formatos:
+    csv    texto, uma linha por cliente x categoria (ou por cliente, com
+           --nivel cliente)
+    npy    diretório com uma coluna por arquivo .npy (valores em centavos
+           int64), que pode ser aberto com np.load(..., mmap_mode='r') sem
+           carregar tudo na memória; ver load_columnar()
+    arrow  arquivo Arrow IPC (precisa do pyarrow instalado)
+
+Uso pela linha de comando (não carrega o PySide6):
+    python -m src.utils.bulk_export --formato csv --saida clientes.csv
+    python -m src.utils.bulk_export --formato csv --nivel cliente --saida resumo.csv
+    python -m src.utils.bulk_export --formato npy --saida clientes_npy/
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils import storage
+from src.utils.summary import ResumoCliente, resumir_cliente
+
+FORMATOS = ('csv', 'npy', 'arrow')
+NIVEIS = ('categoria', 'cliente')
+
+COLUNAS_CATEGORIA = ['posicao', 'cliente', 'valor_total', 'categoria', 'percentual',
+                     'esperado', 'real', 'diferenca']
+COLUNAS_CLIENTE = ['posicao', 'cliente', 'valor_total', 'total_esperado', 'total_real', 'total_diferenca',
+                   'lucro_esperado', 'lucro_real', 'lucro_diferenca']
+
+# Linhas acumuladas antes de cada gravação nos formatos colunares
+TAMANHO_BLOCO = 8192
+
+# Colunas do formato npy: nome -> dtype
+_NPY_CATEGORIA = {'cliente': 'i4', 'categoria': 'i4', 'percentual': 'f8',
+                  'esperado': 'i8', 'real': 'i8', 'diferenca': 'i8'}
+_NPY_CLIENTE = {'valor_total': 'i8', 'total_esperado': 'i8', 'total_real': 'i8',
+                'lucro_esperado': 'i8', 'lucro_real': 'i8'}
+
+
+@dataclass
+class BulkExportResult:
+    """Resultado de uma exportação em massa"""
+    formato: str
+    saida: str
+    clientes: int = 0
+    linhas: int = 0
+    arquivos: List[str] = field(default_factory=list)
+
+
+def iter_resumos(clients: Optional[Iterable[Dict[str, Any]]] = None) -> Iterator[Tuple[int, str, ResumoCliente]]:
+    """(posição, nome, resumo) de cada cliente; por padrão percorre o repositório"""
+    if clients is None:
+        clients = storage.iter_clients()
+    for posicao, client in enumerate(clients):
+        yield posicao, client.get('name', ''), resumir_cliente(client)
+
+
+def _valor(centavos: int) -> str:
+    # texto com ponto decimal e sem float intermediário (-1234 -> '-12.34')
+    sinal = '-' if centavos < 0 else ''
+    reais, cents = divmod(abs(centavos), 100)
+    return f'{sinal}{reais}.{cents:02d}'
+
+
+# ----------------------------------------------------------------------
+# CSV
+# ----------------------------------------------------------------------
+def write_csv(path: str, resumos: Iterable[Tuple[int, str, ResumoCliente]], nivel: str = 'categoria',
+              delimiter: str = ',') -> BulkExportResult:
+    """Grava o CSV linha a linha; valores em reais com ponto decimal"""
+    result = BulkExportResult('csv', path, arquivos=[path])
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        if nivel == 'cliente':
+            writer.writerow(COLUNAS_CLIENTE)
+            for posicao, nome, resumo in resumos:
+                writer.writerow([posicao, nome, _valor(resumo.valor_total_centavos),
+                                 _valor(resumo.total_esperado_centavos), _valor(resumo.total_real_centavos),
+                                 _valor(resumo.total_diferenca_centavos),
+                                 _valor(resumo.lucro_esperado_centavos), _valor(resumo.lucro_real_centavos),
+                                 _valor(resumo.lucro_diferenca_centavos)])
+                result.clientes += 1
+                result.linhas += 1
+        else:
+            writer.writerow(COLUNAS_CATEGORIA)
+            for posicao, nome, resumo in resumos:
+                total = _valor(resumo.valor_total_centavos)
+                writer.writerows([posicao, nome, total, linha.categoria, linha.percentual,
+                                  _valor(linha.esperado_centavos), _valor(linha.real_centavos),
+                                  _valor(linha.diferenca_centavos)]
+                                 for linha in resumo.linhas)
+                result.clientes += 1
+                result.linhas += len(resumo.linhas)
+    return result
+
+
+# ----------------------------------------------------------------------
+# Diretório de colunas .npy
+# ----------------------------------------------------------------------
+class _ColunaNpy:
+    """Coluna gravada em blocos num arquivo bruto e convertida em .npy no final"""
+
+    def __init__(self, path: str, dtype: str):
+        import numpy as np
+
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.linhas = 0
+        self._buffer: List[Any] = []
+        self._bruto = open(path + '.part', 'wb')
+
+    def append(self, valor):
+        self._buffer.append(valor)
+        if len(self._buffer) >= TAMANHO_BLOCO:
+            self.flush()
+
+    def extend(self, valores):
+        self._buffer.extend(valores)
+        if len(self._buffer) >= TAMANHO_BLOCO:
+            self.flush()
+
+    def flush(self):
+        import numpy as np
+
+        if self._buffer:
+            np.asarray(self._buffer, dtype=self.dtype).tofile(self._bruto)
+            self.linhas += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        """Escreve o cabeçalho .npy e copia os dados brutos atrás dele"""
+        import numpy as np
+
+        self.flush()
+        self._bruto.close()
+        with open(self.path, 'wb') as f, open(self.path + '.part', 'rb') as bruto:
+            np.lib.format.write_array_header_1_0(
+                f, {'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                    'shape': (self.linhas,)})
+            shutil.copyfileobj(bruto, f, 1024 * 1024)
+        os.remove(self.path + '.part')
+
+    def discard(self):
+        self._bruto.close()
+        if os.path.exists(self.path + '.part'):
+            os.remove(self.path + '.part')
+
+
+def write_npy(diretorio: str, resumos: Iterable[Tuple[int, str, ResumoCliente]]) -> BulkExportResult:
+    """Grava o diretório colunar.
+
+    linhas_<coluna>.npy: uma entrada por cliente x categoria (cliente é a
+    posição do cliente, categoria o índice em categorias.json);
+    clientes_<coluna>.npy: uma entrada por cliente. Valores em centavos.
+    Os nomes ficam em nomes.jsonl (um por linha, na ordem das posições).
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    result = BulkExportResult('npy', diretorio)
+    colunas = {f'linhas_{nome}': _ColunaNpy(os.path.join(diretorio, f'linhas_{nome}.npy'), dtype)
+               for nome, dtype in _NPY_CATEGORIA.items()}
+    colunas.update({f'clientes_{nome}': _ColunaNpy(os.path.join(diretorio, f'clientes_{nome}.npy'), dtype)
+                    for nome, dtype in _NPY_CLIENTE.items()})
+    categorias: Dict[str, int] = {}
+    try:
+        with open(os.path.join(diretorio, 'nomes.jsonl'), 'w', encoding='utf-8') as nomes:
+            for posicao, nome, resumo in resumos:
+                nomes.write(json.dumps(nome, ensure_ascii=False) + '\n')
+                linhas = resumo.linhas
+                colunas['linhas_cliente'].extend([posicao] * len(linhas))
+                colunas['linhas_categoria'].extend(
+                    [categorias.setdefault(linha.categoria, len(categorias)) for linha in linhas])
+                colunas['linhas_percentual'].extend([linha.percentual for linha in linhas])
+                colunas['linhas_esperado'].extend([linha.esperado_centavos for linha in linhas])
+                colunas['linhas_real'].extend([linha.real_centavos for linha in linhas])
+                colunas['linhas_diferenca'].extend([linha.diferenca_centavos for linha in linhas])
+                colunas['clientes_valor_total'].append(resumo.valor_total_centavos)
+                colunas['clientes_total_esperado'].append(resumo.total_esperado_centavos)
+                colunas['clientes_total_real'].append(resumo.total_real_centavos)
+                colunas['clientes_lucro_esperado'].append(resumo.lucro_esperado_centavos)
+                colunas['clientes_lucro_real'].append(resumo.lucro_real_centavos)
+                result.clientes += 1
+                result.linhas += len(linhas)
+        for coluna in colunas.values():
+            coluna.close()
+    except BaseException:
+        for coluna in colunas.values():
+            coluna.discard()
+        raise
+
+    with open(os.path.join(diretorio, 'categorias.json'), 'w', encoding='utf-8') as f:
+        json.dump(list(categorias), f, ensure_ascii=False)
+    with open(os.path.join(diretorio, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'clientes': result.clientes, 'linhas': result.linhas, 'unidade': 'centavos',
+                   'colunas': sorted(colunas)}, f, ensure_ascii=False, indent=2)
+    result.arquivos = [coluna.path for coluna in colunas.values()] + [
+        os.path.join(diretorio, nome) for nome in ('nomes.jsonl', 'categorias.json', 'meta.json')]
+    return result
+
+
+def load_columnar(diretorio: str, mmap: bool = True) -> Dict[str, Any]:
+    """Abre um diretório gravado por write_npy.
+
+    Retorna {coluna: array} (mapeados em memória por padrão) mais
+    'categorias' (lista de nomes, na ordem dos códigos) e 'meta'. Os nomes dos
+    clientes não são carregados; leia nomes.jsonl se precisar deles.
+    """
+    import numpy as np
+
+    with open(os.path.join(diretorio, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    with open(os.path.join(diretorio, 'categorias.json'), encoding='utf-8') as f:
+        dados: Dict[str, Any] = {'categorias': json.load(f), 'meta': meta}
+    for coluna in meta['colunas']:
+        dados[coluna] = np.load(os.path.join(diretorio, f'{coluna}.npy'), mmap_mode='r' if mmap else None)
+    return dados
+
+
+# ----------------------------------------------------------------------
+# Arrow IPC (opcional)
+# ----------------------------------------------------------------------
+def write_arrow(path: str, resumos: Iterable[Tuple[int, str, ResumoCliente]]) -> BulkExportResult:
+    """Grava um arquivo Arrow IPC (um record batch a cada TAMANHO_BLOCO linhas), nível categoria"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError('O formato arrow precisa do pyarrow (pip install pyarrow)') from None
+
+    schema = pa.schema([('posicao', pa.int32()), ('cliente', pa.string()), ('valor_total', pa.int64()),
+                        ('categoria', pa.string()), ('percentual', pa.float64()), ('esperado', pa.int64()),
+                        ('real', pa.int64()), ('diferenca', pa.int64())])
+    schema = schema.with_metadata({'unidade': 'centavos'})
+    result = BulkExportResult('arrow', path, arquivos=[path])
+    bloco: Dict[str, List[Any]] = {nome: [] for nome in schema.names}
+
+    def gravar(writer):
+        writer.write_batch(pa.record_batch([pa.array(bloco[n], type=schema.field(n).type) for n in schema.names],
+                                           schema=schema))
+        for valores in bloco.values():
+            valores.clear()
+
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for posicao, nome, resumo in resumos:
+            for linha in resumo.linhas:
+                bloco['posicao'].append(posicao)
+                bloco['cliente'].append(nome)
+                bloco['valor_total'].append(resumo.valor_total_centavos)
+                bloco['categoria'].append(linha.categoria)
+                bloco['percentual'].append(linha.percentual)
+                bloco['esperado'].append(linha.esperado_centavos)
+                bloco['real'].append(linha.real_centavos)
+                bloco['diferenca'].append(linha.diferenca_centavos)
+            result.clientes += 1
+            result.linhas += len(resumo.linhas)
+            if len(bloco['posicao']) >= TAMANHO_BLOCO:
+                gravar(writer)
+        if bloco['posicao']:
+            gravar(writer)
+    return result
+
+
+def export_all(saida: str, formato: str = 'csv', nivel: str = 'categoria',
+               clients: Optional[Iterable[Dict[str, Any]]] = None) -> BulkExportResult:
+    """Exporta todos os clientes (ou os de `clients`) no formato pedido"""
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato desconhecido: {formato!r} (use {", ".join(FORMATOS)})')
+    if nivel not in NIVEIS:
+        raise ValueError(f'Nível desconhecido: {nivel!r} (use {", ".join(NIVEIS)})')
+    resumos = iter_resumos(clients)
+    if formato == 'csv':
+        return write_csv(saida, resumos, nivel)
+    if formato == 'npy':
+        return write_npy(saida, resumos)
+    return write_arrow(saida, resumos)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Exporta todos os clientes para CSV ou arquivos colunares')
+    parser.add_argument('--saida', required=True, help='arquivo (csv/arrow) ou diretório (npy) de saída')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    parser.add_argument('--nivel', choices=NIVEIS, default='categoria',
+                        help='csv: uma linha por cliente x categoria ou uma por cliente')
+    args = parser.parse_args(argv)
+
+    try:
+        result = export_all(args.saida, args.formato, args.nivel)
+    except RuntimeError as e:
+        print(e)
+        return 1
+    print(f'{result.clientes} clientes, {result.linhas} linhas exportadas em {result.saida}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,28 +1,72 @@
-from typing import Dict
+from typing import Dict, Iterable, List
+
+from src.utils import money
 
 
 class CalculadoraCustos:
     def __init__(self, percentuais: Dict[str, float]):
         self.percentuais = percentuais
         self._validar_percentuais()
-    
+
     def _validar_percentuais(self):
-        total = sum(self.percentuais.values())
-        if abs(total - 100) > 0.01:
-            raise ValueError(f"A soma dos percentuais deve ser 100%, não {total}%")
-    
+        # mesma validação de toda divisão do núcleo em centavos
+        money.validar_percentuais(self.percentuais)
+
+    @property
+    def categorias(self) -> List[str]:
+        """Ordem das colunas retornadas por calcular_lote"""
+        return list(self.percentuais.keys())
+
     def calcular(self, valor_total: float) -> Dict[str, float]:
         if valor_total < 0:
             raise ValueError("O valor total não pode ser negativo")
-        
-        valores = {}
-        for categoria, percentual in self.percentuais.items():
-            valores[categoria] = valor_total * (percentual / 100)
-        
-        return valores
-    
+
+        # em centavos, pelo maior resto: as categorias somam exatamente o total
+        return money.dividir(valor_total, self.percentuais)
+
+    def calcular_centavos(self, valor_total: float) -> Dict[str, int]:
+        if valor_total < 0:
+            raise ValueError("O valor total não pode ser negativo")
+        return money.dividir_centavos(money.to_cents(valor_total), self.percentuais)
+
+    def calcular_lote_centavos(self, valores_totais: Iterable[float]):
+        """Distribui vários valores totais de uma vez, em centavos.
+
+        Retorna um array int64 (eventos x categorias), com as colunas na ordem
+        de self.categorias; cada linha é igual a calcular_centavos() do total.
+        """
+        totais = money.to_cents_lote(valores_totais).reshape(-1)
+        if (totais < 0).any():
+            raise ValueError("O valor total não pode ser negativo")
+        return money.dividir_lote_centavos(totais, self.percentuais)
+
+    def calcular_lote(self, valores_totais: Iterable[float]):
+        """Como calcular_lote_centavos, em reais (array float)"""
+        return self.calcular_lote_centavos(valores_totais) / 100
+
+    def varrer_cenarios(self, totais: Iterable[float], variacoes: Dict[str, Iterable[float]],
+                        restante: str = 'Lucro', **kwargs):
+        """Atalho para scenarios.ScenarioSweep(...).run(**kwargs) sobre esta tabela"""
+        from src.utils.scenarios import ScenarioSweep
+
+        sweep = ScenarioSweep(self, list(totais), {c: list(v) for c, v in variacoes.items()}, restante)
+        return sweep.run(**kwargs)
+
     def formatar_moeda(self, valor: float) -> str:
-        return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
-    
+        # agrupamento com '_' (1_234.56): duas trocas em vez de três
+        return f"R$ {valor:_.2f}".replace('.', ',').replace('_', '.')
+
+    def formatar_moeda_lote(self, valores):
+        """Formata um array (ex: saída de calcular_lote) mantendo o formato"""
+        import numpy as np
+
+        valores = np.asarray(valores, dtype=float)
+        if valores.size == 0:
+            return np.empty(valores.shape, dtype=object)
+        # trocas de separador feitas uma vez só no texto concatenado
+        texto = '\n'.join([f"R$ {valor:_.2f}" for valor in valores.ravel().tolist()])
+        textos = texto.replace('.', ',').replace('_', '.').split('\n')
+        return np.array(textos, dtype=object).reshape(valores.shape)
+
     def obter_percentual(self, categoria: str) -> float:
         return self.percentuais.get(categoria, 0)
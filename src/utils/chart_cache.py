@@ -0,0 +1,145 @@
+"""
+Cache das imagens de gráficos do PDF, endereçado pelo conteúdo
+
+A chave é um hash dos dados de entrada, do tipo de gráfico, do tamanho e do
+dpi; se o cliente não mudou, a imagem é reaproveitada sem chamar o
+matplotlib. Há uma camada LRU em memória e uma camada opcional em disco
+(CALCULADORA_CHART_CACHE=<diretório>) com limite de tamanho.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Itens mantidos na camada em memória
+MEMORY_ITEMS = 256
+# Tamanho máximo da camada em disco
+DISK_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ChartCache:
+    """LRU em memória + diretório opcional em disco com despejo por tamanho"""
+
+    def __init__(self, max_items: int = MEMORY_ITEMS, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = DISK_MAX_BYTES):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    @staticmethod
+    def make_key(chart_type: str, *dados: Dict[str, float], size=None, dpi=None) -> str:
+        payload = json.dumps([chart_type, size, dpi, dados], ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.png')
+
+    def _disk_entries(self):
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and entry.name.endswith('.png'):
+                st = entry.stat()
+                yield entry.path, st.st_size, st.st_mtime
+
+    def _evict_disk(self):
+        if self._disk_bytes <= self.disk_max_bytes:
+            return
+        # remover os menos usados (mtime é atualizado a cada acerto)
+        for path, size, _ in sorted(self._disk_entries(), key=lambda e: e[2]):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._disk_bytes -= size
+            if self._disk_bytes <= self.disk_max_bytes:
+                break
+
+    def _remember(self, key: str, data: bytes):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            if self.disk_dir:
+                path = self._disk_path(key)
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                    os.utime(path)
+                except OSError:
+                    data = None
+                if data is not None:
+                    self._remember(key, data)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return data
+            self.misses += 1
+            return None
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            self._remember(key, data)
+            if not self.disk_dir:
+                return
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                return
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.disk_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._disk_bytes += len(data)
+            self._evict_disk()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.disk_dir:
+                for path, _, _ in list(self._disk_entries()):
+                    os.remove(path)
+                self._disk_bytes = 0
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'memory_items': len(self._memory),
+                'disk_bytes': self._disk_bytes,
+            }
+
+
+_cache = None
+
+
+def get_chart_cache() -> ChartCache:
+    """Cache usado pelo pdf_exporter (criado na primeira chamada)"""
+    global _cache
+    if _cache is None:
+        _cache = ChartCache(disk_dir=os.environ.get('CALCULADORA_CHART_CACHE') or None)
+    return _cache
+
+
+def set_chart_cache(cache: ChartCache):
+    global _cache
+    _cache = cache
@@ -0,0 +1,399 @@
+"""
+Histórico dos clientes: deltas com data, checkpoints e resumos por dia/mês
+
+Cada cálculo e cada edição do cliente vira um evento pequeno com só o que
+mudou (ex: {'valor_total': 18000.0} ou {'valores_reais': {'CMV': 5200.0}}),
+gravado num banco SQLite próprio (historico.db), fora do cliente: carregar um
+cliente continua custando o mesmo com anos de edições, e o histórico só é
+lido quando pedido.
+
+A cada CHECKPOINT_INTERVAL eventos o estado completo é guardado como
+checkpoint; state_at() parte do último checkpoint antes da data pedida e
+reaplica apenas os eventos seguintes. Os resumos diários e mensais (último
+valor total, total real, lucro, quantidade de eventos) são atualizados a cada
+evento. Eventos e resumos diários mais antigos que RETENCAO_DIAS são
+descartados até o checkpoint mais recente fora do prazo; os resumos mensais
+são mantidos.
+
+O cliente é ligado ao histórico pelo campo 'historico_id', criado no
+primeiro registro e salvo junto com o cliente.
+
+record() calcula o delta e grava na hora. A interface separa as duas etapas:
+prepare() calcula o delta na thread principal (só memória, mais a leitura do
+último estado na primeira vez que o cliente aparece) e write() grava o evento
+no PersistenceWorker, em segundo plano, assim como a limpeza por retenção.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.sqlite_storage import _SYNCHRONOUS, _Transaction
+from src.utils.storage import DATA_DIR, DURABILITY
+from src.utils.summary import resumir_cliente
+
+HISTORY_DB = os.path.join(DATA_DIR, 'historico.db')
+
+# Eventos entre dois checkpoints (limita a reconstrução de um estado)
+CHECKPOINT_INTERVAL = 50
+
+# Dias de eventos guardados (CALCULADORA_HISTORICO_DIAS); 0 = sem limite
+RETENCAO_DIAS = int(os.environ.get('CALCULADORA_HISTORICO_DIAS', '730'))
+
+# Registros entre duas limpezas por retenção
+PRUNE_EVERY = 1000
+
+# Campos do cliente acompanhados pelo histórico
+CAMPOS = ('name', 'valor_total', 'percentuais', 'valores_reais')
+
+TIPO_CALCULO = 'calculo'
+TIPO_EDICAO = 'edicao'
+
+PERIODOS = ('dia', 'mes')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    chave TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    tipo TEXT NOT NULL,
+    delta TEXT NOT NULL,
+    PRIMARY KEY (chave, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    chave TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    estado TEXT NOT NULL,
+    PRIMARY KEY (chave, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS atual (
+    chave TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    checkpoint_seq INTEGER NOT NULL,
+    estado TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rollups (
+    chave TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    inicio TEXT NOT NULL,
+    eventos INTEGER NOT NULL,
+    calculos INTEGER NOT NULL,
+    edicoes INTEGER NOT NULL,
+    primeiro_ts REAL NOT NULL,
+    ultimo_ts REAL NOT NULL,
+    valor_total REAL NOT NULL,
+    valor_total_min REAL NOT NULL,
+    valor_total_max REAL NOT NULL,
+    total_real REAL NOT NULL,
+    lucro_esperado REAL NOT NULL,
+    lucro_real REAL NOT NULL,
+    PRIMARY KEY (chave, periodo, inicio)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_ROLLUP = """
+INSERT INTO rollups (chave, periodo, inicio, eventos, calculos, edicoes, primeiro_ts, ultimo_ts,
+                     valor_total, valor_total_min, valor_total_max, total_real, lucro_esperado, lucro_real)
+VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (chave, periodo, inicio) DO UPDATE SET
+    eventos = eventos + 1,
+    calculos = calculos + excluded.calculos,
+    edicoes = edicoes + excluded.edicoes,
+    ultimo_ts = excluded.ultimo_ts,
+    valor_total = excluded.valor_total,
+    valor_total_min = MIN(valor_total_min, excluded.valor_total),
+    valor_total_max = MAX(valor_total_max, excluded.valor_total),
+    total_real = excluded.total_real,
+    lucro_esperado = excluded.lucro_esperado,
+    lucro_real = excluded.lucro_real
+"""
+
+
+def history_key(client: Dict[str, Any]) -> str:
+    """Chave do cliente no histórico (criada na primeira vez)"""
+    chave = client.get('historico_id')
+    if not chave:
+        chave = client['historico_id'] = uuid.uuid4().hex
+    return chave
+
+
+def estado_do_cliente(client: Dict[str, Any]) -> Dict[str, Any]:
+    """Parte do cliente acompanhada pelo histórico (cópia)"""
+    estado = {}
+    for campo in CAMPOS:
+        if campo in client:
+            valor = client[campo]
+            estado[campo] = dict(valor) if isinstance(valor, dict) else valor
+    return estado
+
+
+def diff(anterior: Dict[str, Any], novo: Dict[str, Any]) -> Dict[str, Any]:
+    """Delta de anterior para novo.
+
+    Campos simples entram com o valor novo; nos dicionários (percentuais,
+    valores_reais) só as categorias alteradas, e as removidas em '-campo'.
+    """
+    delta: Dict[str, Any] = {}
+    for campo, valor in novo.items():
+        antes = anterior.get(campo)
+        if isinstance(valor, dict) and isinstance(antes, dict):
+            alterados = {k: v for k, v in valor.items() if k not in antes or antes[k] != v}
+            removidos = [k for k in antes if k not in valor]
+            if alterados:
+                delta[campo] = alterados
+            if removidos:
+                delta['-' + campo] = removidos
+        elif campo not in anterior or antes != valor:
+            delta[campo] = valor
+    return delta
+
+
+def apply_delta(estado: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplica um delta de diff() sobre estado (alterando-o) e o retorna"""
+    for campo, valor in delta.items():
+        if campo.startswith('-'):
+            alvo = estado.get(campo[1:], {})
+            for chave in valor:
+                alvo.pop(chave, None)
+        elif isinstance(valor, dict) and isinstance(estado.get(campo), dict):
+            estado[campo].update(valor)
+        else:
+            estado[campo] = dict(valor) if isinstance(valor, dict) else valor
+    return estado
+
+
+@dataclass
+class HistoryEvent:
+    """Evento calculado por prepare(), pronto para write()"""
+    chave: str
+    seq: int
+    ts: float
+    tipo: str
+    delta: Dict[str, Any]
+    estado: Dict[str, Any]
+    checkpoint_seq: int
+
+    @property
+    def checkpoint(self) -> bool:
+        return self.seq == self.checkpoint_seq
+
+
+def _periodos(ts: float) -> List[Tuple[str, str]]:
+    dia = datetime.fromtimestamp(ts).date().isoformat()
+    return [('dia', dia), ('mes', dia[:7])]
+
+
+class HistoryStore:
+    """Histórico de todos os clientes em um banco SQLite"""
+
+    def __init__(self, db_path: str = HISTORY_DB, checkpoint_interval: int = CHECKPOINT_INTERVAL,
+                 retencao_dias: int = RETENCAO_DIAS, durability: str = DURABILITY, prune: bool = True):
+        self.db_path = db_path
+        self.checkpoint_interval = checkpoint_interval
+        self.retencao_dias = retencao_dias
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f'PRAGMA synchronous={_SYNCHRONOUS[durability]}')
+        self._conn.executescript(_SCHEMA)
+        # conexão só de leitura para prepare(): no WAL ela não espera as gravações da outra
+        self._leitura = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        # chave -> (seq, checkpoint_seq, estado) do último evento preparado de cada cliente
+        self._atual: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+        self._atual_lock = threading.Lock()
+        self._desde_prune = 0
+        if prune:
+            self.prune()
+
+    def close(self):
+        with self._lock, self._atual_lock:
+            self._leitura.close()
+            self._conn.close()
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    def _ultimo(self, chave: str) -> Tuple[int, int, Dict[str, Any]]:
+        if chave not in self._atual:
+            row = self._leitura.execute('SELECT seq, checkpoint_seq, estado FROM atual WHERE chave = ?',
+                                        (chave,)).fetchone()
+            self._atual[chave] = (row[0], row[1], json.loads(row[2])) if row else (0, 0, {})
+        return self._atual[chave]
+
+    # ------------------------------------------------------------------
+    # Gravação
+    # ------------------------------------------------------------------
+    def record(self, client: Dict[str, Any], tipo: str = TIPO_EDICAO, ts: Optional[float] = None) -> Optional[int]:
+        """Registra o estado atual do cliente; retorna o seq do evento (None se nada mudou)"""
+        evento = self.prepare(client, tipo, ts)
+        if evento is None:
+            return None
+        self.write(evento)
+        return evento.seq
+
+    def prepare(self, client: Dict[str, Any], tipo: str = TIPO_EDICAO,
+                ts: Optional[float] = None) -> Optional[HistoryEvent]:
+        """Calcula o evento do estado atual do cliente sem gravá-lo (None se nada mudou).
+
+        Cria o 'historico_id' do cliente se preciso e já conta o evento como
+        o último do cliente, então os eventos devem ser gravados por write()
+        na ordem em que foram preparados.
+        """
+        chave = history_key(client)
+        novo = estado_do_cliente(client)
+        ts = time.time() if ts is None else ts
+        with self._atual_lock:
+            seq, checkpoint_seq, anterior = self._ultimo(chave)
+            delta = diff(anterior, novo)
+            if not delta and tipo != TIPO_CALCULO:
+                return None
+            seq += 1
+            if checkpoint_seq == 0 or seq - checkpoint_seq >= self.checkpoint_interval:
+                checkpoint_seq = seq
+            self._atual[chave] = (seq, checkpoint_seq, novo)
+        return HistoryEvent(chave, seq, ts, tipo, delta, novo, checkpoint_seq)
+
+    def write(self, evento: HistoryEvent):
+        """Grava um evento de prepare() (a limpeza por retenção roda a cada PRUNE_EVERY eventos)"""
+        estado_json = json.dumps(evento.estado, ensure_ascii=False)
+        resumo = resumir_cliente(evento.estado)
+        chave, seq, ts = evento.chave, evento.seq, evento.ts
+        with self._lock:
+            try:
+                with self._transaction():
+                    self._conn.execute('INSERT INTO eventos (chave, seq, ts, tipo, delta) VALUES (?, ?, ?, ?, ?)',
+                                       (chave, seq, ts, evento.tipo, json.dumps(evento.delta, ensure_ascii=False)))
+                    if evento.checkpoint:
+                        self._conn.execute('INSERT INTO checkpoints (chave, seq, ts, estado) VALUES (?, ?, ?, ?)',
+                                           (chave, seq, ts, estado_json))
+                    self._conn.execute('INSERT OR REPLACE INTO atual (chave, seq, checkpoint_seq, estado) '
+                                       'VALUES (?, ?, ?, ?)', (chave, seq, evento.checkpoint_seq, estado_json))
+                    calculo = int(evento.tipo == TIPO_CALCULO)
+                    valor_total = float(evento.estado.get('valor_total', 0.0))
+                    self._conn.executemany(_UPSERT_ROLLUP, [
+                        (chave, periodo, inicio, calculo, 1 - calculo, ts, ts, valor_total, valor_total,
+                         valor_total, resumo.total_real, resumo.lucro_esperado, resumo.lucro_real)
+                        for periodo, inicio in _periodos(ts)])
+            except Exception:
+                # o próximo prepare() volta a partir do que está no banco
+                with self._atual_lock:
+                    self._atual.pop(chave, None)
+                raise
+            self._desde_prune += 1
+            if self._desde_prune >= PRUNE_EVERY:
+                self.prune()
+
+    def forget(self, client: Dict[str, Any]):
+        """Apaga todo o histórico do cliente"""
+        chave = client.get('historico_id')
+        if not chave:
+            return
+        with self._atual_lock:
+            self._atual.pop(chave, None)
+        with self._lock, self._transaction():
+            for tabela in ('eventos', 'checkpoints', 'atual', 'rollups'):
+                self._conn.execute(f'DELETE FROM {tabela} WHERE chave = ?', (chave,))
+
+    def prune(self, agora: Optional[float] = None) -> int:
+        """Descarta eventos fora do prazo de retenção; retorna quantos foram apagados.
+
+        Para cada cliente, apaga os eventos até o checkpoint mais recente
+        anterior ao limite (e os checkpoints mais velhos que ele), de modo
+        que todo estado dentro do prazo continua reconstruível.
+        """
+        self._desde_prune = 0
+        if not self.retencao_dias:
+            return 0
+        limite = (time.time() if agora is None else agora) - self.retencao_dias * 86400
+        with self._lock, self._transaction():
+            apagados = self._conn.execute(
+                'DELETE FROM eventos WHERE seq <= (SELECT MAX(c.seq) FROM checkpoints c '
+                'WHERE c.chave = eventos.chave AND c.ts <= ?)', (limite,)).rowcount
+            self._conn.execute(
+                'DELETE FROM checkpoints WHERE seq < (SELECT MAX(c.seq) FROM checkpoints c '
+                'WHERE c.chave = checkpoints.chave AND c.ts <= ?)', (limite,))
+            self._conn.execute("DELETE FROM rollups WHERE periodo = 'dia' AND ultimo_ts < ?", (limite,))
+        return apagados
+
+    # ------------------------------------------------------------------
+    # Leitura (sob demanda)
+    # ------------------------------------------------------------------
+    def events(self, client: Dict[str, Any], desde: Optional[float] = None,
+               ate: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Eventos do cliente em ordem, opcionalmente entre duas datas (timestamps)"""
+        chave = client.get('historico_id')
+        if not chave:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT seq, ts, tipo, delta FROM eventos WHERE chave = ? AND ts >= ? AND ts <= ? ORDER BY seq',
+                (chave, desde if desde is not None else float('-inf'), ate if ate is not None else float('inf'))
+            ).fetchall()
+        return [{'seq': seq, 'ts': ts, 'tipo': tipo, 'delta': json.loads(delta)} for seq, ts, tipo, delta in rows]
+
+    def state_at(self, client: Dict[str, Any], ts: float) -> Optional[Dict[str, Any]]:
+        """Estado do cliente no instante ts, ou None se for anterior ao histórico guardado"""
+        chave = client.get('historico_id')
+        if not chave:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT seq, estado FROM checkpoints WHERE chave = ? AND ts <= ? ORDER BY seq DESC LIMIT 1',
+                (chave, ts)).fetchone()
+            if row is None:
+                return None
+            seq, estado = row[0], json.loads(row[1])
+            deltas = self._conn.execute(
+                'SELECT delta FROM eventos WHERE chave = ? AND seq > ? AND ts <= ? ORDER BY seq',
+                (chave, seq, ts)).fetchall()
+        for (delta,) in deltas:
+            apply_delta(estado, json.loads(delta))
+        return estado
+
+    def rollups(self, client: Dict[str, Any], periodo: str = 'dia', desde: Optional[str] = None,
+                ate: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Resumos do cliente por 'dia' (inicio 'AAAA-MM-DD') ou 'mes' ('AAAA-MM'), em ordem"""
+        if periodo not in PERIODOS:
+            raise ValueError(f'Período desconhecido: {periodo!r} (use {", ".join(PERIODOS)})')
+        chave = client.get('historico_id')
+        if not chave:
+            return []
+        with self._lock:
+            cursor = self._conn.execute(
+                'SELECT * FROM rollups WHERE chave = ? AND periodo = ? AND inicio >= ? AND inicio <= ? '
+                'ORDER BY inicio', (chave, periodo, desde or '', ate or '9999-12-31'))
+            colunas = [c[0] for c in cursor.description]
+            return [{k: v for k, v in zip(colunas, row) if k not in ('chave', 'periodo')} for row in cursor]
+
+
+_history = None
+
+
+def get_history(prune: bool = True) -> HistoryStore:
+    """Histórico padrão (src/data/historico.db), criado na primeira chamada.
+
+    prune=False deixa a limpeza por retenção da abertura para quem chamou
+    (a interface a faz no PersistenceWorker).
+    """
+    global _history
+    if _history is None:
+        _history = HistoryStore(prune=prune)
+    return _history
+
+
+def close_history():
+    """Fecha o histórico padrão (o próximo get_history() abre de novo)"""
+    global _history
+    if _history is not None:
+        _history.close()
+        _history = None
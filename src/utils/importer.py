@@ -0,0 +1,335 @@
+"""
+Importação de custos reais a partir de extratos CSV/XLSX
+
+Cada linha do extrato é um item (cliente, descrição, valor e, opcionalmente,
+categoria). As linhas são lidas uma a uma e somadas em centavos por
+cliente/categoria, então a memória não cresce com o tamanho do arquivo. A
+categoria vem da coluna de categoria, se houver, ou das regras
+(CategoryRules): expressões procuradas na descrição sem acentos e em
+minúsculas. No final todos os clientes afetados são gravados de uma vez
+com storage.update_clients (um único registro no journal / uma transação
+no SQLite).
+
+XLSX precisa do openpyxl (opcional); CSV usa só a biblioteca padrão.
+
+Uso pela linha de comando (não carrega o PySide6):
+    python -m src.utils.importer extrato.csv
+    python -m src.utils.importer extrato.xlsx --regras regras.json --somar
+    python -m src.utils.importer extrato.csv --coluna cliente=Evento --coluna valor="Valor Pago" --simular
+
+Formato do arquivo de regras (a primeira regra que casar vence):
+    {"regras": [{"padrao": "garcom|seguranca", "categoria": "Staff"}],
+     "sem_regra": "CMV"}
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils import money, storage
+from src.utils.search_index import normalize
+
+# Regras usadas quando nenhum arquivo de regras é informado
+DEFAULT_RULES = [
+    (r'garcom|seguranca|recepcion|cozinheir|copeir|barman|bartender|equipe|staff|diaria|monitor|limpeza',
+     'Staff'),
+    (r'locacao|aluguel|salao|espaco|tenda|mesa|cadeira|toalha|som|iluminacao|palco|gerador', 'Locação'),
+    (r'nota fiscal|\bnf\b|imposto|\biss\b|tributo|taxa', 'Nota'),
+    (r'bebida|alimento|buffet|comida|insumo|carne|gelo|refrigerante|cerveja|doce|bolo|salgado|mercado',
+     'CMV'),
+]
+
+# Nomes aceitos para cada coluna (comparados sem acentos/maiúsculas)
+COLUMN_ALIASES = {
+    'cliente': ('cliente', 'nome do cliente', 'evento', 'client'),
+    # sem 'id'/'cliente_id': no SQLite o 'id' do cliente é a chave primária, que deixa de
+    # coincidir com a posição depois de uma exclusão
+    'posicao': ('posicao', 'indice'),
+    'descricao': ('descricao', 'item', 'historico', 'produto', 'servico', 'description'),
+    'categoria': ('categoria', 'category'),
+    'valor': ('valor', 'valor total', 'total', 'valor pago', 'amount'),
+}
+MODOS = ('substituir', 'somar')
+# Linhas inválidas guardadas para o relatório (as demais só são contadas)
+MAX_ERROS_GUARDADOS = 100
+# Descrições já classificadas mantidas em cache
+_MAX_CACHE_REGRAS = 10000
+
+
+class CategoryRules:
+    """Classifica a descrição de um item em uma categoria por expressões regulares"""
+
+    def __init__(self, regras: Iterable[Tuple[str, str]] = DEFAULT_RULES, sem_regra: Optional[str] = None):
+        self.regras = [(re.compile(normalize(padrao)), categoria) for padrao, categoria in regras]
+        self.sem_regra = sem_regra
+        self._cache: Dict[str, Optional[str]] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> 'CategoryRules':
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        regras = [(r['padrao'], r['categoria']) for r in config.get('regras', [])]
+        return cls(regras, config.get('sem_regra'))
+
+    def categorizar(self, descricao: str) -> Optional[str]:
+        categoria = self._cache.get(descricao, False)
+        if categoria is not False:
+            return categoria
+        texto = normalize(descricao or '')
+        categoria = next((c for padrao, c in self.regras if padrao.search(texto)), self.sem_regra)
+        if len(self._cache) >= _MAX_CACHE_REGRAS:
+            self._cache.clear()
+        self._cache[descricao] = categoria
+        return categoria
+
+
+@dataclass
+class ImportResult:
+    """Resumo de uma importação (valores em reais)"""
+    linhas: int = 0
+    importadas: int = 0
+    invalidas: int = 0
+    erros: List[str] = field(default_factory=list)
+    sem_categoria: int = 0
+    valor_sem_categoria: float = 0.0
+    # nomes/posições do extrato que não existem no storage
+    clientes_desconhecidos: List[str] = field(default_factory=list)
+    # categoria que o cliente não tem -> quantidade de linhas
+    categorias_desconhecidas: Dict[str, int] = field(default_factory=dict)
+    # posição do cliente -> {categoria: valor importado}
+    atualizados: Dict[int, Dict[str, float]] = field(default_factory=dict)
+
+    def _erro(self, linha: int, motivo: str):
+        self.invalidas += 1
+        if len(self.erros) < MAX_ERROS_GUARDADOS:
+            self.erros.append(f'linha {linha}: {motivo}')
+
+
+def _sniff_delimiter(amostra: str) -> str:
+    try:
+        return csv.Sniffer().sniff(amostra, delimiters=';,\t|').delimiter
+    except csv.Error:
+        return ';' if amostra.count(';') > amostra.count(',') else ','
+
+
+def iter_csv(path: str, encoding: str = 'utf-8-sig', delimiter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        if delimiter is None:
+            delimiter = _sniff_delimiter(f.read(8192))
+            f.seek(0)
+        yield from csv.DictReader(f, delimiter=delimiter)
+
+
+def iter_xlsx(path: str, sheet: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError('Importar XLSX requer o openpyxl (pip install openpyxl)') from None
+    # read_only: as linhas são lidas do arquivo sob demanda
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        planilha = workbook[sheet] if sheet else workbook.active
+        linhas = planilha.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        cabecalho = ['' if c is None else str(c) for c in cabecalho]
+        for valores in linhas:
+            if valores is None or all(v is None for v in valores):
+                continue
+            yield dict(zip(cabecalho, valores))
+    finally:
+        workbook.close()
+
+
+def iter_rows(path: str, sheet: Optional[str] = None, encoding: str = 'utf-8-sig',
+              delimiter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Linhas do extrato como dicionários {cabeçalho: valor}, uma por vez"""
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xlsm'):
+        return iter_xlsx(path, sheet)
+    return iter_csv(path, encoding, delimiter)
+
+
+def resolve_columns(cabecalho: Iterable[str], colunas: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Campo -> nome da coluna no arquivo, pelos apelidos ou pelo mapeamento informado"""
+    cabecalho = [c for c in cabecalho if c is not None]
+    por_nome = {normalize(c).strip(): c for c in cabecalho}
+    resolvidas = {}
+    for campo, apelidos in COLUMN_ALIASES.items():
+        if colunas and campo in colunas:
+            if colunas[campo] not in cabecalho:
+                raise ValueError(f"Coluna '{colunas[campo]}' não encontrada no arquivo")
+            resolvidas[campo] = colunas[campo]
+            continue
+        for apelido in apelidos:
+            if apelido in por_nome:
+                resolvidas[campo] = por_nome[apelido]
+                break
+    if 'valor' not in resolvidas:
+        raise ValueError('O arquivo precisa de uma coluna de valor')
+    if 'cliente' not in resolvidas and 'posicao' not in resolvidas:
+        raise ValueError('O arquivo precisa de uma coluna de cliente (nome) ou posição')
+    return resolvidas
+
+
+def _centavos(valor: Any, decimal: Optional[str]) -> int:
+    if isinstance(valor, (int, float)):
+        return money.to_cents(valor)
+    return money.parse_cents(str(valor), decimal)
+
+
+def aggregate_rows(rows: Iterable[Dict[str, Any]], rules: CategoryRules, colunas: Optional[Dict[str, str]] = None,
+                   decimal: Optional[str] = None, result: Optional[ImportResult] = None
+                   ) -> Tuple[Dict[Any, Dict[str, int]], ImportResult]:
+    """Soma os valores por (cliente, categoria) em centavos, em uma passada.
+
+    A chave do cliente é a posição (int), se houver coluna de posição, ou o
+    nome normalizado.
+    """
+    result = result or ImportResult()
+    somas: Dict[Any, Dict[str, int]] = {}
+    # nome como está no arquivo -> normalizado (os mesmos nomes se repetem muito)
+    nomes: Dict[str, str] = {}
+    mapa = None
+    for numero, row in enumerate(rows, start=2):
+        if mapa is None:
+            mapa = resolve_columns(row.keys(), colunas)
+        result.linhas += 1
+
+        bruto = row.get(mapa['valor'])
+        if bruto is None or str(bruto).strip() == '':
+            result._erro(numero, 'sem valor')
+            continue
+        try:
+            centavos = _centavos(bruto, decimal)
+        except ValueError as e:
+            result._erro(numero, str(e))
+            continue
+
+        if 'posicao' in mapa and str(row.get(mapa['posicao']) or '').strip():
+            try:
+                chave = int(float(str(row[mapa['posicao']]).strip()))
+            except ValueError:
+                result._erro(numero, f"posição inválida: {row[mapa['posicao']]!r}")
+                continue
+        else:
+            nome = str(row.get(mapa.get('cliente', ''), '') or '').strip()
+            if not nome:
+                result._erro(numero, 'sem cliente')
+                continue
+            chave = nomes.get(nome)
+            if chave is None:
+                if len(nomes) >= _MAX_CACHE_REGRAS:
+                    nomes.clear()
+                chave = nomes[nome] = normalize(nome)
+
+        categoria = str(row.get(mapa['categoria']) or '').strip() if 'categoria' in mapa else ''
+        if not categoria:
+            categoria = rules.categorizar(str(row.get(mapa.get('descricao', ''), '') or ''))
+        if not categoria:
+            result.sem_categoria += 1
+            result.valor_sem_categoria += money.from_cents(centavos)
+            continue
+
+        por_categoria = somas.setdefault(chave, {})
+        por_categoria[categoria] = por_categoria.get(categoria, 0) + centavos
+        result.importadas += 1
+    return somas, result
+
+
+def apply_totals(clients: List[Dict[str, Any]], somas: Dict[Any, Dict[str, int]], modo: str = 'substituir',
+                 result: Optional[ImportResult] = None) -> Tuple[Dict[int, Dict[str, Any]], ImportResult]:
+    """Aplica as somas aos clientes; retorna {posição: cliente alterado}.
+
+    modo='substituir': a categoria passa a valer o total do extrato.
+    modo='somar': o total do extrato é somado ao valor atual.
+    """
+    if modo not in MODOS:
+        raise ValueError(f'modo deve ser um de {MODOS}')
+    result = result or ImportResult()
+    por_nome: Dict[str, int] = {}
+    for posicao, client in enumerate(clients):
+        por_nome.setdefault(normalize(client.get('name', '')), posicao)
+
+    updates: Dict[int, Dict[str, Any]] = {}
+    for chave, por_categoria in somas.items():
+        posicao = chave if isinstance(chave, int) else por_nome.get(chave)
+        if posicao is None or not 0 <= posicao < len(clients):
+            result.clientes_desconhecidos.append(str(chave))
+            continue
+        client = clients[posicao]
+        categorias = {normalize(c): c for c in client.get('percentuais', {})}
+        reais = client.setdefault('valores_reais', {})
+        for categoria, centavos in por_categoria.items():
+            nome = categorias.get(normalize(categoria))
+            if nome is None:
+                result.categorias_desconhecidas[categoria] = result.categorias_desconhecidas.get(categoria, 0) + 1
+                continue
+            if modo == 'somar':
+                centavos += money.to_cents(reais.get(nome, 0.0))
+            reais[nome] = money.from_cents(centavos)
+            result.atualizados.setdefault(posicao, {})[nome] = reais[nome]
+            updates[posicao] = client
+    return updates, result
+
+
+def import_costs(path: str, rules: Optional[CategoryRules] = None, modo: str = 'substituir',
+                 colunas: Optional[Dict[str, str]] = None, sheet: Optional[str] = None,
+                 decimal: Optional[str] = None, dry_run: bool = False) -> ImportResult:
+    """Importa o extrato para os valores_reais dos clientes do storage.
+
+    Todos os clientes alterados são gravados juntos, em uma única chamada a
+    storage.update_clients; com dry_run=True nada é gravado.
+    """
+    if modo not in MODOS:
+        raise ValueError(f'modo deve ser um de {MODOS}')
+    somas, result = aggregate_rows(iter_rows(path, sheet), rules or CategoryRules(), colunas, decimal)
+    clients = storage.load_all_clients().get('clients', [])
+    updates, result = apply_totals(clients, somas, modo, result)
+    if updates and not dry_run:
+        storage.update_clients(updates)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Importa custos reais de um extrato CSV/XLSX para os clientes')
+    parser.add_argument('arquivo', help='extrato .csv ou .xlsx')
+    parser.add_argument('--regras', help='arquivo JSON com as regras de categoria')
+    parser.add_argument('--somar', action='store_true', help='somar aos valores atuais em vez de substituir')
+    parser.add_argument('--coluna', action='append', default=[], metavar='CAMPO=COLUNA',
+                        help=f"nome da coluna no arquivo para um campo ({', '.join(COLUMN_ALIASES)})")
+    parser.add_argument('--planilha', help='aba do XLSX (padrão: a ativa)')
+    parser.add_argument('--decimal', choices=[',', '.'], default=None,
+                        help='separador decimal dos valores (padrão: o último separador; valores como '
+                             '"1.234" só são aceitos com esta opção)')
+    parser.add_argument('--simular', action='store_true', help='mostra o resultado sem gravar')
+    args = parser.parse_args(argv)
+
+    colunas = dict(item.split('=', 1) for item in args.coluna)
+    rules = CategoryRules.from_file(args.regras) if args.regras else CategoryRules()
+    result = import_costs(args.arquivo, rules, 'somar' if args.somar else 'substituir', colunas,
+                          args.planilha, args.decimal, args.simular)
+
+    print(f'{result.linhas} linhas lidas, {result.importadas} importadas, {result.invalidas} inválidas')
+    for erro in result.erros:
+        print(f'  {erro}')
+    if result.sem_categoria:
+        print(f'{result.sem_categoria} linhas sem categoria (R$ {result.valor_sem_categoria:.2f}) ignoradas')
+    for nome in result.clientes_desconhecidos:
+        print(f"Cliente não encontrado: '{nome}'")
+    for categoria, vezes in result.categorias_desconhecidas.items():
+        print(f"Categoria '{categoria}' não existe no cliente ({vezes}x)")
+    acao = 'seriam atualizados' if args.simular else 'atualizados'
+    print(f'{len(result.atualizados)} clientes {acao}')
+    for posicao, valores in sorted(result.atualizados.items()):
+        resumo = ', '.join(f'{c}: {v:.2f}' for c, v in valores.items())
+        print(f'  [{posicao}] {resumo}')
+    return 1 if result.invalidas and not result.importadas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Núcleo de valores monetários em centavos inteiros
+
+Valores em reais (float) são convertidos para centavos (int) antes de
+qualquer conta, e percentuais para centésimos de ponto percentual
+(12,5% -> 1250; 100% -> 10000). A divisão do total entre as categorias usa
+o método do maior resto: cada categoria recebe a parte inteira de sua cota
+e os centavos que sobram vão para as maiores frações. Com percentuais que
+somam 100%, as partes somam exatamente o total, sem o centavo de diferença
+dos floats.
+
+dividir() devolve reais (float) para as telas, o PDF e o JSON; as versões
+*_lote_centavos() fazem a mesma conta vetorizada em int64 (NumPy) para
+muitos totais de uma vez, com resultados idênticos aos da versão escalar.
+
+Toda divisão valida a tabela (validar_percentuais): no máximo 2 casas
+decimais e soma exata de 100%. Uma tabela fora disso (ex: clients.json
+editado à mão) levanta ValueError em vez de ser arredondada sem aviso.
+"""
+import math
+import re
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Mapping, Optional
+
+_NAO_NUMERICO = re.compile(r'[^0-9,.]')
+
+# 100% em centésimos de ponto percentual
+ESCALA_PERCENTUAL = 10000
+
+
+def _centesimos(valor: float) -> int:
+    """valor * 100 no inteiro mais próximo, empates para longe do zero (ROUND_HALF_UP, como parse_cents)"""
+    x = valor * 100
+    r = round(x)
+    if abs(abs(x - r) - 0.5) < 1e-6:
+        # perto do empate o float não decide (1.005 * 100 = 100.4999...): usar o decimal escrito
+        return int((Decimal(str(float(valor))) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return int(r)
+
+
+def to_cents(valor: float) -> int:
+    """Reais -> centavos, arredondando para o centavo mais próximo (meio centavo para cima)"""
+    return _centesimos(valor)
+
+
+def from_cents(centavos: int) -> float:
+    return centavos / 100
+
+
+def percent_to_units(percentual: float) -> int:
+    """Percentual -> centésimos de ponto (12.5 -> 1250), mesmo arredondamento de to_cents"""
+    return _centesimos(percentual)
+
+
+def casas_decimais(valor: float) -> int:
+    """Casas decimais do valor como escrito (12.5 -> 1, 33.333 -> 3)"""
+    return max(0, -Decimal(str(valor)).normalize().as_tuple().exponent)
+
+
+def validar_percentuais(percentuais: Mapping[str, float]) -> List[int]:
+    """Valida a tabela e devolve os percentuais em centésimos de ponto, na ordem das categorias.
+
+    Levanta ValueError se algum percentual não for finito, tiver mais de 2
+    casas decimais ou se a soma (exata, dos valores escritos) não for 100%.
+    """
+    unidades = []
+    for categoria, p in percentuais.items():
+        if not isinstance(p, (int, float)) or not math.isfinite(p):
+            raise ValueError(f"Percentual inválido ({categoria}: {p})")
+        u = percent_to_units(p)
+        # u / 100 == p só quando p tem no máximo 2 casas como escrito (33.333 -> 3333 != 33.333);
+        # mais casas seriam arredondadas sem aviso
+        if u / 100 != p:
+            raise ValueError(f"Use no máximo 2 casas decimais nos percentuais ({categoria}: {p:g}%)")
+        unidades.append(u)
+    # com 2 casas a soma em centésimos é exata, sem tolerância de float
+    if sum(unidades) != ESCALA_PERCENTUAL:
+        total = sum(Decimal(str(p)) for p in percentuais.values())
+        raise ValueError(f"A soma dos percentuais deve ser 100%, não {total:g}%")
+    return unidades
+
+
+def _separador_decimal(numero: str, texto: str) -> Optional[str]:
+    """Deduz o separador decimal de um número só com dígitos, ',' e '.'"""
+    if ',' in numero and '.' in numero:
+        # '1.234,56' / '1,234.56': o último separador é o decimal
+        return ',' if numero.rfind(',') > numero.rfind('.') else '.'
+    separador = ',' if ',' in numero else '.' if '.' in numero else None
+    if separador is None:
+        return None
+    if numero.count(separador) > 1:
+        # '1.234.567': só milhar
+        return '.' if separador == ',' else ','
+    if len(numero) - numero.index(separador) - 1 == 3:
+        # '1.234' pode ser mil duzentos e trinta e quatro ou 1,234
+        raise ValueError(f'Valor ambíguo: {texto!r} (informe o separador decimal)')
+    return separador
+
+
+def parse_cents(texto: str, decimal: Optional[str] = None) -> int:
+    """Texto de valor monetário -> centavos.
+
+    Aceita 'R$', espaços, sinal de menos em qualquer posição ('R$ -500,00',
+    '500,00-') e parênteses (crédito). Com decimal=None, se houver vírgula e
+    ponto o último é o decimal; com um só separador seguido de exatamente 3
+    dígitos ('1.234', '1,234') o valor é ambíguo e levanta ValueError, assim
+    como um texto sem número.
+    """
+    texto = (texto or '').strip()
+    negativo = '-' in texto or ('(' in texto and ')' in texto)
+    limpo = _NAO_NUMERICO.sub('', texto)
+    if not limpo.strip(',.'):
+        raise ValueError(f'Valor inválido: {texto!r}')
+    if decimal is None:
+        decimal = _separador_decimal(limpo, texto) or '.'
+    milhar = '.' if decimal == ',' else ','
+    limpo = limpo.replace(milhar, '').replace(decimal, '.')
+    try:
+        centavos = int((Decimal(limpo) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f'Valor inválido: {texto!r}') from None
+    return -centavos if negativo else centavos
+
+
+def somar(valores: Iterable[float]) -> float:
+    """Soma em centavos (sem acumular erro de float)"""
+    return from_cents(sum(to_cents(v) for v in valores))
+
+
+def distribuir_centavos(total_centavos: int, pesos: List[int]) -> List[int]:
+    """Divide o total proporcionalmente aos pesos (em centésimos de ponto percentual).
+
+    Cada parte é a cota total * peso / 10000 arredondada para baixo; os
+    centavos que faltam para o alvo (o total, se os pesos somam 100%) vão
+    para as partes com maior resto, empatando pela ordem das categorias.
+    """
+    cotas = [total_centavos * peso for peso in pesos]
+    partes = [cota // ESCALA_PERCENTUAL for cota in cotas]
+    alvo = (total_centavos * sum(pesos) + ESCALA_PERCENTUAL // 2) // ESCALA_PERCENTUAL
+    faltam = alvo - sum(partes)
+    if faltam > 0:
+        por_resto = sorted(range(len(pesos)), key=lambda i: -(cotas[i] % ESCALA_PERCENTUAL))
+        for i in por_resto[:faltam]:
+            partes[i] += 1
+    return partes
+
+
+def dividir_centavos(total_centavos: int, percentuais: Mapping[str, float]) -> Dict[str, int]:
+    """Partes de cada categoria em centavos; tabela vazia = nada a dividir ({})"""
+    if not percentuais:
+        return {}
+    partes = distribuir_centavos(total_centavos, validar_percentuais(percentuais))
+    return dict(zip(percentuais.keys(), partes))
+
+
+def dividir(valor_total: float, percentuais: Mapping[str, float]) -> Dict[str, float]:
+    """Valores esperados de cada categoria, em reais, somando exatamente o total"""
+    return {categoria: from_cents(centavos)
+            for categoria, centavos in dividir_centavos(to_cents(valor_total), percentuais).items()}
+
+
+def to_cents_lote(valores):
+    """Array de reais -> array int64 de centavos (mesmo arredondamento de to_cents)"""
+    import numpy as np
+
+    valores = np.asarray(valores, dtype=float)
+    x = valores * 100
+    centavos = np.rint(x)
+    # rint empata para o par; os quase empates seguem a regra escalar
+    empates = np.abs(np.abs(x - centavos) - 0.5) < 1e-6
+    if empates.any():
+        centavos[empates] = [_centesimos(v) for v in valores[empates]]
+    return centavos.astype(np.int64)
+
+
+def distribuir_lote_centavos(totais_centavos, pesos):
+    """Versão vetorizada de distribuir_centavos.
+
+    totais_centavos: (eventos,); pesos: (categorias,) para todos os eventos ou
+    (eventos x categorias) com uma tabela por evento. Retorna int64
+    (eventos x categorias).
+    """
+    import numpy as np
+
+    totais = np.asarray(totais_centavos, dtype=np.int64).reshape(-1)
+    pesos = np.asarray(pesos, dtype=np.int64)
+    categorias = pesos.shape[-1]
+    if categorias == 0:
+        return np.zeros((totais.size, 0), dtype=np.int64)
+
+    cotas = totais[:, None] * pesos
+    partes, restos = np.divmod(cotas, ESCALA_PERCENTUAL)
+    alvo = (totais * pesos.sum(axis=-1) + ESCALA_PERCENTUAL // 2) // ESCALA_PERCENTUAL
+    faltam = alvo - partes.sum(axis=1)
+
+    # posição de cada categoria na ordem de maior resto (estável: empate pela ordem das categorias)
+    ordem = np.argsort(-restos, axis=1, kind='stable')
+    posicao = np.empty_like(ordem)
+    np.put_along_axis(posicao, ordem, np.broadcast_to(np.arange(categorias), ordem.shape), axis=1)
+    return partes + (posicao < faltam[:, None])
+
+
+def dividir_lote_centavos(totais_centavos, percentuais: Mapping[str, float]):
+    """Divide vários totais pela mesma tabela: (eventos,) -> (eventos x categorias) int64"""
+    return distribuir_lote_centavos(totais_centavos, validar_percentuais(percentuais))
@@ -0,0 +1,131 @@
+"""
+Gráficos vetoriais do PDF desenhados com reportlab.graphics
+
+Alternativa aos PNGs do matplotlib: os gráficos viram Drawings inseridos
+direto no PDF, sem rasterizar nem importar o pyplot. Selecionado com
+chart_backend='reportlab' no pdf_exporter.
+"""
+from typing import Dict
+
+from reportlab.graphics.charts.barcharts import HorizontalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+
+# Mesmas cores dos gráficos do matplotlib
+COR_ESPERADO = colors.HexColor('#70AD47')
+COR_REAL = colors.HexColor('#3D6329')
+COR_LUCRO = colors.HexColor('#4a7a31')
+COR_CUSTOS = colors.HexColor('#e74c3c')
+COR_TITULO = colors.HexColor('#2c3e50')
+
+
+def _titulo(drawing: Drawing, texto: str, y: float):
+    drawing.add(String(drawing.width / 2, y, texto, fontName='Helvetica-Bold', fontSize=9,
+                       fillColor=COR_TITULO, textAnchor='middle'))
+
+
+def create_chart_drawing(valores_esperados: Dict[str, float], valores_reais: Dict[str, float],
+                         width: float, height: float) -> Drawing:
+    """Barras horizontais com o percentual esperado vs real de cada categoria"""
+    drawing = Drawing(width, height)
+    _titulo(drawing, 'Distribuição: Esperado vs Real', height - 10)
+
+    labels = list(valores_esperados.keys())
+    esperados = [valores_esperados.get(l, 0.0) for l in labels]
+    reais = [valores_reais.get(l, 0.0) for l in labels]
+
+    total_esp = sum(esperados) if sum(esperados) > 0 else 1
+    total_real = sum(reais) if sum(reais) > 0 else 1
+    perc_esp = [(e / total_esp) * 100 for e in esperados]
+    perc_real = [(r / total_real) * 100 for r in reais]
+
+    chart = HorizontalBarChart()
+    chart.x = 55
+    chart.y = 28
+    chart.width = width - chart.x - 65
+    chart.height = height - chart.y - 20
+    # série de cima = Esperado, como no gráfico do matplotlib
+    chart.data = [perc_real, perc_esp] if labels else [[0], [0]]
+    chart.bars[0].fillColor = COR_REAL
+    chart.bars[1].fillColor = COR_ESPERADO
+    chart.bars.strokeColor = None
+    chart.barSpacing = 1
+    chart.groupSpacing = 6
+    chart.categoryAxis.categoryNames = labels or ['']
+    chart.categoryAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = 7
+    chart.categoryAxis.labels.boxAnchor = 'e'
+    chart.categoryAxis.labels.dx = -3
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.labels.fontName = 'Helvetica'
+    chart.valueAxis.labels.fontSize = 7
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = colors.HexColor('#dddddd')
+    chart.valueAxis.gridStrokeDashArray = (2, 2)
+    drawing.add(chart)
+
+    drawing.add(String(chart.x + chart.width / 2, 4, 'Percentual (%)', fontName='Helvetica', fontSize=7,
+                       textAnchor='middle'))
+
+    legend = Legend()
+    legend.x = chart.x + chart.width + 8
+    legend.y = chart.y
+    legend.fontName = 'Helvetica'
+    legend.fontSize = 7
+    legend.boxAnchor = 'sw'
+    legend.alignment = 'right'
+    legend.dx = legend.dy = 6
+    legend.colorNamePairs = [(COR_ESPERADO, 'Esperado'), (COR_REAL, 'Real')]
+    drawing.add(legend)
+    return drawing
+
+
+def create_profit_drawing(valores_reais: Dict[str, float], width: float, height: float) -> Drawing:
+    """Pizza de lucro vs custos totais"""
+    drawing = Drawing(width, height)
+
+    lucro = valores_reais.get('Lucro', 0.0)
+    total_custos = sum([v for k, v in valores_reais.items() if k != 'Lucro'])
+
+    if lucro + total_custos <= 0:
+        drawing.add(String(width / 2, height / 2, 'Sem dados', fontName='Helvetica', fontSize=9,
+                           fillColor=colors.gray, textAnchor='middle'))
+        return drawing
+
+    _titulo(drawing, 'Lucro vs Custos', height - 10)
+    total = lucro + total_custos
+
+    pie = Pie()
+    tamanho = min(width, height - 38) - 10
+    pie.x = (width - tamanho) / 2
+    pie.y = 24
+    pie.width = pie.height = tamanho
+    pie.data = [lucro, total_custos]
+    pie.startAngle = 90
+    pie.direction = 'anticlockwise'
+    pie.labels = [f'{lucro / total * 100:.1f}%', f'{total_custos / total * 100:.1f}%']
+    pie.simpleLabels = 1
+    pie.slices.labelRadius = 0.6
+    pie.slices.fontColor = colors.white
+    pie.slices.fontName = 'Helvetica-Bold'
+    pie.slices.fontSize = 7
+    pie.slices.strokeColor = colors.white
+    pie.slices[0].fillColor = COR_LUCRO
+    pie.slices[1].fillColor = COR_CUSTOS
+    drawing.add(pie)
+
+    legend = Legend()
+    legend.x = width / 2
+    legend.y = 8
+    legend.boxAnchor = 's'
+    legend.alignment = 'right'
+    legend.columnMaximum = 1
+    legend.fontName = 'Helvetica'
+    legend.fontSize = 7
+    legend.dx = legend.dy = 6
+    legend.deltax = 50
+    legend.colorNamePairs = [(COR_LUCRO, 'Lucro'), (COR_CUSTOS, 'Custos Totais')]
+    drawing.add(legend)
+    return drawing
@@ -3,7 +3,7 @@ Módulo para exportar relatórios de eventos em PDF
 """
 import os
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -11,11 +11,29 @@ from reportlab.lib.units import mm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.pdfgen import canvas as pdfcanvas
-import matplotlib
-matplotlib.use('Agg')  # Backend sem GUI
-import matplotlib.pyplot as plt
 from io import BytesIO
 
+from src.utils.chart_cache import get_chart_cache
+from src.utils.summary import resumir_cliente
+from src.utils.tracing import traced
+
+# Resolução e tamanhos (polegadas) das imagens dos gráficos
+CHART_DPI = 150
+CHART_SIZE = (6, 3)
+PROFIT_CHART_SIZE = (4, 4)
+
+# Backend dos gráficos do PDF: 'matplotlib' (PNG) ou 'reportlab' (vetorial, ver pdf_charts)
+CHART_BACKENDS = ('matplotlib', 'reportlab')
+CHART_BACKEND = os.environ.get('CALCULADORA_CHART_BACKEND', 'matplotlib')
+
+
+def _pyplot():
+    """Importa o pyplot só na primeira renderização (é o import mais pesado do app)"""
+    import matplotlib
+    matplotlib.use('Agg')  # Backend sem GUI
+    import matplotlib.pyplot as plt
+    return plt
+
 
 def format_brl(valor: float) -> str:
     """Formata valor em reais"""
@@ -23,8 +41,32 @@ def format_brl(valor: float) -> str:
 
 
 def create_chart_image(valores_esperados: Dict[str, float], valores_reais: Dict[str, float], chart_type='bar'):
-    """Cria gráfico e retorna como imagem em bytes"""
-    fig, ax = plt.subplots(figsize=(6, 3), facecolor='white')
+    """Cria gráfico e retorna como imagem em bytes (reaproveitando do cache se os dados não mudaram)"""
+    cache = get_chart_cache()
+    key = cache.make_key(f'distribuicao:{chart_type}', valores_esperados, valores_reais,
+                         size=CHART_SIZE, dpi=CHART_DPI)
+    data = cache.get(key)
+    if data is None:
+        data = _render_chart_image(valores_esperados, valores_reais, chart_type).getvalue()
+        cache.put(key, data)
+    return BytesIO(data)
+
+
+def create_profit_chart(valores_reais: Dict[str, float]):
+    """Cria gráfico de pizza mostrando lucro vs custos (reaproveitando do cache)"""
+    cache = get_chart_cache()
+    key = cache.make_key('lucro', valores_reais, size=PROFIT_CHART_SIZE, dpi=CHART_DPI)
+    data = cache.get(key)
+    if data is None:
+        data = _render_profit_chart(valores_reais).getvalue()
+        cache.put(key, data)
+    return BytesIO(data)
+
+
+def _render_chart_image(valores_esperados: Dict[str, float], valores_reais: Dict[str, float], chart_type='bar'):
+    """Renderiza o gráfico de distribuição com o matplotlib"""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=CHART_SIZE, facecolor='white')
     
     labels = list(valores_esperados.keys())
     esperados = [valores_esperados.get(l, 0.0) for l in labels]
@@ -61,16 +103,17 @@ def create_chart_image(valores_esperados: Dict[str, float], valores_reais: Dict[
     
     # Salvar em buffer
     buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+    plt.savefig(buf, format='png', dpi=CHART_DPI, bbox_inches='tight')
     buf.seek(0)
     plt.close(fig)
     
     return buf
 
 
-def create_profit_chart(valores_reais: Dict[str, float]):
-    """Cria gráfico de pizza mostrando lucro vs custos"""
-    fig, ax = plt.subplots(figsize=(4, 4), facecolor='white')
+def _render_profit_chart(valores_reais: Dict[str, float]):
+    """Renderiza o gráfico de pizza de lucro vs custos com o matplotlib"""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=PROFIT_CHART_SIZE, facecolor='white')
     
     lucro = valores_reais.get('Lucro', 0.0)
     total_custos = sum([v for k, v in valores_reais.items() if k != 'Lucro'])
@@ -96,7 +139,7 @@ def create_profit_chart(valores_reais: Dict[str, float]):
     plt.tight_layout()
     
     buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+    plt.savefig(buf, format='png', dpi=CHART_DPI, bbox_inches='tight')
     buf.seek(0)
     plt.close(fig)
     
@@ -165,10 +208,8 @@ def draw_header_on_canvas(canvas_obj, doc, client_name: str, logo_path: Optional
     canvas_obj.restoreState()
 
 
-def export_client_to_pdf(client_data: Dict, output_path: str):
-    """Exporta dados do cliente para PDF"""
-    
-    # Preparar dados do header - tentar múltiplos nomes de logo
+def find_logo_path() -> Optional[str]:
+    """Procura a logo na raiz do projeto - tentar múltiplos nomes de logo"""
     base_path = os.path.join(os.path.dirname(__file__), '..', '..')
     logo_candidates = ['logo.png', 't2f.png', 'Logo.png', 'LOGO.png']
     logo_path = None
@@ -184,19 +225,15 @@ def export_client_to_pdf(client_data: Dict, output_path: str):
         print(f"Nenhuma logo encontrada em {base_path}")
         print(f"Arquivos disponíveis: {os.listdir(base_path) if os.path.exists(base_path) else 'diretório não existe'}")
     
+    return logo_path
+
+
+def build_client_story(client_data: Dict, chart_backend: Optional[str] = None) -> List:
+    """Monta os elementos (flowables) do relatório de um cliente"""
+    chart_backend = chart_backend or CHART_BACKEND
+    if chart_backend not in CHART_BACKENDS:
+        raise ValueError(f"Backend de gráficos inválido: {chart_backend}")
     data_atual = datetime.now().strftime('%d/%m/%Y')
-    client_name = client_data.get('name', 'Cliente')
-    
-    # Função de callback para desenhar header em cada página
-    def add_header(canvas_obj, doc):
-        draw_header_on_canvas(canvas_obj, doc, client_name, logo_path)
-    
-    # Criar documento com margens normais
-    doc = SimpleDocTemplate(output_path, pagesize=A4,
-                           topMargin=40*mm,  # Espaço para o header
-                           bottomMargin=15*mm,
-                           leftMargin=20*mm, 
-                           rightMargin=20*mm)
     
     story = []
     styles = getSampleStyleSheet()
@@ -231,13 +268,13 @@ def export_client_to_pdf(client_data: Dict, output_path: str):
     story.append(Paragraph(f"<b>Valor Total do Evento:</b> {format_brl(valor_total)}", normal_style))
     
     # Calcular dados de lucro para exibir logo abaixo
-    percentuais = client_data.get('percentuais', {})
     valores_reais = client_data.get('valores_reais', {})
-    valores_esperados = {k: valor_total * (v / 100) for k, v in percentuais.items()}
+    resumo = resumir_cliente(client_data)
+    valores_esperados = resumo.valores_esperados
     
-    lucro_real = valores_reais.get('Lucro', 0.0)
-    lucro_esperado = valores_esperados.get('Lucro', 0.0)
-    lucro_diff = lucro_real - lucro_esperado
+    lucro_real = resumo.lucro_real
+    lucro_esperado = resumo.lucro_esperado
+    lucro_diff = resumo.lucro_diferenca
     
     # Adicionar informações de lucro
     story.append(Paragraph(f"<b>Lucro Esperado:</b> {format_brl(lucro_esperado)}", normal_style))
@@ -255,34 +292,28 @@ def export_client_to_pdf(client_data: Dict, output_path: str):
     # Tabela de valores detalhados
     story.append(Paragraph("<b>Detalhamento de Custos e Margens</b>", subtitle_style))
     
-    percentuais = client_data.get('percentuais', {})
-    valores_reais = client_data.get('valores_reais', {})
-    
     # Preparar dados da tabela
     table_data = [['Categoria', 'Margem (%)', 'Valor Esperado', 'Valor Real', 'Diferença']]
     
-    total_real = sum(valores_reais.values())
+    total_real = resumo.total_real
     
-    for categoria in percentuais.keys():
-        perc = percentuais[categoria]
-        esp = valores_esperados.get(categoria, 0.0)
-        real = valores_reais.get(categoria, 0.0)
-        diff = real - esp
+    for linha in resumo.linhas:
+        diff = linha.diferenca
         diff_str = format_brl(diff)
         if diff > 0:
             diff_str = f"+{diff_str}"
         
         table_data.append([
-            categoria,
-            f"{perc:.1f}%",
-            format_brl(esp),
-            format_brl(real),
+            linha.categoria,
+            f"{linha.percentual:.1f}%",
+            format_brl(linha.esperado),
+            format_brl(linha.real),
             diff_str
         ])
     
     # Totais
-    total_esp = sum(valores_esperados.values())
-    total_diff = total_real - total_esp
+    total_esp = resumo.total_esperado
+    total_diff = resumo.total_diferenca
     total_diff_str = format_brl(total_diff)
     if total_diff > 0:
         total_diff_str = f"+{total_diff_str}"
@@ -334,13 +365,18 @@ def export_client_to_pdf(client_data: Dict, output_path: str):
     story.append(Paragraph("<b>Visualizações Gráficas</b>", subtitle_style))
     story.append(Spacer(1, 3*mm))
     
-    # Gráfico de distribuição
-    chart_buf = create_chart_image(valores_esperados, valores_reais)
-    chart_img = Image(chart_buf, width=115*mm, height=60*mm)
-    
-    # Gráfico de lucro (menor para dar mais espaço à distribuição)
-    profit_buf = create_profit_chart(valores_reais)
-    profit_img = Image(profit_buf, width=50*mm, height=50*mm)
+    if chart_backend == 'reportlab':
+        from src.utils.pdf_charts import create_chart_drawing, create_profit_drawing
+        chart_img = create_chart_drawing(valores_esperados, valores_reais, 115*mm, 60*mm)
+        profit_img = create_profit_drawing(valores_reais, 50*mm, 50*mm)
+    else:
+        # Gráfico de distribuição
+        chart_buf = create_chart_image(valores_esperados, valores_reais)
+        chart_img = Image(chart_buf, width=115*mm, height=60*mm)
+        
+        # Gráfico de lucro (menor para dar mais espaço à distribuição)
+        profit_buf = create_profit_chart(valores_reais)
+        profit_img = Image(profit_buf, width=50*mm, height=50*mm)
     
     # Criar tabela com dois gráficos lado a lado
     graphs_table = Table([[chart_img, profit_img]], colWidths=[120*mm, 50*mm])
@@ -362,7 +398,31 @@ def export_client_to_pdf(client_data: Dict, output_path: str):
     )
     story.append(Paragraph(f"Relatório gerado em {data_atual} - Calculadora de Eventos", footer_style))
     
+    return story
+
+
+@traced()
+def export_client_to_pdf(client_data: Dict, output_path: str, logo_path: Optional[str] = None,
+                         chart_backend: Optional[str] = None):
+    """Exporta dados do cliente para PDF"""
+    if logo_path is None:
+        logo_path = find_logo_path()
+    
+    client_name = client_data.get('name', 'Cliente')
+    
+    # Função de callback para desenhar header em cada página
+    def add_header(canvas_obj, doc):
+        draw_header_on_canvas(canvas_obj, doc, client_name, logo_path)
+    
+    # Criar documento com margens normais
+    doc = SimpleDocTemplate(output_path, pagesize=A4,
+                           topMargin=40*mm,  # Espaço para o header
+                           bottomMargin=15*mm,
+                           leftMargin=20*mm, 
+                           rightMargin=20*mm)
+    
     # Construir PDF com callbacks de header
-    doc.build(story, onFirstPage=add_header, onLaterPages=add_header)
+    doc.build(build_client_story(client_data, chart_backend), onFirstPage=add_header, onLaterPages=add_header)
     
     return output_path
+
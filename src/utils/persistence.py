@@ -0,0 +1,157 @@
+"""
+Gravação assíncrona dos clientes fora da thread da interface
+
+O PersistenceWorker recebe as operações do ClientRepository na thread
+principal e as executa no storage em uma QThread própria. Atualizações
+seguidas do mesmo cliente são mescladas em uma única gravação; falhas são
+reportadas pelo sinal save_failed, e as atualizações que falharam também por
+update_failed, para o repositório marcar o cliente como sujo de novo.
+
+As operações endereçam clientes pela posição, então uma criação ou exclusão
+que falha não pode ser pulada: as posições do repositório e as do storage
+deixariam de bater e as gravações seguintes iriam para o cliente errado. Ela
+volta para a frente da fila, com tudo o que veio depois, e é tentada de novo
+a cada RETRY_MS; nada depois dela é gravado antes. Se ainda falhar ao fechar
+a janela, o restante da fila é descartado (o disco fica na última versão
+consistente) e a perda é reportada por save_failed.
+
+Com um HistoryStore, os eventos do histórico (já calculados na thread
+principal por HistoryStore.prepare) e a limpeza por retenção entram na mesma
+fila, na ordem em que foram pedidos.
+"""
+import copy
+import threading
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from src.utils import storage
+from src.utils.history import HistoryEvent, HistoryStore
+
+# Intervalo entre as tentativas de uma criação/exclusão que falhou
+RETRY_MS = 2000
+
+# Operações que mudam as posições dos clientes no storage
+_ESTRUTURAIS = ('create', 'delete')
+
+
+class PersistenceWorker(QThread):
+    """Fila de gravações executada em segundo plano.
+
+    Implementa a mesma interface de escrita do StorageWriter do repositório
+    (append/update/delete), então pode ser passado como writer.
+    """
+    save_failed = Signal(str)
+    saved = Signal(int)
+    # o dict do cliente (o do repositório, não a cópia gravada) cuja atualização falhou
+    update_failed = Signal(object)
+
+    def __init__(self, parent=None, history: Optional[HistoryStore] = None):
+        super().__init__(parent)
+        self.history = history
+        self._cond = threading.Condition()
+        self._ops: List[List[Any]] = []
+        # posição em _ops da última atualização pendente de cada cliente,
+        # válida apenas até a próxima operação estrutural (create/delete)
+        self._pending_updates: Dict[int, int] = {}
+        self._stopping = False
+        # a última rodada parou numa operação estrutural que falhou
+        self._bloqueado = False
+
+    # ------------------------------------------------------------------
+    # Chamados na thread principal
+    # ------------------------------------------------------------------
+    def _submit(self, op: List[Any]):
+        with self._cond:
+            self._ops.append(op)
+            self._cond.notify()
+
+    def append(self, client_data: Dict[str, Any]):
+        with self._cond:
+            self._pending_updates.clear()
+            self._submit(['create', copy.deepcopy(client_data)])
+
+    def update(self, index: int, client_data: Dict[str, Any]):
+        snapshot = copy.deepcopy(client_data)
+        with self._cond:
+            pos = self._pending_updates.get(index)
+            if pos is not None:
+                self._ops[pos][2:] = [snapshot, client_data]
+                return
+            self._pending_updates[index] = len(self._ops)
+            self._submit(['update', index, snapshot, client_data])
+
+    def delete(self, index: int):
+        with self._cond:
+            self._pending_updates.clear()
+            self._submit(['delete', index])
+
+    def record_history(self, evento: HistoryEvent):
+        self._submit(['history', evento])
+
+    def forget_history(self, client_data: Dict[str, Any]):
+        self._submit(['forget', {'historico_id': client_data.get('historico_id')}])
+
+    def prune_history(self):
+        self._submit(['prune'])
+
+    def stop(self):
+        """Grava o que estiver na fila e encerra a thread (bloqueia até terminar)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self.wait()
+
+    # ------------------------------------------------------------------
+    # Thread de gravação
+    # ------------------------------------------------------------------
+    def run(self):
+        while True:
+            with self._cond:
+                if self._bloqueado and not self._stopping:
+                    self._cond.wait(RETRY_MS / 1000)
+                while not self._ops and not self._stopping:
+                    self._cond.wait()
+                if not self._ops:
+                    return
+                ops, self._ops = self._ops, []
+                self._pending_updates.clear()
+                parando = self._stopping
+
+            feitas = self._executar(ops)
+            self._bloqueado = feitas < len(ops)
+            if self._bloqueado:
+                restantes = ops[feitas:]
+                if parando:
+                    self.save_failed.emit(f'{len(restantes)} alterações não gravadas')
+                    return
+                with self._cond:
+                    # de volta à frente da fila, antes do que chegou enquanto isso
+                    self._ops[:0] = restantes
+                    self._pending_updates.clear()
+            self.saved.emit(feitas)
+
+    def _executar(self, ops: List[List[Any]]) -> int:
+        """Grava as operações em ordem; retorna quantas foram processadas antes de uma
+        criação/exclusão que falhou (len(ops) se nenhuma falhou)"""
+        for n, op in enumerate(ops):
+            try:
+                if op[0] == 'create':
+                    storage.append_client(op[1])
+                elif op[0] == 'update':
+                    storage.update_client(op[1], op[2])
+                elif op[0] == 'delete':
+                    storage.delete_client(op[1])
+                elif op[0] == 'history':
+                    self.history.write(op[1])
+                elif op[0] == 'forget':
+                    self.history.forget(op[1])
+                elif op[0] == 'prune':
+                    self.history.prune()
+            except Exception as e:
+                self.save_failed.emit(f'{op[0]}: {e}')
+                if op[0] in _ESTRUTURAIS:
+                    return n
+                if op[0] == 'update':
+                    self.update_failed.emit(op[3])
+        return len(ops)
@@ -0,0 +1,222 @@
+"""
+Agregados da carteira de clientes mantidos de forma incremental
+
+PortfolioAggregates guarda a contribuição de cada cliente (em centavos) para
+as somas da carteira: valor total, esperado e real por categoria, lucro e
+estouro de orçamento. Cada criação, alteração ou exclusão subtrai a
+contribuição antiga e soma a nova, sem percorrer os outros clientes; os
+clientes com maior estouro ficam numa lista ordenada (bisect), então ler os
+totais e o top-k custa O(categorias + k).
+
+Estouro = custos reais - custos esperados (todas as categorias menos o
+lucro); positivo quando o evento gastou mais que o previsto.
+
+Recebe as alterações como listener do ClientRepository (client_created,
+client_updated, client_deleted).
+"""
+import bisect
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils import money
+from src.utils.summary import CATEGORIA_LUCRO
+
+# Quantidade de clientes no ranking de estouro exibido pelo painel
+TOP_K = 10
+
+
+@dataclass(eq=False)
+class _Contribuicao:
+    """Parte de um cliente nas somas da carteira (centavos); comparada por identidade"""
+    token: int
+    name: str
+    valor_total: int
+    esperado: Dict[str, int]
+    real: Dict[str, int]
+    lucro_esperado: int
+    lucro_real: int
+    estouro: int
+
+
+@dataclass
+class CategoriaCarteira:
+    categoria: str
+    esperado: float
+    real: float
+
+    @property
+    def diferenca(self) -> float:
+        return money.from_cents(money.to_cents(self.real) - money.to_cents(self.esperado))
+
+
+@dataclass
+class ClienteEstouro:
+    """Entrada do ranking; token identifica o cliente (ver PortfolioAggregates.posicao)"""
+    token: int
+    name: str
+    estouro: float
+
+
+@dataclass
+class PortfolioSnapshot:
+    clientes: int = 0
+    valor_total: float = 0.0
+    total_esperado: float = 0.0
+    total_real: float = 0.0
+    lucro_esperado: float = 0.0
+    lucro_real: float = 0.0
+    categorias: List[CategoriaCarteira] = field(default_factory=list)
+    maiores_estouros: List[ClienteEstouro] = field(default_factory=list)
+
+
+def _contribuicao(token: int, client: Dict[str, Any]) -> _Contribuicao:
+    # mesma conta de summary.resumir_cliente, convertendo cada valor uma vez só
+    valor_total = money.to_cents(client.get('valor_total', 0.0))
+    try:
+        esperado = money.dividir_centavos(valor_total, client.get('percentuais', {}))
+    except ValueError:
+        # tabela inválida (ex: clients.json editado à mão): entra só com os valores reais;
+        # o erro aparece ao abrir o cliente
+        esperado = {}
+    real = {c: money.to_cents(v) for c, v in client.get('valores_reais', {}).items()}
+    return _Contribuicao(
+        token=token,
+        name=client.get('name', ''),
+        valor_total=valor_total,
+        esperado=esperado,
+        real=real,
+        lucro_esperado=esperado.get(CATEGORIA_LUCRO, 0),
+        lucro_real=real.get(CATEGORIA_LUCRO, 0),
+        estouro=sum(real.get(c, 0) - e for c, e in esperado.items() if c != CATEGORIA_LUCRO),
+    )
+
+
+class PortfolioAggregates:
+    """Somas da carteira e ranking de estouro, atualizados por delta"""
+
+    def __init__(self, clients: Optional[List[Dict[str, Any]]] = None,
+                 on_changed: Optional[Callable[[], None]] = None):
+        # chamado depois de cada alteração (ex: para atualizar o painel)
+        self.on_changed = on_changed
+        self._proximo_token = 0
+        # contribuição de cada cliente, na ordem das posições do repositório
+        self._contribuicoes: List[_Contribuicao] = []
+        self._por_token: Dict[int, _Contribuicao] = {}
+        self._valor_total = 0
+        self._lucro_esperado = 0
+        self._lucro_real = 0
+        self._esperado: Dict[str, int] = {}
+        self._real: Dict[str, int] = {}
+        # (-estouro, token) em ordem crescente = maiores estouros primeiro
+        self._ranking: List[Tuple[int, int]] = []
+        self.rebuild(clients or [])
+
+    # ------------------------------------------------------------------
+    # Somas
+    # ------------------------------------------------------------------
+    def _novo(self, client: Dict[str, Any]) -> _Contribuicao:
+        self._proximo_token += 1
+        return _contribuicao(self._proximo_token, client)
+
+    def _aplicar(self, c: _Contribuicao, sinal: int):
+        self._valor_total += sinal * c.valor_total
+        self._lucro_esperado += sinal * c.lucro_esperado
+        self._lucro_real += sinal * c.lucro_real
+        for categoria, valor in c.esperado.items():
+            self._esperado[categoria] = self._esperado.get(categoria, 0) + sinal * valor
+        for categoria, valor in c.real.items():
+            self._real[categoria] = self._real.get(categoria, 0) + sinal * valor
+        self._descartar_zeradas([*c.esperado, *c.real])
+        chave = (-c.estouro, c.token)
+        if sinal > 0:
+            bisect.insort(self._ranking, chave)
+            self._por_token[c.token] = c
+        else:
+            del self._ranking[bisect.bisect_left(self._ranking, chave)]
+            del self._por_token[c.token]
+
+    def _descartar_zeradas(self, categorias):
+        """Tira das somas as categorias com esperado e real zerados (ex: último cliente
+        que as usava excluído), para não ficarem como linhas 0,00 no painel"""
+        for categoria in categorias:
+            if not self._esperado.get(categoria) and not self._real.get(categoria):
+                self._esperado.pop(categoria, None)
+                self._real.pop(categoria, None)
+
+    def _notificar(self):
+        if self.on_changed is not None:
+            self.on_changed()
+
+    def rebuild(self, clients: List[Dict[str, Any]]):
+        """Recalcula tudo a partir da lista (apenas na carga inicial)"""
+        self._contribuicoes = [self._novo(client) for client in clients]
+        self._valor_total = sum(c.valor_total for c in self._contribuicoes)
+        self._lucro_esperado = sum(c.lucro_esperado for c in self._contribuicoes)
+        self._lucro_real = sum(c.lucro_real for c in self._contribuicoes)
+        self._esperado, self._real = {}, {}
+        for c in self._contribuicoes:
+            for categoria, valor in c.esperado.items():
+                self._esperado[categoria] = self._esperado.get(categoria, 0) + valor
+            for categoria, valor in c.real.items():
+                self._real[categoria] = self._real.get(categoria, 0) + valor
+        self._descartar_zeradas([*self._esperado, *self._real])
+        self._ranking = sorted((-c.estouro, c.token) for c in self._contribuicoes)
+        self._por_token = {c.token: c for c in self._contribuicoes}
+        self._notificar()
+
+    # ------------------------------------------------------------------
+    # Listener do ClientRepository
+    # ------------------------------------------------------------------
+    def client_created(self, index: int, client: Dict[str, Any]):
+        c = self._novo(client)
+        self._contribuicoes.insert(index, c)
+        self._aplicar(c, +1)
+        self._notificar()
+
+    def client_updated(self, index: int, client: Dict[str, Any]):
+        self._aplicar(self._contribuicoes[index], -1)
+        c = self._contribuicoes[index] = _contribuicao(self._contribuicoes[index].token, client)
+        self._aplicar(c, +1)
+        self._notificar()
+
+    def client_deleted(self, index: int):
+        self._aplicar(self._contribuicoes.pop(index), -1)
+        self._notificar()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+    def posicao(self, token: int) -> int:
+        """Posição atual do cliente de uma entrada do ranking (-1 se não existe mais).
+
+        Percorre a lista: usado só quando o usuário escolhe um cliente do ranking.
+        """
+        c = self._por_token.get(token)
+        if c is None:
+            return -1
+        return self._contribuicoes.index(c)
+
+    def top_estouros(self, k: int = TOP_K) -> List[ClienteEstouro]:
+        """Os k clientes com maior estouro positivo"""
+        maiores = []
+        for negativo, token in self._ranking[:k]:
+            if negativo >= 0:
+                break
+            maiores.append(ClienteEstouro(token, self._por_token[token].name, money.from_cents(-negativo)))
+        return maiores
+
+    def snapshot(self, k: int = TOP_K) -> PortfolioSnapshot:
+        total_esperado = sum(self._esperado.values())
+        total_real = sum(self._real.values())
+        return PortfolioSnapshot(
+            clientes=len(self._contribuicoes),
+            valor_total=money.from_cents(self._valor_total),
+            total_esperado=money.from_cents(total_esperado),
+            total_real=money.from_cents(total_real),
+            lucro_esperado=money.from_cents(self._lucro_esperado),
+            lucro_real=money.from_cents(self._lucro_real),
+            categorias=[CategoriaCarteira(c, money.from_cents(self._esperado.get(c, 0)),
+                                          money.from_cents(self._real.get(c, 0)))
+                        for c in dict.fromkeys([*self._esperado, *self._real])],
+            maiores_estouros=self.top_estouros(k),
+        )
@@ -0,0 +1,196 @@
+"""
+Geração de relatórios PDF em fila, com asyncio
+
+Para as rodadas noturnas: os clientes são lidos do repositório um a um e
+entram numa fila limitada (asyncio.Queue com maxsize); quando a fila enche, a
+leitura espera, então a memória não cresce com o número de clientes. Um
+número fixo de tarefas consome a fila e manda cada relatório para um
+ProcessPoolExecutor do mesmo tamanho (a renderização é CPU-bound).
+
+Cada relatório concluído é registrado na hora: o PDF já está no disco, a
+linha correspondente vai para o manifesto (JSON lines, opcional) e o callback
+de progresso é chamado.
+
+cancel() para de enfileirar, descarta o que ainda está na fila e espera os
+relatórios em andamento. O timeout vale por relatório; um relatório que
+estoura o tempo é registrado como falha, mas o processo que o renderiza só é
+liberado quando ele termina.
+
+Uso pela linha de comando (não carrega o PySide6):
+    python -m src.utils.report_jobs --saida relatorios/
+    python -m src.utils.report_jobs --saida relatorios/ --concorrencia 4 --fila 16 --timeout 120
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils import storage
+from src.utils.batch_export import _export_job, _init_worker, report_filename
+
+
+@dataclass
+class ReportRunResult:
+    """Resultado de uma rodada de relatórios"""
+    arquivos: Dict[int, str] = field(default_factory=dict)
+    falhas: Dict[int, str] = field(default_factory=dict)
+    # posições que estouraram o timeout (também estão em falhas)
+    expirados: List[int] = field(default_factory=list)
+    # posições descartadas por cancel() antes de começar
+    cancelados: List[int] = field(default_factory=list)
+    segundos: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.arquivos) + len(self.falhas)
+
+    @property
+    def relatorios_por_segundo(self) -> float:
+        return len(self.arquivos) / self.segundos if self.segundos > 0 else 0.0
+
+
+class ReportJobRunner:
+    """Fila de exportação de PDFs com concorrência limitada.
+
+    concurrency: relatórios renderizados ao mesmo tempo (padrão: nº de CPUs).
+    queue_size: clientes lidos à frente dos que estão renderizando (padrão: 2x concurrency).
+    timeout: segundos por relatório (None = sem limite).
+    manifest: arquivo JSON lines com uma linha por relatório concluído.
+    progress: chamado a cada relatório com (concluídos, posição, arquivo, erro).
+    """
+
+    def __init__(self, output_dir: str, concurrency: Optional[int] = None, queue_size: Optional[int] = None,
+                 timeout: Optional[float] = None, chart_backend: Optional[str] = None,
+                 manifest: Optional[str] = None,
+                 progress: Optional[Callable[[int, int, str, Optional[str]], None]] = None):
+        self.output_dir = output_dir
+        self.concurrency = max(1, concurrency or os.cpu_count() or 1)
+        self.queue_size = queue_size if queue_size is not None else 2 * self.concurrency
+        self.timeout = timeout
+        self.chart_backend = chart_backend
+        self.manifest = manifest
+        self.progress = progress
+        self._cancelado = False
+
+    def cancel(self):
+        """Para de enfileirar e descarta a fila; os relatórios em andamento terminam"""
+        self._cancelado = True
+
+    async def run(self, clients: Optional[Iterable[Tuple[int, Dict]]] = None) -> ReportRunResult:
+        """Gera os relatórios de `clients` (pares posição, cliente; padrão: todos do repositório)"""
+        if clients is None:
+            clients = enumerate(storage.iter_clients())
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._cancelado = False
+        result = ReportRunResult()
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        manifesto = open(self.manifest, 'w', encoding='utf-8') if self.manifest else None
+        pool = ProcessPoolExecutor(max_workers=self.concurrency, initializer=_init_worker)
+        inicio = time.perf_counter()
+        workers = [asyncio.create_task(self._worker(queue, pool, result, manifesto))
+                   for _ in range(self.concurrency)]
+        try:
+            for index, client in clients:
+                if self._cancelado:
+                    break
+                # com a fila cheia a leitura espera um worker liberar espaço
+                await queue.put((index, client))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        except BaseException:
+            # run() cancelado (ex: Ctrl+C): abandona a fila e os relatórios pendentes
+            for worker in workers:
+                worker.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        else:
+            pool.shutdown(wait=True)
+        finally:
+            result.segundos = time.perf_counter() - inicio
+            if manifesto is not None:
+                manifesto.close()
+        return result
+
+    async def _worker(self, queue: asyncio.Queue, pool: ProcessPoolExecutor, result: ReportRunResult, manifesto):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            index, client = job
+            if self._cancelado:
+                result.cancelados.append(index)
+                continue
+            path = os.path.join(self.output_dir, report_filename(index, client))
+            inicio = time.perf_counter()
+            future = loop.run_in_executor(pool, _export_job, index, client, path, self.chart_backend)
+            try:
+                _, _, erro = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                erro = f'tempo esgotado ({self.timeout:g}s)'
+                result.expirados.append(index)
+            self._registrar(result, manifesto, index, path, erro, time.perf_counter() - inicio)
+
+    def _registrar(self, result: ReportRunResult, manifesto, index: int, path: str, erro: Optional[str],
+                   segundos: float):
+        if erro is None:
+            result.arquivos[index] = path
+        else:
+            result.falhas[index] = erro
+        if manifesto is not None:
+            manifesto.write(json.dumps({'posicao': index, 'arquivo': path if erro is None else None,
+                                        'erro': erro, 'segundos': round(segundos, 3)}, ensure_ascii=False) + '\n')
+            manifesto.flush()
+        if self.progress is not None:
+            self.progress(result.total, index, path, erro)
+
+
+def generate_reports(output_dir: str, clients: Optional[Iterable[Tuple[int, Dict]]] = None,
+                     **kwargs) -> ReportRunResult:
+    """Atalho síncrono: asyncio.run(ReportJobRunner(output_dir, **kwargs).run(clients))"""
+    return asyncio.run(ReportJobRunner(output_dir, **kwargs).run(clients))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Gera os relatórios PDF de todos os clientes em fila')
+    parser.add_argument('--saida', required=True, help='diretório onde os PDFs serão gravados')
+    parser.add_argument('--filtro', help='apenas clientes cujo nome contém este texto')
+    parser.add_argument('--concorrencia', type=int, default=None, help='relatórios ao mesmo tempo (padrão: nº de CPUs)')
+    parser.add_argument('--fila', type=int, default=None, help='clientes lidos à frente (padrão: 2x concorrência)')
+    parser.add_argument('--timeout', type=float, default=None, help='segundos por relatório')
+    parser.add_argument('--manifesto', help='arquivo JSON lines com o resultado de cada relatório')
+    parser.add_argument('--graficos', choices=['matplotlib', 'reportlab'], default=None,
+                        help='backend dos gráficos (reportlab = vetorial, mais rápido)')
+    args = parser.parse_args(argv)
+
+    clients = enumerate(storage.iter_clients())
+    if args.filtro:
+        filtro = args.filtro.lower()
+        clients = ((i, c) for i, c in clients if filtro in c.get('name', '').lower())
+
+    def progress(done, index, path, erro):
+        status = 'ok' if erro is None else f'ERRO: {erro}'
+        print(f'[{done}] cliente {index}: {status}')
+
+    runner = ReportJobRunner(args.saida, args.concorrencia, args.fila, args.timeout, args.graficos,
+                             args.manifesto, progress)
+    try:
+        result = asyncio.run(runner.run(clients))
+    except KeyboardInterrupt:
+        print('Interrompido')
+        return 130
+    print(f'{len(result.arquivos)} relatórios gerados, {len(result.falhas)} falhas '
+          f'em {result.segundos:.1f}s ({result.relatorios_por_segundo:.2f} relatórios/s)')
+    return 1 if result.falhas else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Repositório de clientes em memória com escrita adiada (write-back)
+
+Os clientes são lidos uma única vez do storage; leituras são acessos diretos
+à lista em memória e alterações apenas marcam o cliente como sujo. As
+gravações pendentes são feitas em lote por flush(), chamado pela janela
+principal após um debounce e ao fechar.
+
+As gravações passam por um writer: StorageWriter grava direto no storage;
+a interface usa o PersistenceWorker, que grava em segundo plano.
+
+Listeners (add_listener) são avisados de cada criação, alteração e exclusão
+com client_created(index, client), client_updated(index, client) e
+client_deleted(index), na hora da mudança em memória.
+"""
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.utils import storage
+
+
+class StorageWriter:
+    """Writer síncrono: repassa as operações diretamente ao storage"""
+
+    def append(self, client_data: Dict[str, Any]):
+        storage.append_client(client_data)
+
+    def update(self, index: int, client_data: Dict[str, Any]):
+        storage.update_client(index, client_data)
+
+    def delete(self, index: int):
+        storage.delete_client(index)
+
+
+class ClientRepository:
+    """Único ponto de leitura/escrita de clientes para a interface"""
+
+    def __init__(self, on_dirty: Optional[Callable[[], None]] = None, writer=None):
+        # chamado sempre que há alterações pendentes (ex: para agendar flush)
+        self.on_dirty = on_dirty
+        self.writer = writer or StorageWriter()
+        self._clients: List[Dict[str, Any]] = storage.load_all_clients().get('clients', [])
+        self._dirty: Set[int] = set()
+        self._listeners: List[Any] = []
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def _check_index(self, index: int):
+        if index < 0 or index >= len(self._clients):
+            raise IndexError('Client index out of range')
+
+    def count(self) -> int:
+        return len(self._clients)
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Lista em memória (não copiar/alterar fora do repositório sem mark_dirty)"""
+        return self._clients
+
+    def get(self, index: int) -> Dict[str, Any]:
+        self._check_index(index)
+        return self._clients[index]
+
+    def create(self, name: Optional[str] = None) -> Dict[str, Any]:
+        client = storage.new_client(name)
+        self._clients.append(client)
+        self.writer.append(client)
+        for listener in self._listeners:
+            listener.client_created(len(self._clients) - 1, client)
+        return client
+
+    def update(self, index: int, client_data: Optional[Dict[str, Any]] = None):
+        """Substitui (ou apenas marca como alterado) o cliente; grava no próximo flush"""
+        self._check_index(index)
+        if client_data is not None:
+            self._clients[index] = client_data
+        self._dirty.add(index)
+        for listener in self._listeners:
+            listener.client_updated(index, self._clients[index])
+        if self.on_dirty is not None:
+            self.on_dirty()
+
+    def rename(self, index: int, name: str):
+        self._check_index(index)
+        self._clients[index]['name'] = name
+        self.update(index)
+
+    def delete(self, index: int):
+        self._check_index(index)
+        # gravar pendências antes, pois os índices mudam após a exclusão
+        self.flush()
+        self._clients.pop(index)
+        self.writer.delete(index)
+        for listener in self._listeners:
+            listener.client_deleted(index)
+
+    def has_pending(self) -> bool:
+        return bool(self._dirty)
+
+    def flush(self) -> int:
+        """Envia os clientes sujos ao writer e retorna quantos foram enviados"""
+        dirty = sorted(self._dirty)
+        self._dirty.clear()
+        for n, index in enumerate(dirty):
+            try:
+                self.writer.update(index, self._clients[index])
+            except Exception:
+                # o que não foi gravado continua pendente para o próximo flush
+                self._dirty.update(dirty[n:])
+                raise
+        return len(dirty)
+
+    def retry_failed(self, client_data: Dict[str, Any]):
+        """Marca de novo como sujo o cliente cuja gravação em segundo plano falhou.
+
+        O cliente é procurado pelo próprio dict (a posição pode ter mudado
+        com exclusões); se já foi excluído, não há o que regravar. A nova
+        tentativa acontece no próximo flush.
+        """
+        for index, client in enumerate(self._clients):
+            if client is client_data:
+                self._dirty.add(index)
+                return
@@ -0,0 +1,334 @@
+"""
+Varredura de cenários sobre a tabela de percentuais
+
+Combina vários valores totais de evento com faixas alternativas de
+percentuais (ex: CMV de 25% a 35%, Staff de 10% a 15%); a categoria restante
+(Lucro, por padrão) fica com o que sobrar até 100%. Cenários em que o
+restante ficaria negativo são descartados.
+
+A grade não é montada em memória: cada cenário é um índice no produto
+cartesiano dos eixos, decomposto em base mista pedaço a pedaço. Cada pedaço
+é avaliado de forma vetorizada com o núcleo em centavos (money), e só os
+agregados (estatísticas, top-k e superfície de lucro) são mantidos. Com
+workers > 1 os pedaços são distribuídos em um ProcessPoolExecutor.
+
+Uso pela linha de comando (não carrega o PySide6):
+    python -m src.utils.scenarios --totais 10000:100000:5000 --variar CMV=25:35:1 Staff=10:15:0.5
+    python -m src.utils.scenarios --totais 50000 --variar CMV=25:35:0.5 --superficie total CMV --workers 4
+"""
+import argparse
+import heapq
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from src.utils import money
+from src.utils.calculator import CalculadoraCustos
+from src.utils.constants import PERCENTUAIS
+
+# Cenários avaliados por vez (memória ~ CHUNK_SIZE x categorias x 8 bytes por array)
+CHUNK_SIZE = 65536
+ORDENACOES = ('lucro', 'margem')
+EIXO_TOTAL = 'total'
+
+
+def faixa(inicio: float, fim: float, passo: float) -> List[float]:
+    """Valores de inicio a fim (inclusive) com o passo, sem erro acumulado de float"""
+    a, b, p = money.to_cents(inicio), money.to_cents(fim), money.to_cents(passo)
+    if p <= 0:
+        raise ValueError('O passo deve ser positivo')
+    return [money.from_cents(v) for v in range(a, b + 1, p)]
+
+
+@dataclass
+class SweepResult:
+    """Resumo de uma varredura (valores em reais; margem em %)"""
+    total_cenarios: int = 0
+    validos: int = 0
+    lucro_min: float = 0.0
+    lucro_max: float = 0.0
+    lucro_medio: float = 0.0
+    lucro_desvio: float = 0.0
+    margem_media: float = 0.0
+    melhores: List[Dict[str, Any]] = field(default_factory=list)
+    # {'eixos': (x, y), 'x': [...], 'y': [...], 'lucro_medio': [[...]]}, se pedida
+    superficie: Optional[Dict[str, Any]] = None
+
+
+class _Parcial:
+    """Agregados de um ou mais pedaços; combináveis entre processos"""
+
+    def __init__(self, k: int, forma_superficie: Optional[Tuple[int, int]]):
+        self.k = k
+        self.validos = 0
+        self.soma = 0
+        self.soma_quadrados = 0.0
+        self.soma_margem = 0.0
+        self.minimo: Optional[int] = None
+        self.maximo: Optional[int] = None
+        # (chave de ordenação, -índice): maior chave primeiro, empate pelo menor índice
+        self.melhores: List[Tuple[float, int]] = []
+        self.sup_soma = None
+        self.sup_contagem = None
+        if forma_superficie is not None:
+            import numpy as np
+            self.sup_soma = np.zeros(forma_superficie, dtype=np.float64)
+            self.sup_contagem = np.zeros(forma_superficie, dtype=np.int64)
+
+    def combinar(self, outro: '_Parcial'):
+        self.validos += outro.validos
+        self.soma += outro.soma
+        self.soma_quadrados += outro.soma_quadrados
+        self.soma_margem += outro.soma_margem
+        if outro.minimo is not None and (self.minimo is None or outro.minimo < self.minimo):
+            self.minimo = outro.minimo
+        if outro.maximo is not None and (self.maximo is None or outro.maximo > self.maximo):
+            self.maximo = outro.maximo
+        self.melhores = heapq.nlargest(self.k, self.melhores + outro.melhores)
+        if self.sup_soma is not None:
+            self.sup_soma += outro.sup_soma
+            self.sup_contagem += outro.sup_contagem
+
+
+class ScenarioSweep:
+    """Grade de cenários: totais x faixas de percentuais de algumas categorias"""
+
+    def __init__(self, calculadora: CalculadoraCustos, totais: Sequence[float],
+                 variacoes: Mapping[str, Sequence[float]], restante: str = 'Lucro'):
+        self.categorias = calculadora.categorias
+        if restante not in self.categorias:
+            raise ValueError(f"Categoria restante '{restante}' não existe na tabela")
+        for categoria, valores in variacoes.items():
+            if categoria not in self.categorias:
+                raise ValueError(f"Categoria '{categoria}' não existe na tabela")
+            if categoria == restante:
+                raise ValueError(f"'{restante}' é calculada pelo restante e não pode variar")
+            if not valores:
+                raise ValueError(f"Faixa vazia para '{categoria}'")
+        if not totais:
+            raise ValueError('Informe ao menos um valor total')
+
+        self.restante = restante
+        self.totais = list(totais)
+        self.variacoes = {c: list(v) for c, v in variacoes.items()}
+        self.eixos = [EIXO_TOTAL] + list(self.variacoes)
+        self.tamanhos = [len(self.totais)] + [len(v) for v in self.variacoes.values()]
+        self._pesos_base = [money.percent_to_units(calculadora.percentuais[c]) for c in self.categorias]
+        self._totais_centavos = [money.to_cents(t) for t in self.totais]
+        self._unidades = [[money.percent_to_units(p) for p in v] for v in self.variacoes.values()]
+
+    def __len__(self):
+        return math.prod(self.tamanhos)
+
+    def pedacos(self, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, int]]:
+        total = len(self)
+        for inicio in range(0, total, chunk_size):
+            yield inicio, min(inicio + chunk_size, total)
+
+    def _digitos(self, indices):
+        """Índice plano -> índice em cada eixo (base mista, último eixo varia mais rápido)"""
+        import numpy as np
+
+        digitos = []
+        resto = indices
+        for tamanho in reversed(self.tamanhos):
+            resto, digito = np.divmod(resto, tamanho)
+            digitos.append(digito)
+        digitos.reverse()
+        return digitos
+
+    def avaliar(self, inicio: int, fim: int):
+        """Avalia os cenários [inicio, fim): (índices válidos, totais, valores em centavos)"""
+        import numpy as np
+
+        indices = np.arange(inicio, fim, dtype=np.int64)
+        digitos = self._digitos(indices)
+        totais = np.asarray(self._totais_centavos, dtype=np.int64)[digitos[0]]
+        pesos = np.tile(np.asarray(self._pesos_base, dtype=np.int64), (indices.size, 1))
+        for categoria, unidades, digito in zip(self.variacoes, self._unidades, digitos[1:]):
+            pesos[:, self.categorias.index(categoria)] = np.asarray(unidades, dtype=np.int64)[digito]
+        col = self.categorias.index(self.restante)
+        pesos[:, col] = 0
+        pesos[:, col] = money.ESCALA_PERCENTUAL - pesos.sum(axis=1)
+
+        validos = pesos[:, col] >= 0
+        valores = money.distribuir_lote_centavos(totais[validos], pesos[validos])
+        return indices[validos], totais[validos], valores
+
+    def _avaliar_parcial(self, inicio: int, fim: int, k: int, ordenar_por: str,
+                         eixos_superficie: Optional[Tuple[str, str]]) -> _Parcial:
+        import numpy as np
+
+        forma = None
+        if eixos_superficie is not None:
+            forma = tuple(self.tamanhos[self.eixos.index(e)] for e in eixos_superficie)
+        parcial = _Parcial(k, forma)
+        indices, totais, valores = self.avaliar(inicio, fim)
+        if indices.size == 0:
+            return parcial
+
+        lucro = valores[:, self.categorias.index(self.restante)]
+        margem = np.divide(lucro * 100.0, totais, out=np.zeros(lucro.size), where=totais > 0)
+        parcial.validos = int(indices.size)
+        parcial.soma = int(lucro.sum())
+        parcial.soma_quadrados = float(np.square(lucro, dtype=np.float64).sum())
+        parcial.soma_margem = float(margem.sum())
+        parcial.minimo = int(lucro.min())
+        parcial.maximo = int(lucro.max())
+
+        chave = lucro.astype(np.float64) if ordenar_por == 'lucro' else margem
+        if k > 0:
+            top = np.argpartition(-chave, k - 1)[:k] if chave.size > k else np.arange(chave.size)
+            parcial.melhores = heapq.nlargest(k, [(float(chave[i]), -int(indices[i])) for i in top])
+
+        if forma is not None:
+            digitos = self._digitos(indices)
+            x = digitos[self.eixos.index(eixos_superficie[0])]
+            y = digitos[self.eixos.index(eixos_superficie[1])]
+            plano = x * forma[1] + y
+            parcial.sup_soma += np.bincount(plano, weights=lucro, minlength=forma[0] * forma[1]).reshape(forma)
+            parcial.sup_contagem += np.bincount(plano, minlength=forma[0] * forma[1]).reshape(forma)
+        return parcial
+
+    def cenario(self, indice: int) -> Dict[str, Any]:
+        """Reconstrói um cenário da grade a partir do índice plano"""
+        import numpy as np
+
+        indices, totais, valores = self.avaliar(indice, indice + 1)
+        digitos = [int(d[0]) for d in self._digitos(np.array([indice], dtype=np.int64))]
+        percentuais = {c: u / 100 for c, u in zip(self.categorias, self._pesos_base)}
+        for categoria, valores_eixo, digito in zip(self.variacoes, self.variacoes.values(), digitos[1:]):
+            percentuais[categoria] = valores_eixo[digito]
+        outras = sum(money.percent_to_units(p) for c, p in percentuais.items() if c != self.restante)
+        percentuais[self.restante] = (money.ESCALA_PERCENTUAL - outras) / 100
+        cenario = {'indice': indice, 'valor_total': self.totais[digitos[0]], 'percentuais': percentuais}
+        if indices.size:
+            cenario['valores'] = {c: money.from_cents(int(v)) for c, v in zip(self.categorias, valores[0])}
+            lucro = cenario['valores'][self.restante]
+            cenario['lucro'] = lucro
+            cenario['margem'] = lucro / cenario['valor_total'] * 100 if cenario['valor_total'] > 0 else 0.0
+        return cenario
+
+    def run(self, top_k: int = 10, ordenar_por: str = 'lucro', workers: Optional[int] = None,
+            chunk_size: int = CHUNK_SIZE, eixos_superficie: Optional[Tuple[str, str]] = None) -> SweepResult:
+        """Avalia a grade inteira e retorna os agregados.
+
+        ordenar_por: 'lucro' (em reais) ou 'margem' (lucro / total) para o top-k.
+        workers: processos em paralelo; None ou 1 avalia no processo atual.
+        eixos_superficie: dois eixos ('total' ou categorias variadas) para a
+        média do lucro em cada combinação.
+        """
+        if ordenar_por not in ORDENACOES:
+            raise ValueError(f"ordenar_por deve ser um de {ORDENACOES}")
+        if eixos_superficie is not None:
+            eixos_superficie = tuple(eixos_superficie)
+            for eixo in eixos_superficie:
+                if eixo not in self.eixos:
+                    raise ValueError(f"Eixo '{eixo}' não faz parte da varredura {self.eixos}")
+
+        forma = None
+        if eixos_superficie is not None:
+            forma = tuple(self.tamanhos[self.eixos.index(e)] for e in eixos_superficie)
+        total = _Parcial(top_k, forma)
+        args = (top_k, ordenar_por, eixos_superficie)
+        if workers is not None and workers > 1:
+            # cada tarefa leva só (inicio, fim) e a definição da grade; os pedaços são montados no worker
+            inicios, fins = zip(*self.pedacos(chunk_size))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for parcial in pool.map(_avaliar_pedaco, repeat(self), inicios, fins, *(repeat(a) for a in args)):
+                    total.combinar(parcial)
+        else:
+            for inicio, fim in self.pedacos(chunk_size):
+                total.combinar(self._avaliar_parcial(inicio, fim, *args))
+
+        return self._resultado(total, eixos_superficie)
+
+    def _resultado(self, parcial: _Parcial, eixos_superficie) -> SweepResult:
+        result = SweepResult(total_cenarios=len(self), validos=parcial.validos)
+        if parcial.validos:
+            media = parcial.soma / parcial.validos
+            variancia = max(0.0, parcial.soma_quadrados / parcial.validos - media * media)
+            result.lucro_min = money.from_cents(parcial.minimo)
+            result.lucro_max = money.from_cents(parcial.maximo)
+            result.lucro_medio = media / 100
+            result.lucro_desvio = math.sqrt(variancia) / 100
+            result.margem_media = parcial.soma_margem / parcial.validos
+        result.melhores = [self.cenario(-indice_negativo) for _, indice_negativo in parcial.melhores]
+        if eixos_superficie is not None:
+            import numpy as np
+            medias = np.divide(parcial.sup_soma, parcial.sup_contagem * 100.0,
+                               out=np.full(parcial.sup_soma.shape, np.nan), where=parcial.sup_contagem > 0)
+            x, y = eixos_superficie
+            result.superficie = {
+                'eixos': (x, y),
+                'x': self._valores_eixo(x),
+                'y': self._valores_eixo(y),
+                'lucro_medio': medias.tolist(),
+            }
+        return result
+
+    def _valores_eixo(self, eixo: str) -> List[float]:
+        return list(self.totais) if eixo == EIXO_TOTAL else list(self.variacoes[eixo])
+
+
+def _avaliar_pedaco(sweep: ScenarioSweep, inicio: int, fim: int, k: int, ordenar_por: str,
+                    eixos_superficie) -> _Parcial:
+    return sweep._avaliar_parcial(inicio, fim, k, ordenar_por, eixos_superficie)
+
+
+def _ler_faixa(texto: str) -> List[float]:
+    """'25:35:0.5' -> faixa(25, 35, 0.5); '50000' -> [50000]; '10,12,15' -> lista"""
+    if ':' in texto:
+        inicio, fim, passo = (float(p) for p in texto.split(':'))
+        return faixa(inicio, fim, passo)
+    return [float(p) for p in texto.split(',')]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Varredura de cenários de valor total e percentuais')
+    parser.add_argument('--totais', required=True, help='valores totais: inicio:fim:passo ou lista separada por vírgula')
+    parser.add_argument('--variar', nargs='*', default=[], metavar='CATEGORIA=FAIXA',
+                        help='ex: CMV=25:35:1 Staff=10,12,15')
+    parser.add_argument('--restante', default='Lucro', help='categoria que fica com o restante até 100%%')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--ordenar', choices=ORDENACOES, default='lucro')
+    parser.add_argument('--workers', type=int, default=None, help='processos em paralelo')
+    parser.add_argument('--superficie', nargs=2, metavar=('EIXO_X', 'EIXO_Y'),
+                        help="média do lucro por combinação de dois eixos ('total' ou categoria variada)")
+    args = parser.parse_args(argv)
+
+    variacoes = {}
+    for item in args.variar:
+        categoria, _, texto = item.partition('=')
+        variacoes[categoria] = _ler_faixa(texto)
+
+    calculadora = CalculadoraCustos(PERCENTUAIS)
+    sweep = ScenarioSweep(calculadora, _ler_faixa(args.totais), variacoes, args.restante)
+    result = sweep.run(args.top, args.ordenar, args.workers, eixos_superficie=args.superficie)
+
+    fmt = calculadora.formatar_moeda
+    print(f'{result.validos} de {result.total_cenarios} cenários válidos')
+    if not result.validos:
+        return 1
+    print(f'Lucro: mín {fmt(result.lucro_min)}  médio {fmt(result.lucro_medio)}  máx {fmt(result.lucro_max)}'
+          f'  (desvio {fmt(result.lucro_desvio)})')
+    print(f'Margem média: {result.margem_media:.2f}%')
+    print(f'\nMelhores {len(result.melhores)} por {args.ordenar}:')
+    for cenario in result.melhores:
+        variados = '  '.join(f'{c} {cenario["percentuais"][c]:g}%' for c in variacoes)
+        print(f'  total {fmt(cenario["valor_total"])}  {variados}  {args.restante} '
+              f'{cenario["percentuais"][args.restante]:g}%  ->  {fmt(cenario["lucro"])} ({cenario["margem"]:.2f}%)')
+    if result.superficie:
+        x, y = result.superficie['eixos']
+        print(f'\nLucro médio ({x} nas linhas, {y} nas colunas):')
+        print(' ' * 14 + ''.join(f'{v:>14g}' for v in result.superficie['y']))
+        for valor_x, linha in zip(result.superficie['x'], result.superficie['lucro_medio']):
+            print(f'{valor_x:>14g}' + ''.join(f'{v:>14.2f}' for v in linha))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
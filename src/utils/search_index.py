@@ -0,0 +1,192 @@
+"""
+Índice invertido em memória para buscar clientes pelo nome
+
+Os termos são normalizados sem acentos e sem diferenciar maiúsculas
+("João" == "joao"), e cada palavra da busca casa com o início de alguma
+palavra do cliente ("jo sil" encontra "João da Silva"). Além do nome, são
+indexadas as categorias próprias do cliente (as que não são padrão).
+
+O índice é atualizado incrementalmente ao criar, renomear e excluir
+clientes. Quando a busca só acrescenta letras à anterior (o caso de quem
+está digitando), apenas a palavra alterada é consultada e intersectada com
+o resultado anterior; se o conjunto não mudou ("casa" -> "casamento"), as
+posições já ordenadas da busca anterior são reaproveitadas.
+"""
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.utils.constants import PERCENTUAIS
+
+_PALAVRA = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """Remove acentos e converte para minúsculas"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    return _PALAVRA.findall(normalize(text))
+
+
+def client_terms(client: Dict[str, Any]) -> Set[str]:
+    """Termos indexados de um cliente: nome + categorias próprias"""
+    terms = set(tokenize(client.get('name', '')))
+    for categoria in client.get('percentuais', {}):
+        if categoria not in PERCENTUAIS:
+            terms.update(tokenize(categoria))
+    return terms
+
+
+class ClientSearchIndex:
+    """Índice termo -> clientes, endereçado pela posição do cliente na lista"""
+
+    def __init__(self, clients: Iterable[Dict[str, Any]] = ()):
+        # ids internos estáveis: as posições mudam quando um cliente é excluído
+        self._ids: List[int] = []
+        self._pos: Optional[Dict[int, int]] = {}
+        self._next_id = 0
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        # termos ordenados para achar por bisect todos os que começam com um prefixo
+        self._sorted_terms: List[str] = []
+        self._last_query: Tuple[str, ...] = ()
+        self._last_result: Optional[Set[int]] = None
+        # posições (em ordem) de _last_result, calculadas na primeira search() que o pediu
+        self._last_positions: Optional[List[int]] = None
+        self.rebuild(clients)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def rebuild(self, clients: Iterable[Dict[str, Any]]):
+        self._ids = []
+        self._pos = {}
+        self._terms = {}
+        self._postings = {}
+        for client in clients:
+            client_id = self._new_id()
+            self._pos[client_id] = len(self._ids)
+            self._ids.append(client_id)
+            self._index(client_id, client_terms(client), sort=False)
+        self._sorted_terms = sorted(self._postings)
+        self._invalidate()
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _invalidate(self):
+        self._last_query = ()
+        self._last_result = None
+        self._last_positions = None
+
+    def _index(self, client_id: int, terms: Set[str], sort: bool = True):
+        self._terms[client_id] = tuple(terms)
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = set()
+                if sort:
+                    insort(self._sorted_terms, term)
+            posting.add(client_id)
+
+    def _unindex(self, client_id: int):
+        for term in self._terms.pop(client_id, ()):
+            posting = self._postings[term]
+            posting.discard(client_id)
+            if not posting:
+                del self._postings[term]
+                del self._sorted_terms[bisect_left(self._sorted_terms, term)]
+
+    def add(self, client: Dict[str, Any]):
+        """Indexa um cliente acrescentado ao final da lista"""
+        client_id = self._new_id()
+        if self._pos is not None:
+            self._pos[client_id] = len(self._ids)
+        self._ids.append(client_id)
+        self._index(client_id, client_terms(client))
+        self._invalidate()
+
+    def update(self, position: int, client: Dict[str, Any]):
+        """Reindexa o cliente da posição (ex: após renomear)"""
+        client_id = self._ids[position]
+        terms = client_terms(client)
+        if set(self._terms.get(client_id, ())) == terms:
+            return
+        self._unindex(client_id)
+        self._index(client_id, terms)
+        self._invalidate()
+
+    def remove(self, position: int):
+        """Remove o cliente da posição; os seguintes sobem uma posição"""
+        client_id = self._ids.pop(position)
+        self._unindex(client_id)
+        # mapa id -> posição refeito só na próxima busca
+        self._pos = None
+        self._invalidate()
+
+    def _matching(self, prefix: str) -> Set[int]:
+        """Clientes com algum termo que começa com o prefixo"""
+        terms = self._sorted_terms
+        start = bisect_left(terms, prefix)
+        end = bisect_left(terms, prefix + '\U0010ffff', start)
+        postings = self._postings
+        return set().union(*(postings[terms[i]] for i in range(start, end)))
+
+    def _changed_tokens(self, query: Tuple[str, ...]) -> Optional[List[str]]:
+        """Palavras que mudaram, se a nova busca só restringe a anterior
+        (mais letras na mesma palavra ou palavras a mais); senão None"""
+        last = self._last_query
+        if self._last_result is None or not last or len(query) < len(last):
+            return None
+        if not all(q.startswith(l) for q, l in zip(query, last)):
+            return None
+        return [q for i, q in enumerate(query) if i >= len(last) or q != last[i]]
+
+    def search_ids(self, text: str) -> Optional[Set[int]]:
+        """Ids internos que casam com a busca; None = busca vazia (todos)"""
+        query = tuple(tokenize(text))
+        if not query:
+            self._invalidate()
+            return None
+        if query == self._last_query and self._last_result is not None:
+            return self._last_result
+
+        changed = self._changed_tokens(query)
+        if changed is not None:
+            # digitando: só as palavras alteradas são consultadas, contra o resultado anterior
+            result = self._last_result
+            prefixes = changed
+        else:
+            result = None
+            prefixes = set(query)
+            self._last_positions = None
+        # prefixos mais longos primeiro: conjuntos menores, interseção mais barata
+        for prefix in sorted(prefixes, key=len, reverse=True):
+            if result is not None and not result:
+                break
+            matches = self._matching(prefix)
+            result = matches if result is None else result & matches
+
+        if changed is not None and len(result) < len(self._last_result):
+            # ordenar o conjunto menor sai mais barato que filtrar a lista anterior
+            self._last_positions = None
+        self._last_query = query
+        self._last_result = result
+        return result
+
+    def search(self, text: str) -> Optional[List[int]]:
+        """Posições (em ordem) dos clientes que casam; None = busca vazia (todos)"""
+        ids = self.search_ids(text)
+        if ids is None:
+            return None
+        if self._last_positions is None:
+            if self._pos is None:
+                self._pos = {client_id: position for position, client_id in enumerate(self._ids)}
+            self._last_positions = sorted(map(self._pos.__getitem__, ids))
+        # cópia: o chamador (ex: o modelo da sidebar) altera a própria lista
+        return list(self._last_positions)
@@ -0,0 +1,333 @@
+"""
+Backend SQLite para os clientes (alternativa ao clients.json)
+
+Cada cliente é uma linha com chave primária estável; percentuais, valores
+reais e histórico ficam em tabelas filhas. Criar, excluir, renomear e buscar
+por id/nome tocam apenas as linhas do próprio cliente.
+
+Para usar: CALCULADORA_STORAGE=sqlite (ver storage.get_store) ou
+storage.set_store(SqliteClientStore(...)). Para migrar um clients.json
+existente: python -m src.utils.sqlite_storage migrate
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.utils.storage import (CLIENTS_FILE, JOURNAL_FILE, DATA_DIR, DURABILITY, DURABILITY_NONE,
+                               DURABILITY_FSYNC_FILE, DURABILITY_FSYNC_DIR, JournalClientStore, new_client)
+
+DB_FILE = os.path.join(DATA_DIR, 'clients.db')
+
+# Campos com coluna/tabela própria; o resto do cliente vai para 'extra'
+_CAMPOS_FIXOS = ('id', 'name', 'valor_total', 'percentuais', 'valores_reais', 'historico')
+
+# Equivalente de cada nível de durabilidade do storage no SQLite (modo WAL).
+# fsync-file garante cada gravação no disco ao retornar, como o fsync de cada registro do
+# journal: no WAL isso é FULL (NORMAL só faz fsync no checkpoint e pode perder os últimos
+# commits numa queda de energia). EXTRA soma o fsync do diretório, como o fsync-dir.
+_SYNCHRONOUS = {
+    DURABILITY_NONE: 'OFF',
+    DURABILITY_FSYNC_FILE: 'FULL',
+    DURABILITY_FSYNC_DIR: 'EXTRA',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    valor_total REAL NOT NULL DEFAULT 0,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_clients_name ON clients(name);
+
+CREATE TABLE IF NOT EXISTS percentuais (
+    client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+    ordem INTEGER NOT NULL,
+    categoria TEXT NOT NULL,
+    percentual REAL NOT NULL,
+    PRIMARY KEY (client_id, categoria)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS valores_reais (
+    client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+    ordem INTEGER NOT NULL,
+    categoria TEXT NOT NULL,
+    valor REAL NOT NULL,
+    PRIMARY KEY (client_id, categoria)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS historico (
+    client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    entrada TEXT NOT NULL,
+    PRIMARY KEY (client_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteClientStore:
+    """Mesma interface do JournalClientStore, com lookups indexados por id/nome.
+
+    As funções do storage endereçam clientes por posição; a posição é
+    traduzida para o id por uma lista de ids mantida em memória, então
+    excluir um cliente não reescreve os demais. O id é só da base: os
+    dicts retornados nunca o contêm (save_all reinsere tudo e gera ids
+    novos). Para trabalhar por id use id_at/find_ids_by_name e os métodos
+    *_by_id.
+    """
+
+    def __init__(self, db_path: str = DB_FILE, durability: str = DURABILITY):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f'PRAGMA synchronous={_SYNCHRONOUS[durability]}')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        self._conn.executescript(_SCHEMA)
+        self._ids: Optional[List[int]] = None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Auxiliares
+    # ------------------------------------------------------------------
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    def _id_list(self) -> List[int]:
+        if self._ids is None:
+            self._ids = [row[0] for row in self._conn.execute('SELECT id FROM clients ORDER BY id')]
+        return self._ids
+
+    def _id_for(self, index: int) -> int:
+        ids = self._id_list()
+        if index < 0 or index >= len(ids):
+            raise IndexError('Client index out of range')
+        return ids[index]
+
+    def _write_children(self, client_id: int, client: Dict[str, Any]):
+        c = self._conn
+        c.execute('DELETE FROM percentuais WHERE client_id = ?', (client_id,))
+        c.execute('DELETE FROM valores_reais WHERE client_id = ?', (client_id,))
+        c.execute('DELETE FROM historico WHERE client_id = ?', (client_id,))
+        c.executemany(
+            'INSERT INTO percentuais (client_id, ordem, categoria, percentual) VALUES (?, ?, ?, ?)',
+            [(client_id, i, cat, float(v)) for i, (cat, v) in enumerate(client.get('percentuais', {}).items())]
+        )
+        c.executemany(
+            'INSERT INTO valores_reais (client_id, ordem, categoria, valor) VALUES (?, ?, ?, ?)',
+            [(client_id, i, cat, float(v)) for i, (cat, v) in enumerate(client.get('valores_reais', {}).items())]
+        )
+        c.executemany(
+            'INSERT INTO historico (client_id, seq, entrada) VALUES (?, ?, ?)',
+            [(client_id, i, json.dumps(e, ensure_ascii=False)) for i, e in enumerate(client.get('historico', []))]
+        )
+
+    @staticmethod
+    def _extra(client: Dict[str, Any]) -> str:
+        return json.dumps({k: v for k, v in client.items() if k not in _CAMPOS_FIXOS}, ensure_ascii=False)
+
+    def _insert(self, client: Dict[str, Any]) -> int:
+        cur = self._conn.execute(
+            'INSERT INTO clients (name, valor_total, extra) VALUES (?, ?, ?)',
+            (client.get('name', ''), float(client.get('valor_total', 0.0)), self._extra(client))
+        )
+        client_id = cur.lastrowid
+        self._write_children(client_id, client)
+        return client_id
+
+    def _write(self, client_id: int, client: Dict[str, Any]):
+        self._conn.execute(
+            'UPDATE clients SET name = ?, valor_total = ?, extra = ? WHERE id = ?',
+            (client.get('name', ''), float(client.get('valor_total', 0.0)), self._extra(client), client_id)
+        )
+        self._write_children(client_id, client)
+
+    def _read_many(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        ids = list(ids)
+        if not ids:
+            return []
+        clients: Dict[int, Dict[str, Any]] = {}
+        # consultas em blocos para respeitar o limite de parâmetros do SQLite
+        for start in range(0, len(ids), 500):
+            bloco = ids[start:start + 500]
+            marks = ','.join('?' * len(bloco))
+            for cid, name, valor_total, extra in self._conn.execute(
+                    f'SELECT id, name, valor_total, extra FROM clients WHERE id IN ({marks})', bloco):
+                client = {'name': name, 'percentuais': {}, 'valor_total': valor_total,
+                          'valores_reais': {}, 'historico': []}
+                client.update(json.loads(extra))
+                clients[cid] = client
+            for cid, cat, v in self._conn.execute(
+                    f'SELECT client_id, categoria, percentual FROM percentuais WHERE client_id IN ({marks}) '
+                    f'ORDER BY client_id, ordem', bloco):
+                clients[cid]['percentuais'][cat] = v
+            for cid, cat, v in self._conn.execute(
+                    f'SELECT client_id, categoria, valor FROM valores_reais WHERE client_id IN ({marks}) '
+                    f'ORDER BY client_id, ordem', bloco):
+                clients[cid]['valores_reais'][cat] = v
+            for cid, entrada in self._conn.execute(
+                    f'SELECT client_id, entrada FROM historico WHERE client_id IN ({marks}) '
+                    f'ORDER BY client_id, seq', bloco):
+                clients[cid]['historico'].append(json.loads(entrada))
+        return [clients[i] for i in ids if i in clients]
+
+    # ------------------------------------------------------------------
+    # API compatível com o storage (por posição)
+    # ------------------------------------------------------------------
+    def compact(self):
+        with self._lock:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def load_all(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'clients': self._read_many(self._id_list())}
+
+    def save_all(self, data: Dict[str, Any]):
+        with self._lock, self._transaction():
+            self._conn.execute('DELETE FROM clients')
+            self._ids = [self._insert(client) for client in data.get('clients', [])]
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._id_list())
+
+    def create(self, name: Optional[str] = None) -> Dict[str, Any]:
+        client = new_client(name)
+        self.append(client)
+        return client
+
+    def append(self, client_data: Dict[str, Any]) -> int:
+        with self._lock:
+            ids = self._id_list()  # carregada antes do INSERT para não contar o novo id duas vezes
+            with self._transaction():
+                client_id = self._insert(client_data)
+            ids.append(client_id)
+            return client_id
+
+    def append_many(self, clients: Iterable[Dict[str, Any]]) -> int:
+        """Adiciona vários clientes ao final em uma única transação; retorna quantos"""
+        with self._lock:
+            todos = self._id_list()
+            with self._transaction():
+                ids = [self._insert(client) for client in clients]
+            todos.extend(ids)
+            return len(ids)
+
+    def update(self, index: int, client_data: Dict[str, Any]):
+        with self._lock:
+            client_id = self._id_for(index)
+            with self._transaction():
+                self._write(client_id, client_data)
+
+    def update_many(self, updates: Dict[int, Dict[str, Any]]):
+        """Atualiza vários clientes em uma única transação"""
+        with self._lock:
+            ids = {index: self._id_for(index) for index in updates}
+            with self._transaction():
+                for index, client_data in updates.items():
+                    self._write(ids[index], client_data)
+
+    def get(self, index: int) -> Dict[str, Any]:
+        with self._lock:
+            return self._read_many([self._id_for(index)])[0]
+
+    def delete(self, index: int):
+        with self._lock:
+            client_id = self._id_for(index)
+            with self._transaction():
+                self._conn.execute('DELETE FROM clients WHERE id = ?', (client_id,))
+            self._ids.pop(index)
+
+    def iter_clients(self, bloco: int = 500) -> Iterator[Dict[str, Any]]:
+        """Percorre os clientes em ordem, lendo `bloco` clientes por vez"""
+        with self._lock:
+            ids = list(self._id_list())
+        for start in range(0, len(ids), bloco):
+            with self._lock:
+                clients = self._read_many(ids[start:start + bloco])
+            yield from clients
+
+    # ------------------------------------------------------------------
+    # API por id / nome
+    # ------------------------------------------------------------------
+    def id_at(self, index: int) -> int:
+        """Id atual do cliente na posição `index` (muda após save_all)"""
+        with self._lock:
+            return self._id_for(index)
+
+    def get_by_id(self, client_id: int) -> Dict[str, Any]:
+        with self._lock:
+            found = self._read_many([client_id])
+            if not found:
+                raise KeyError(f'Cliente {client_id} não encontrado')
+            return found[0]
+
+    def delete_by_id(self, client_id: int):
+        with self._lock:
+            with self._transaction():
+                self._conn.execute('DELETE FROM clients WHERE id = ?', (client_id,))
+            if self._ids is not None and client_id in self._ids:
+                self._ids.remove(client_id)
+
+    def rename_by_id(self, client_id: int, name: str):
+        with self._lock, self._transaction():
+            self._conn.execute('UPDATE clients SET name = ? WHERE id = ?', (name, client_id))
+
+    def find_ids_by_name(self, name: str) -> List[int]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT id FROM clients WHERE name = ? ORDER BY id', (name,))]
+
+    def find_by_name(self, name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._read_many(self.find_ids_by_name(name))
+
+
+class _Transaction:
+    """BEGIN/COMMIT explícitos (a conexão usa autocommit)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+def migrate_json_to_sqlite(json_path: str = CLIENTS_FILE, db_path: str = DB_FILE,
+                           journal_path: str = JOURNAL_FILE, overwrite: bool = False) -> int:
+    """Copia os clientes do clients.json (+ journal) para um banco SQLite.
+
+    Retorna a quantidade de clientes migrados. Recusa sobrescrever um banco
+    que já tenha clientes, a menos que overwrite=True.
+    """
+    data = JournalClientStore(json_path, journal_path).load_all()
+    store = SqliteClientStore(db_path)
+    try:
+        if store.count() and not overwrite:
+            raise RuntimeError(f'O banco {db_path} já possui clientes')
+        store.save_all(data)
+        return store.count()
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] != ['migrate']:
+        print('Uso: python -m src.utils.sqlite_storage migrate [clients.json] [clients.db]')
+        sys.exit(1)
+    args = sys.argv[2:]
+    origem = args[0] if len(args) > 0 else CLIENTS_FILE
+    destino = args[1] if len(args) > 1 else DB_FILE
+    total = migrate_json_to_sqlite(origem, destino, os.path.splitext(origem)[0] + '.journal')
+    print(f'{total} clientes migrados para {destino}')
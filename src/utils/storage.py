@@ -1,12 +1,49 @@
 """
 Storage simples em JSON para guardar clientes e seus dados
+
+Os clientes ficam em um snapshot (clients.json) e cada alteração é gravada
+como um registro pequeno em um journal append-only (clients.journal). Ao
+carregar, o snapshot é lido e o journal é reaplicado por cima; quando o
+journal passa de COMPACT_THRESHOLD registros ele é compactado de volta no
+snapshot. Assim uma edição custa uma linha no journal, independente de
+quantos clientes existem.
+
+O snapshot é sempre gravado de forma atômica (arquivo temporário + rename),
+com o nível de durabilidade configurável em DURABILITY, e a versão anterior
+é guardada em um conjunto rotativo de backups compactados.
 """
+import copy
+import gzip
 import json
 import os
-from typing import Dict, Any
+import shutil
+import tempfile
+import threading
+from typing import Dict, Any, Iterator, List, Optional
+
+from src.utils.tracing import traced
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 CLIENTS_FILE = os.path.join(DATA_DIR, 'clients.json')
+JOURNAL_FILE = os.path.join(DATA_DIR, 'clients.journal')
+
+BACKUP_DIR = os.path.join(DATA_DIR, 'backups')
+
+# Quantidade de registros no journal antes de compactar no snapshot
+COMPACT_THRESHOLD = 500
+
+# Níveis de durabilidade das gravações (do mais barato ao mais seguro):
+#   none       - rename atômico, sem fsync (protege contra crash do app, não do SO)
+#   fsync-file - fsync do arquivo antes do rename (e de cada registro do journal)
+#   fsync-dir  - também faz fsync do diretório, garantindo que o rename persistiu
+DURABILITY_NONE = 'none'
+DURABILITY_FSYNC_FILE = 'fsync-file'
+DURABILITY_FSYNC_DIR = 'fsync-dir'
+DURABILITY_LEVELS = (DURABILITY_NONE, DURABILITY_FSYNC_FILE, DURABILITY_FSYNC_DIR)
+DURABILITY = os.environ.get('CALCULADORA_DURABILITY', DURABILITY_FSYNC_FILE)
+
+# Quantidade de backups compactados (clients.json.1.gz = mais recente)
+BACKUP_COUNT = 5
 
 
 DEFAULT_CLIENT = {
@@ -30,47 +67,351 @@ DEFAULT_CLIENT = {
 }
 
 
-def _ensure_storage():
-    os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.exists(CLIENTS_FILE):
-        with open(CLIENTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump({'clients': []}, f, indent=2, ensure_ascii=False)
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Windows não permite abrir diretórios; o rename já é durável lá
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@traced()
+def atomic_write_json(path: str, data: Any, durability: str = DURABILITY, indent: Optional[int] = 2):
+    """Grava JSON em um temporário no mesmo diretório e o renomeia sobre o destino.
+
+    Um crash durante a gravação deixa o arquivo antigo intacto.
+    """
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f'Nível de durabilidade inválido: {durability}')
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            if durability != DURABILITY_NONE:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if durability == DURABILITY_FSYNC_DIR:
+        _fsync_dir(directory)
+
+
+def rotate_backups(path: str, backup_dir: str = BACKUP_DIR, count: int = BACKUP_COUNT):
+    """Guarda uma cópia gzip de `path` em backup_dir, mantendo no máximo `count` versões"""
+    if count <= 0 or not os.path.exists(path):
+        return
+    os.makedirs(backup_dir, exist_ok=True)
+    base = os.path.join(backup_dir, os.path.basename(path))
+    oldest = f'{base}.{count}.gz'
+    if os.path.exists(oldest):
+        os.remove(oldest)
+    for i in range(count - 1, 0, -1):
+        if os.path.exists(f'{base}.{i}.gz'):
+            os.replace(f'{base}.{i}.gz', f'{base}.{i + 1}.gz')
+    tmp_path = f'{base}.1.gz.tmp'
+    with open(path, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp_path, f'{base}.1.gz')
+
+
+def new_client(name: Optional[str] = None) -> Dict[str, Any]:
+    """Cria um novo dicionário de cliente a partir do DEFAULT_CLIENT"""
+    client = copy.deepcopy(DEFAULT_CLIENT)
+    client['name'] = name or DEFAULT_CLIENT['name']
+    return client
+
+
+class JournalClientStore:
+    """Snapshot JSON + journal append-only com os registros de cada operação.
+
+    Mantém em memória o estado já reaplicado e só relê os arquivos quando
+    eles foram alterados por fora (tamanho/mtime diferentes).
+
+    Cada snapshot tem uma geração; os registros do journal levam a geração
+    do snapshot sobre o qual foram escritos, então um journal antigo que
+    sobrou de um crash entre gravar o snapshot e apagar o journal é ignorado.
+    """
+
+    def __init__(self, snapshot_path: str = CLIENTS_FILE, journal_path: str = JOURNAL_FILE,
+                 compact_threshold: int = COMPACT_THRESHOLD, durability: str = DURABILITY,
+                 backup_dir: Optional[str] = None, backup_count: int = BACKUP_COUNT):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_threshold = compact_threshold
+        self.durability = durability
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(snapshot_path), 'backups')
+        self.backup_count = backup_count
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._generation = 0
+        self._signature = None
+        self._journal_entries = 0
+
+    # ------------------------------------------------------------------
+    # Arquivos
+    # ------------------------------------------------------------------
+    def _ensure_storage(self):
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        if not os.path.exists(self.snapshot_path):
+            self._write_snapshot({'clients': []})
+
+    def _current_signature(self):
+        snap = os.stat(self.snapshot_path)
+        try:
+            journal_size = os.stat(self.journal_path).st_size
+        except FileNotFoundError:
+            journal_size = 0
+        return (snap.st_mtime_ns, snap.st_size, journal_size)
+
+    def _write_snapshot(self, data: Dict[str, Any]):
+        rotate_backups(self.snapshot_path, self.backup_dir, self.backup_count)
+        generation = self._generation + 1
+        atomic_write_json(self.snapshot_path, dict(data, journal_generation=generation), self.durability)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._data = data
+        self._generation = generation
+        self._journal_entries = 0
+        self._signature = self._current_signature()
+
+    def _load(self) -> Dict[str, Any]:
+        """Retorna o estado interno (sem cópia), relendo do disco se necessário"""
+        self._ensure_storage()
+        signature = self._current_signature()
+        if self._data is not None and signature == self._signature:
+            return self._data
+
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data.setdefault('clients', [])
+        self._generation = data.pop('journal_generation', 0)
+
+        entries = 0
+        corrompido = False
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # registro incompleto (ex: processo morto no meio da escrita)
+                        corrompido = True
+                        continue
+                    if record.get('gen', 0) != self._generation:
+                        # journal de um snapshot anterior (já incorporado)
+                        corrompido = True
+                        continue
+                    self._apply(data['clients'], record)
+                    entries += 1
+
+        if corrompido:
+            # compactar para que novos registros não sejam anexados a uma linha quebrada
+            # nem a registros de outra geração
+            self._write_snapshot(data)
+            return data
+
+        self._data = data
+        self._journal_entries = entries
+        self._signature = signature
+        return data
+
+    @staticmethod
+    def _apply(clients: List[Dict[str, Any]], record: Dict[str, Any]):
+        op = record.get('op')
+        if op == 'create':
+            clients.append(record['client'])
+        elif op == 'update':
+            index = record['index']
+            if 0 <= index < len(clients):
+                clients[index] = record['client']
+        elif op == 'update_many':
+            # lote gravado em uma única linha: aplicado inteiro ou (linha quebrada) não aplicado
+            for index, client in record['clients'].items():
+                index = int(index)
+                if 0 <= index < len(clients):
+                    clients[index] = client
+        elif op == 'delete':
+            index = record['index']
+            if 0 <= index < len(clients):
+                clients.pop(index)
+
+    def _append(self, record: Dict[str, Any]):
+        record['gen'] = self._generation
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            if self.durability != DURABILITY_NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        self._apply(self._data['clients'], copy.deepcopy(record))
+        self._journal_entries += 1
+        self._signature = self._current_signature()
+        if self._journal_entries >= self.compact_threshold:
+            self.compact()
+
+    def _check_index(self, index: int):
+        if index < 0 or index >= len(self._load()['clients']):
+            raise IndexError('Client index out of range')
 
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def compact(self):
+        """Grava o estado atual no snapshot e descarta o journal"""
+        with self._lock:
+            self._write_snapshot(self._load())
 
+    def load_all(self) -> Dict[str, Any]:
+        with self._lock:
+            return copy.deepcopy(self._load())
+
+    def save_all(self, data: Dict[str, Any]):
+        with self._lock:
+            self._ensure_storage()
+            data = copy.deepcopy(data)
+            data.setdefault('clients', [])
+            self._write_snapshot(data)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._load()['clients'])
+
+    def create(self, name: Optional[str] = None) -> Dict[str, Any]:
+        client = new_client(name)
+        self.append(client)
+        return client
+
+    def append(self, client_data: Dict[str, Any]):
+        """Adiciona um cliente já montado ao final da lista"""
+        with self._lock:
+            self._load()
+            self._append({'op': 'create', 'client': client_data})
+
+    def update(self, index: int, client_data: Dict[str, Any]):
+        with self._lock:
+            self._check_index(index)
+            self._append({'op': 'update', 'index': index, 'client': client_data})
+
+    def update_many(self, updates: Dict[int, Dict[str, Any]]):
+        """Atualiza vários clientes em um único registro do journal (tudo ou nada)"""
+        if not updates:
+            return
+        with self._lock:
+            for index in updates:
+                self._check_index(index)
+            self._append({'op': 'update_many', 'clients': {str(i): c for i, c in updates.items()}})
+
+    def get(self, index: int) -> Dict[str, Any]:
+        with self._lock:
+            self._check_index(index)
+            return copy.deepcopy(self._data['clients'][index])
+
+    def delete(self, index: int):
+        with self._lock:
+            self._check_index(index)
+            self._append({'op': 'delete', 'index': index})
+
+    def iter_clients(self, bloco: int = 500) -> Iterator[Dict[str, Any]]:
+        """Percorre os clientes em ordem, copiando `bloco` clientes por vez"""
+        inicio = 0
+        while True:
+            with self._lock:
+                clients = copy.deepcopy(self._load()['clients'][inicio:inicio + bloco])
+            if not clients:
+                return
+            yield from clients
+            inicio += len(clients)
+
+
+_store = None
+
+
+def get_store():
+    """Retorna o backend de armazenamento em uso (cria o padrão na primeira chamada).
+
+    CALCULADORA_STORAGE=sqlite usa o banco SQLite em vez do clients.json; na
+    primeira vez o clients.json existente é migrado para o banco.
+    """
+    global _store
+    if _store is None:
+        if os.environ.get('CALCULADORA_STORAGE', 'json').lower() == 'sqlite':
+            from src.utils.sqlite_storage import DB_FILE, SqliteClientStore, migrate_json_to_sqlite
+            if not os.path.exists(DB_FILE) and os.path.exists(CLIENTS_FILE):
+                migrate_json_to_sqlite()
+            _store = SqliteClientStore()
+        else:
+            _store = JournalClientStore()
+    return _store
+
+
+def set_store(store):
+    """Troca o backend de armazenamento usado pelas funções deste módulo"""
+    global _store
+    _store = store
+
+
+@traced()
 def load_all_clients() -> Dict[str, Any]:
-    _ensure_storage()
-    with open(CLIENTS_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return get_store().load_all()
 
 
+@traced()
 def save_all_clients(data: Dict[str, Any]):
-    _ensure_storage()
-    with open(CLIENTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    get_store().save_all(data)
 
 
+@traced()
 def create_client(name: str = None) -> Dict[str, Any]:
-    data = load_all_clients()
-    client = DEFAULT_CLIENT.copy()
-    # Deep copy percentuais and valores_reais
-    client['percentuais'] = DEFAULT_CLIENT['percentuais'].copy()
-    client['valores_reais'] = DEFAULT_CLIENT['valores_reais'].copy()
-    client['name'] = name or DEFAULT_CLIENT['name']
-    data['clients'].append(client)
-    save_all_clients(data)
-    return client
+    return get_store().create(name)
 
 
+@traced()
+def append_client(client_data: Dict[str, Any]):
+    get_store().append(client_data)
+
+
+@traced()
 def update_client(index: int, client_data: Dict[str, Any]):
-    data = load_all_clients()
-    if index < 0 or index >= len(data['clients']):
-        raise IndexError('Client index out of range')
-    data['clients'][index] = client_data
-    save_all_clients(data)
+    get_store().update(index, client_data)
+
+
+@traced()
+def update_clients(updates: Dict[int, Dict[str, Any]]):
+    """Atualiza vários clientes ({posição: cliente}) em uma única gravação"""
+    get_store().update_many(updates)
 
 
+@traced()
 def get_client(index: int) -> Dict[str, Any]:
-    data = load_all_clients()
-    if index < 0 or index >= len(data['clients']):
-        raise IndexError('Client index out of range')
-    return data['clients'][index]
+    return get_store().get(index)
+
+
+def iter_clients() -> Iterator[Dict[str, Any]]:
+    """Percorre todos os clientes um a um (sem montar a lista inteira)"""
+    return get_store().iter_clients()
+
+
+@traced()
+def delete_client(index: int):
+    get_store().delete(index)
+
+
+@traced()
+def count_clients() -> int:
+    return get_store().count()
+
+
+@traced()
+def compact_clients():
+    get_store().compact()
@@ -0,0 +1,114 @@
+"""
+Resumo esperado vs real de um cliente
+
+Mesma conta usada no relatório PDF e na exportação em massa: valores
+esperados pelo núcleo em centavos (money.dividir_centavos), valores reais do
+cliente, diferença por categoria, totais e lucro. Não depende do reportlab
+nem do PySide6.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from src.utils import money
+
+# Categoria tratada como lucro no resumo
+CATEGORIA_LUCRO = 'Lucro'
+
+
+@dataclass
+class LinhaResumo:
+    """Uma categoria do cliente (valores em centavos)"""
+    categoria: str
+    percentual: float
+    esperado_centavos: int
+    real_centavos: int
+
+    @property
+    def diferenca_centavos(self) -> int:
+        return self.real_centavos - self.esperado_centavos
+
+    @property
+    def esperado(self) -> float:
+        return money.from_cents(self.esperado_centavos)
+
+    @property
+    def real(self) -> float:
+        return money.from_cents(self.real_centavos)
+
+    @property
+    def diferenca(self) -> float:
+        return money.from_cents(self.diferenca_centavos)
+
+
+@dataclass
+class ResumoCliente:
+    valor_total_centavos: int
+    linhas: List[LinhaResumo] = field(default_factory=list)
+    # soma de todos os valores reais do cliente (inclusive categorias fora da tabela)
+    total_real_centavos: int = 0
+    lucro_real_centavos: int = 0
+
+    @property
+    def valor_total(self) -> float:
+        return money.from_cents(self.valor_total_centavos)
+
+    @property
+    def valores_esperados(self) -> Dict[str, float]:
+        return {linha.categoria: linha.esperado for linha in self.linhas}
+
+    @property
+    def total_esperado_centavos(self) -> int:
+        return sum(linha.esperado_centavos for linha in self.linhas)
+
+    @property
+    def total_esperado(self) -> float:
+        return money.from_cents(self.total_esperado_centavos)
+
+    @property
+    def total_real(self) -> float:
+        return money.from_cents(self.total_real_centavos)
+
+    @property
+    def total_diferenca_centavos(self) -> int:
+        return self.total_real_centavos - self.total_esperado_centavos
+
+    @property
+    def total_diferenca(self) -> float:
+        return money.from_cents(self.total_diferenca_centavos)
+
+    @property
+    def lucro_esperado_centavos(self) -> int:
+        for linha in self.linhas:
+            if linha.categoria == CATEGORIA_LUCRO:
+                return linha.esperado_centavos
+        return 0
+
+    @property
+    def lucro_diferenca_centavos(self) -> int:
+        return self.lucro_real_centavos - self.lucro_esperado_centavos
+
+    @property
+    def lucro_esperado(self) -> float:
+        return money.from_cents(self.lucro_esperado_centavos)
+
+    @property
+    def lucro_real(self) -> float:
+        return money.from_cents(self.lucro_real_centavos)
+
+    @property
+    def lucro_diferenca(self) -> float:
+        return money.from_cents(self.lucro_diferenca_centavos)
+
+
+def resumir_cliente(client_data: Dict[str, Any]) -> ResumoCliente:
+    """Resumo de um cliente no formato salvo pelo repositório"""
+    percentuais = client_data.get('percentuais', {})
+    valores_reais = client_data.get('valores_reais', {})
+    valor_total = money.to_cents(client_data.get('valor_total', 0.0))
+    esperados = money.dividir_centavos(valor_total, percentuais)
+    linhas = [LinhaResumo(categoria, percentual, esperados[categoria],
+                          money.to_cents(valores_reais.get(categoria, 0.0)))
+              for categoria, percentual in percentuais.items()]
+    return ResumoCliente(valor_total, linhas,
+                         total_real_centavos=sum(money.to_cents(v) for v in valores_reais.values()),
+                         lucro_real_centavos=money.to_cents(valores_reais.get(CATEGORIA_LUCRO, 0.0)))
@@ -0,0 +1,275 @@
+"""
+Gerador de bases de clientes sintéticas para testes de carga e escala
+
+Gera clientes com o formato do aplicativo: nomes de eventos, conjuntos de
+categorias variados em 'percentuais' (sempre somando exatamente 100%, com o
+Lucro no fim), valor total com distribuição log-normal (muitos eventos
+pequenos, poucos grandes), valores reais em torno do esperado (alguns
+clientes ainda sem custos lançados) e 'historico' com a profundidade pedida.
+
+A geração é determinística: a mesma semente e os mesmos parâmetros produzem
+os mesmos clientes, byte a byte. Os clientes são gerados e gravados um a um,
+então a memória usada não depende da quantidade.
+
+Formatos:
+    json     - clients.json no formato do snapshot do storage
+    journal  - snapshot vazio + clients.journal com um registro 'create' por cliente
+    sqlite   - banco do SqliteClientStore
+
+Uso:
+    python -m src.utils.synthetic --clientes 100000 --saida /tmp/carga/clients.json
+    python -m src.utils.synthetic --clientes 1000000 --categorias 8 --historico 50 --seed 7 --compacto --saida big.json
+    python -m src.utils.synthetic --clientes 50000 --formato sqlite --saida /tmp/carga/clients.db
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils import money
+from src.utils.storage import DEFAULT_CLIENT
+
+FORMATOS = ('json', 'journal', 'sqlite')
+
+CATEGORIA_LUCRO = 'Lucro'
+# as categorias do aplicativo primeiro; as demais aparecem quando --categorias passa de 5
+CATEGORIAS = [c for c in DEFAULT_CLIENT['percentuais'] if c != CATEGORIA_LUCRO] + [
+    'Decoração', 'Buffet', 'Som e Luz', 'Fotografia', 'Segurança', 'Transporte', 'Bebidas', 'Limpeza',
+    'Convites', 'Cerimonial', 'Hospedagem', 'Brindes', 'Gerador', 'Seguro', 'Taxas', 'Marketing',
+]
+
+NOMES = ['João', 'José', 'Maria', 'Ana', 'Antônio', 'Francisca', 'Márcia', 'Luís', 'Conceição', 'Sebastião',
+         'Letícia', 'Cecília', 'Júlia', 'Vinícius', 'Fábio', 'Inês', 'Simão', 'Lúcia', 'Caio', 'Helena']
+SOBRENOMES = ['Silva', 'Souza', 'Conceição', 'Gonçalves', 'Araújo', 'Magalhães', 'Assunção', 'Simões',
+              'Brandão', 'Loureiro', 'Falcão', 'Guimarães', 'Peçanha', 'Sá', 'Monteiro', 'Damião']
+EVENTOS = ['Casamento', 'Aniversário', 'Formatura', 'Batizado', 'Confraternização', 'Bodas', 'Chá de Bebê',
+           'Congresso', 'Festa Corporativa', 'Show']
+
+# valor total: log-normal com mediana VALOR_MEDIANO
+VALOR_MEDIANO = 30000.0
+VALOR_SIGMA = 0.9
+# fração dos clientes ainda sem nenhum valor real lançado
+SEM_CUSTOS = 0.2
+# desvio dos valores reais em relação ao esperado
+DESVIO_REAL = 0.15
+
+# data do histórico mais recente (fixa, para a saída não depender do dia)
+DATA_BASE = datetime(2025, 1, 1)
+
+
+def _percentuais(rng: random.Random, categorias: List[str]) -> Dict[str, float]:
+    """Percentuais aleatórios em centésimos de ponto, somando exatamente 100%"""
+    pesos = [rng.uniform(0.5, 3.0) for _ in categorias]
+    # Lucro entre 10% e 45%, o resto dividido pelas outras categorias
+    lucro = rng.randint(1000, 4500)
+    resto = money.ESCALA_PERCENTUAL - lucro
+    soma = sum(pesos)
+    unidades = [int(resto * p / soma) for p in pesos]
+    unidades[0] += resto - sum(unidades)
+    percentuais = {c: u / 100 for c, u in zip(categorias, unidades)}
+    percentuais[CATEGORIA_LUCRO] = lucro / 100
+    return percentuais
+
+
+def _historico(rng: random.Random, profundidade: int, valor_total: float,
+               reais: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Entradas do mais antigo ao mais recente, terminando no estado atual"""
+    datas = []
+    data = DATA_BASE - timedelta(days=rng.randint(0, 30))
+    for _ in range(profundidade):
+        datas.append(data)
+        data -= timedelta(hours=rng.randint(1, 240))
+    datas.reverse()
+    entradas = []
+    for passo, data in enumerate(datas, start=1):
+        # estados anteriores com os valores reais ainda incompletos
+        fator = passo / profundidade
+        entradas.append({
+            'data': data.isoformat(timespec='seconds'),
+            'tipo': 'calculo' if passo == 1 else 'edicao',
+            'valor_total': valor_total,
+            'valores_reais': {c: round(v * fator, 2) for c, v in reais.items()},
+        })
+    return entradas
+
+
+def gerar_cliente(rng: random.Random, numero: int, categorias: int = 5, historico: int = 0) -> Dict[str, Any]:
+    """Um cliente sintético; `categorias` conta o Lucro"""
+    outras = max(1, min(categorias - 1, len(CATEGORIAS)))
+    # as categorias do aplicativo são as mais comuns; algumas bases trocam parte delas
+    if rng.random() < 0.7:
+        escolhidas = CATEGORIAS[:outras]
+    else:
+        escolhidas = sorted(rng.sample(CATEGORIAS, outras), key=CATEGORIAS.index)
+    percentuais = _percentuais(rng, escolhidas)
+
+    valor_total = round(rng.lognormvariate(math.log(VALOR_MEDIANO), VALOR_SIGMA), 2)
+    esperados = money.dividir(valor_total, percentuais)
+    if rng.random() < SEM_CUSTOS:
+        reais = {c: 0.0 for c in percentuais}
+    else:
+        reais = {c: round(max(0.0, v * rng.gauss(1.0, DESVIO_REAL)), 2) for c, v in esperados.items()}
+
+    client = {
+        'name': f"{rng.choice(EVENTOS)} {rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {numero}",
+        'percentuais': percentuais,
+        'valor_total': valor_total,
+        'valores_reais': reais,
+        'historico': _historico(rng, historico, valor_total, reais) if historico > 0 else [],
+    }
+    return client
+
+
+def iter_clientes(quantidade: int, seed: int = 42, categorias: int = 5, historico: int = 0) -> Iterator[Dict[str, Any]]:
+    """Gera os clientes um a um (mesma semente = mesma sequência)"""
+    rng = random.Random(seed)
+    for numero in range(1, quantidade + 1):
+        yield gerar_cliente(rng, numero, categorias, historico)
+
+
+# ----------------------------------------------------------------------
+# Gravação
+# ----------------------------------------------------------------------
+def _temporario(path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    return os.fdopen(fd, 'w', encoding='utf-8'), tmp_path
+
+
+def _gravar_atomico(path: str, escrever):
+    """escrever(f) grava em um temporário, renomeado sobre `path` ao final"""
+    f, tmp_path = _temporario(path)
+    try:
+        with f:
+            escrever(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json(clients, path: str, indent: Optional[int] = 2) -> int:
+    """Grava clients.json no formato do snapshot (mesmo indent do storage), cliente a cliente"""
+    total = 0
+
+    def escrever(f):
+        nonlocal total
+        if indent is None:
+            f.write('{"clients": [')
+            separador = ', '
+        else:
+            f.write('{\n' + ' ' * indent + '"clients": [')
+            separador = ','
+        prefixo = ' ' * (2 * indent) if indent is not None else ''
+        for client in clients:
+            if total:
+                f.write(separador)
+            texto = json.dumps(client, ensure_ascii=False, indent=indent)
+            if indent is not None:
+                texto = '\n' + prefixo + texto.replace('\n', '\n' + prefixo)
+            f.write(texto)
+            total += 1
+        if indent is None:
+            f.write('], "journal_generation": 1}')
+        else:
+            fim = '\n' + ' ' * indent if total else ''
+            f.write(f'{fim}],\n' + ' ' * indent + '"journal_generation": 1\n}')
+
+    _gravar_atomico(path, escrever)
+    return total
+
+
+def write_journal(clients, path: str) -> int:
+    """Snapshot vazio + um registro 'create' por cliente no journal ao lado (ex: clients.journal)"""
+    journal_path = os.path.splitext(path)[0] + '.journal'
+    total = 0
+
+    def escrever(f):
+        nonlocal total
+        for client in clients:
+            f.write(json.dumps({'op': 'create', 'client': client, 'gen': 1}, ensure_ascii=False) + '\n')
+            total += 1
+
+    _gravar_atomico(journal_path, escrever)
+    write_json([], path)
+    return total
+
+
+def write_sqlite(clients, path: str, bloco: int = 1000) -> int:
+    """Insere os clientes no banco do SqliteClientStore, em transações de `bloco` clientes"""
+    from src.utils.sqlite_storage import SqliteClientStore
+    from src.utils.storage import DURABILITY_NONE
+
+    if os.path.exists(path):
+        raise FileExistsError(f'O banco {path} já existe')
+    store = SqliteClientStore(path, durability=DURABILITY_NONE)
+    total = 0
+    try:
+        lote = []
+        for client in clients:
+            lote.append(client)
+            if len(lote) >= bloco:
+                total += store.append_many(lote)
+                lote = []
+        if lote:
+            total += store.append_many(lote)
+        store.compact()
+    finally:
+        store.close()
+    return total
+
+
+def generate(path: str, quantidade: int, formato: str = 'json', seed: int = 42, categorias: int = 5,
+             historico: int = 0, compacto: bool = False) -> int:
+    """Gera `quantidade` clientes em `path` no formato pedido; retorna quantos foram gravados"""
+    clients = iter_clientes(quantidade, seed, categorias, historico)
+    if formato == 'json':
+        # um journal antigo ao lado seria reaplicado sobre o snapshot novo
+        journal_path = os.path.splitext(path)[0] + '.journal'
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+        return write_json(clients, path, indent=None if compacto else 2)
+    if formato == 'journal':
+        return write_journal(clients, path)
+    if formato == 'sqlite':
+        return write_sqlite(clients, path)
+    raise ValueError(f'Formato desconhecido: {formato}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera uma base de clientes sintética')
+    parser.add_argument('--clientes', type=int, required=True, help='quantidade de clientes')
+    parser.add_argument('--saida', required=True, help='clients.json (json/journal) ou arquivo .db (sqlite)')
+    parser.add_argument('--formato', choices=FORMATOS, default='json')
+    parser.add_argument('--categorias', type=int, default=5, help='categorias por cliente, contando o Lucro')
+    parser.add_argument('--historico', type=int, default=0, help='entradas de histórico por cliente')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--compacto', action='store_true',
+                        help='json sem indentação (bem mais rápido para milhões de clientes; o app lê os dois)')
+    args = parser.parse_args(argv)
+
+    if args.categorias < 2 or args.categorias > len(CATEGORIAS) + 1:
+        parser.error(f'--categorias deve ficar entre 2 e {len(CATEGORIAS) + 1}')
+
+    inicio = time.perf_counter()
+    try:
+        total = generate(args.saida, args.clientes, args.formato, args.seed, args.categorias, args.historico,
+                         args.compacto)
+    except (OSError, ValueError) as e:
+        print(f'Erro: {e}', file=sys.stderr)
+        return 1
+    duracao = time.perf_counter() - inicio
+    print(f'{total} clientes gravados em {args.saida} ({args.formato}) em {duracao:.1f}s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Rastreamento dos caminhos mais usados (spans) com exportação Chrome/Perfetto
+
+Ativado com CALCULADORA_TRACE=1 antes de abrir o aplicativo. Cada span (ex:
+'MainWindow.on_dados_alterados', 'storage.update_client', 'ChartSectionComponent.tight_layout')
+guarda nome, início, duração e thread em um buffer circular com os últimos
+CALCULADORA_TRACE_SPANS spans (padrão 20000); nada é gravado em disco até
+dump_chrome_trace() ser chamado.
+
+Desativado, @traced devolve a própria função (custo zero) e span() devolve um
+contexto vazio compartilhado, então os pontos de medição podem ficar no código.
+
+O arquivo gerado abre em chrome://tracing ou https://ui.perfetto.dev. Com
+CALCULADORA_TRACE_FILE=<arquivo.json> a janela grava o trace ao fechar.
+"""
+import collections
+import contextlib
+import functools
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+ENABLED = os.environ.get('CALCULADORA_TRACE', '').lower() in ('1', 'true', 'sim', 'yes')
+CAPACITY = int(os.environ.get('CALCULADORA_TRACE_SPANS', '20000'))
+TRACE_FILE = os.environ.get('CALCULADORA_TRACE_FILE') or None
+
+# (nome, início_ns, duração_ns, thread_id); deque.append é atômico entre threads
+_spans: collections.deque = collections.deque(maxlen=CAPACITY)
+_threads: Dict[int, str] = {}
+_ORIGEM_NS = time.perf_counter_ns()
+_NULO = contextlib.nullcontext()
+
+
+def _registrar(nome: str, inicio: int, fim: int):
+    thread = threading.current_thread()
+    if thread.ident not in _threads:
+        _threads[thread.ident] = thread.name
+    _spans.append((nome, inicio, fim - inicio, thread.ident))
+
+
+@contextlib.contextmanager
+def _span(nome: str):
+    inicio = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _registrar(nome, inicio, time.perf_counter_ns())
+
+
+def span(nome: str):
+    """with span('ChartSectionComponent.tight_layout'): ... (contexto vazio quando desativado)"""
+    return _span(nome) if ENABLED else _NULO
+
+
+def traced(nome: Optional[str] = None):
+    """Decorador: mede cada chamada como um span (padrão: Classe.metodo ou modulo.funcao)"""
+    def decorar(func):
+        if not ENABLED:
+            return func
+        nome_span = nome or func.__qualname__
+        if '.' not in nome_span:
+            nome_span = f"{func.__module__.rsplit('.', 1)[-1]}.{nome_span}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            inicio = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _registrar(nome_span, inicio, time.perf_counter_ns())
+        return wrapper
+    return decorar
+
+
+def clear():
+    _spans.clear()
+
+
+def spans() -> List[tuple]:
+    """Cópia do buffer: [(nome, início_ns, duração_ns, thread_id)]"""
+    return list(_spans)
+
+
+def _percentil(ordenados: List[int], p: float) -> int:
+    return ordenados[max(0, math.ceil(len(ordenados) * p) - 1)]
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """Por nome de span: quantidade, p50/p95/p99, máximo e total em ms (spans no buffer)"""
+    duracoes: Dict[str, List[int]] = {}
+    for nome, _, duracao, _ in spans():
+        duracoes.setdefault(nome, []).append(duracao)
+    resultado = {}
+    for nome, valores in duracoes.items():
+        valores.sort()
+        resultado[nome] = {
+            'n': len(valores),
+            'p50_ms': _percentil(valores, 0.50) / 1e6,
+            'p95_ms': _percentil(valores, 0.95) / 1e6,
+            'p99_ms': _percentil(valores, 0.99) / 1e6,
+            'max_ms': valores[-1] / 1e6,
+            'total_ms': sum(valores) / 1e6,
+        }
+    return resultado
+
+
+def chrome_trace() -> Dict[str, Any]:
+    """Spans no formato Trace Event ('X' = evento completo, tempos em µs)"""
+    pid = os.getpid()
+    eventos = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': nome}}
+               for tid, nome in list(_threads.items())]
+    for nome, inicio, duracao, tid in spans():
+        eventos.append({
+            'name': nome,
+            'cat': nome.split('.', 1)[0],
+            'ph': 'X',
+            'ts': (inicio - _ORIGEM_NS) / 1000,
+            'dur': duracao / 1000,
+            'pid': pid,
+            'tid': tid,
+        })
+    return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+
+def dump_chrome_trace(path: str) -> int:
+    """Grava o buffer como JSON do Chrome/Perfetto; retorna quantos spans foram gravados"""
+    dados = chrome_trace()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False)
+    return sum(1 for e in dados['traceEvents'] if e['ph'] == 'X')
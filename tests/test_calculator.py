@@ -0,0 +1,38 @@
+"""
+Testes da validação de percentuais e da divisão da CalculadoraCustos
+"""
+import pytest
+
+from src.utils.calculator import CalculadoraCustos
+from src.utils.constants import PERCENTUAIS
+
+
+def test_tabela_padrao():
+    valores = CalculadoraCustos(PERCENTUAIS).calcular(1000.0)
+    assert valores == {'Staff': 120.0, 'Locação': 90.0, 'CMV': 300.0, 'Nota': 120.0, 'Lucro': 370.0}
+
+
+def test_soma_exata_com_duas_casas():
+    valores = CalculadoraCustos({'A': 33.33, 'B': 33.33, 'C': 33.34}).calcular(100.0)
+    assert sum(valores.values()) == pytest.approx(100.0)
+
+
+def test_mais_de_duas_casas_rejeitado_com_mensagem_clara():
+    # soma exatamente 100, mas a divisão em centésimos de ponto arredondaria cada um
+    with pytest.raises(ValueError, match='2 casas decimais'):
+        CalculadoraCustos({'A': 33.333, 'B': 33.333, 'C': 33.334})
+
+
+@pytest.mark.parametrize('percentuais', [
+    {'A': 50.0, 'B': 49.99},
+    {'A': 50.0, 'B': 50.01},
+    {'A': 0.1, 'B': 0.2, 'C': 99.69},
+])
+def test_soma_diferente_de_100_rejeitada(percentuais):
+    with pytest.raises(ValueError, match='soma'):
+        CalculadoraCustos(percentuais)
+
+
+def test_soma_com_floats_imprecisos_aceita():
+    # 0.1 + 0.2 + 99.7 != 100 em float, mas os valores escritos somam 100
+    CalculadoraCustos({'A': 0.1, 'B': 0.2, 'C': 99.7})
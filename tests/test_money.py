@@ -0,0 +1,91 @@
+"""
+Testes do núcleo de valores monetários (src/utils/money.py)
+
+    python -m pytest -q
+"""
+import pytest
+
+from src.utils import money
+
+
+@pytest.mark.parametrize('texto, centavos', [
+    ('1.234,56', 123456),
+    ('1,234.56', 123456),
+    ('R$ 1.234.567,89', 123456789),
+    ('1,234,567', 123456700),
+    ('1234.5', 123450),
+    ('12,3', 1230),
+    ('500', 50000),
+    ('R$ 0,5', 50),
+])
+def test_parse_cents_separadores(texto, centavos):
+    assert money.parse_cents(texto) == centavos
+
+
+@pytest.mark.parametrize('texto', ['R$ -500,00', '-500,00', '500,00-', '(500,00)', 'R$ (500,00)', '- R$ 500,00'])
+def test_parse_cents_negativos(texto):
+    assert money.parse_cents(texto) == -50000
+
+
+@pytest.mark.parametrize('texto', ['1.234', '1,234', 'R$ -1.234'])
+def test_parse_cents_ambiguo(texto):
+    with pytest.raises(ValueError):
+        money.parse_cents(texto)
+
+
+def test_parse_cents_separador_informado():
+    assert money.parse_cents('1.234', decimal=',') == 123400
+    assert money.parse_cents('1,234', decimal=',') == 123
+    assert money.parse_cents('1.234', decimal='.') == 123
+
+
+@pytest.mark.parametrize('texto', ['', 'R$', 'abc', ',.'])
+def test_parse_cents_invalido(texto):
+    with pytest.raises(ValueError):
+        money.parse_cents(texto)
+
+
+@pytest.mark.parametrize('valor, centavos', [
+    (0.125, 13),
+    (-0.125, -13),
+    (1.005, 101),
+    (2.675, 268),
+    (0.115, 12),
+    (1234.56, 123456),
+    (10, 1000),
+])
+def test_to_cents_meio_centavo_para_cima(valor, centavos):
+    assert money.to_cents(valor) == centavos
+
+
+def test_arredondamento_igual_ao_parse_cents():
+    for texto in ('0.125', '1.005', '2.675', '0.115', '12.345'):
+        assert money.to_cents(float(texto)) == money.parse_cents(texto, decimal='.')
+
+
+def test_to_cents_lote_igual_ao_escalar():
+    valores = [0.125, -0.125, 1.005, 2.675, 0.115, 1234.56, 0.0, 99999.995]
+    assert money.to_cents_lote(valores).tolist() == [money.to_cents(v) for v in valores]
+
+
+def test_percent_to_units():
+    assert money.percent_to_units(12.5) == 1250
+    assert money.percent_to_units(33.335) == 3334
+
+
+def test_dividir_valida_a_tabela():
+    # ex: clients.json editado à mão; antes era arredondado sem aviso
+    with pytest.raises(ValueError, match='2 casas decimais'):
+        money.dividir(100.0, {'A': 33.333, 'B': 33.333, 'C': 33.334})
+    with pytest.raises(ValueError, match='soma'):
+        money.dividir_centavos(10000, {'A': 50.0, 'B': 49.0})
+    with pytest.raises(ValueError, match='inválido'):
+        money.dividir_lote_centavos([10000], {'A': float('nan'), 'B': 100.0})
+
+
+def test_dividir_tabela_vazia():
+    assert money.dividir(100.0, {}) == {}
+
+
+def test_validar_percentuais_unidades():
+    assert money.validar_percentuais({'A': 33.33, 'B': 33.33, 'C': 33.34}) == [3333, 3333, 3334]
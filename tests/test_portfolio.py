@@ -0,0 +1,69 @@
+"""
+Testes dos agregados incrementais da carteira: o resultado por delta tem de
+ser igual ao recálculo completo
+"""
+import copy
+import dataclasses
+import random
+
+from src.utils.portfolio import PortfolioAggregates
+from src.utils.storage import new_client
+
+
+def _cliente(rng, n):
+    client = new_client(f'Cliente {n}')
+    client['valor_total'] = round(rng.uniform(0, 50000), 2)
+    for categoria in client['valores_reais']:
+        client['valores_reais'][categoria] = round(rng.uniform(0, 15000), 2)
+    if rng.random() < 0.2:
+        client['percentuais'] = {'Staff': 20.0, 'Extra': 30.5, 'Lucro': 49.5}
+        client['valores_reais'] = {'Extra': round(rng.uniform(0, 5000), 2)}
+    if rng.random() < 0.05:
+        client['percentuais'] = {'Staff': 50.0, 'Lucro': 40.0}  # tabela inválida
+    return client
+
+
+def _comparavel(snapshot):
+    """Snapshot sem o que depende da instância: tokens do ranking e ordem das categorias"""
+    return (dataclasses.replace(snapshot, categorias=[], maiores_estouros=[]),
+            sorted((c.categoria, c.esperado, c.real) for c in snapshot.categorias),
+            [(e.name, e.estouro) for e in snapshot.maiores_estouros])
+
+
+def test_delta_igual_ao_recalculo():
+    rng = random.Random(7)
+    clients = [_cliente(rng, n) for n in range(50)]
+    incremental = PortfolioAggregates(copy.deepcopy(clients))
+
+    for n in range(500):
+        acao = rng.random()
+        if acao < 0.3 or not clients:
+            client = _cliente(rng, 1000 + n)
+            clients.append(client)
+            incremental.client_created(len(clients) - 1, copy.deepcopy(client))
+        elif acao < 0.5:
+            index = rng.randrange(len(clients))
+            clients.pop(index)
+            incremental.client_deleted(index)
+        else:
+            index = rng.randrange(len(clients))
+            clients[index] = _cliente(rng, 2000 + n)
+            incremental.client_updated(index, copy.deepcopy(clients[index]))
+
+        if n % 50 == 49:
+            assert _comparavel(incremental.snapshot()) == _comparavel(PortfolioAggregates(clients).snapshot())
+
+
+def test_posicao_do_ranking_acompanha_exclusoes():
+    clients = [new_client(nome) for nome in ('A', 'B', 'C')]
+    for client in clients:
+        client['valor_total'] = 1000.0
+    clients[2]['valores_reais']['CMV'] = 900.0
+    aggregates = PortfolioAggregates(clients)
+    token = aggregates.top_estouros(1)[0].token
+
+    aggregates.client_deleted(0)
+    assert aggregates.posicao(token) == 1
+    aggregates.client_deleted(1)
+    assert aggregates.posicao(token) == -1
+    assert aggregates.snapshot().clientes == 1
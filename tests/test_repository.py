@@ -0,0 +1,154 @@
+"""
+Testes das falhas de gravação no ClientRepository e no PersistenceWorker
+"""
+import threading
+
+import pytest
+
+from src.utils import storage
+from src.utils.repository import ClientRepository
+from src.utils.storage import DURABILITY_NONE, JournalClientStore
+
+
+class FalhaNaGravacao(Exception):
+    pass
+
+
+class StoreInstavel(JournalClientStore):
+    """Falha nas próximas `falhas[op]` chamadas de cada operação"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.falhas = {}
+
+    def _talvez_falhar(self, op):
+        if self.falhas.get(op):
+            self.falhas[op] -= 1
+            raise FalhaNaGravacao(op)
+
+    def append(self, client_data):
+        self._talvez_falhar('append')
+        super().append(client_data)
+
+    def update(self, index, client_data):
+        self._talvez_falhar('update')
+        super().update(index, client_data)
+
+    def delete(self, index):
+        self._talvez_falhar('delete')
+        super().delete(index)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = StoreInstavel(str(tmp_path / 'clients.json'), str(tmp_path / 'clients.journal'),
+                          durability=DURABILITY_NONE)
+    monkeypatch.setattr(storage, '_store', store)
+    for nome in ('A', 'B', 'C'):
+        store.create(nome)
+    return store
+
+
+def _nomes(clients):
+    return [c['name'] for c in clients]
+
+
+def test_flush_com_falha_mantem_pendentes(store):
+    repo = ClientRepository()
+    repo.rename(0, 'A2')
+    repo.rename(2, 'C2')
+    store.falhas['update'] = 1
+
+    with pytest.raises(FalhaNaGravacao):
+        repo.flush()
+    assert repo.has_pending()
+    assert _nomes(store.load_all()['clients']) == ['A', 'B', 'C']
+
+    assert repo.flush() == 2
+    assert not repo.has_pending()
+    assert _nomes(store.load_all()['clients']) == ['A2', 'B', 'C2']
+
+
+def test_retry_failed_procura_o_cliente_pelo_dict(store):
+    repo = ClientRepository()
+    cliente = repo.get(2)
+    repo.delete(0)
+
+    repo.retry_failed(cliente)
+    assert repo.flush() == 1
+    repo.retry_failed({'name': 'C'})  # cópia (ou cliente excluído): nada a regravar
+    assert not repo.has_pending()
+
+
+# ----------------------------------------------------------------------
+# PersistenceWorker (precisa do PySide6)
+# ----------------------------------------------------------------------
+@pytest.fixture
+def persistence(monkeypatch):
+    persistence = pytest.importorskip('src.utils.persistence')
+    monkeypatch.setattr(persistence, 'RETRY_MS', 10)
+    return persistence
+
+
+def _coletar_falhas(worker):
+    """Mensagens de save_failed, recebidas na própria thread do worker"""
+    from PySide6.QtCore import Qt
+    falhas = []
+    worker.save_failed.connect(falhas.append, Qt.DirectConnection)
+    return falhas
+
+
+def test_worker_repete_exclusao_que_falhou(store, persistence):
+    from PySide6.QtCore import Qt
+    worker = persistence.PersistenceWorker()
+    repo = ClientRepository(writer=worker)
+    falhas = _coletar_falhas(worker)
+    falhou = threading.Event()
+    worker.save_failed.connect(lambda _: falhou.set(), Qt.DirectConnection)
+    store.falhas['delete'] = 1
+
+    worker.start()
+    repo.delete(0)
+    assert falhou.wait(5)
+    repo.rename(0, 'B2')  # posição válida só depois da exclusão
+    repo.flush()
+    worker.stop()
+
+    assert falhas == ['delete: delete']
+    assert _nomes(store.load_all()['clients']) == _nomes(repo.all()) == ['B2', 'C']
+
+
+def test_worker_descarta_o_resto_da_fila_ao_parar(store, persistence):
+    worker = persistence.PersistenceWorker()
+    repo = ClientRepository(writer=worker)
+    falhas = _coletar_falhas(worker)
+    store.falhas['append'] = 1
+
+    repo.create('D')
+    repo.rename(3, 'D2')
+    repo.flush()
+    # fila executada uma única vez, na thread do teste, como ao fechar a janela
+    worker.stop()
+    worker.run()
+
+    assert falhas == ['create: append', '2 alterações não gravadas']
+    assert _nomes(store.load_all()['clients']) == ['A', 'B', 'C']
+
+
+def test_worker_reporta_atualizacao_que_falhou(store, persistence):
+    from PySide6.QtCore import Qt
+    worker = persistence.PersistenceWorker()
+    repo = ClientRepository(writer=worker)
+    worker.update_failed.connect(repo.retry_failed, Qt.DirectConnection)
+    store.falhas['update'] = 1
+
+    repo.rename(1, 'B2')
+    repo.delete(2)  # a exclusão seguinte ainda é gravada
+    worker.stop()
+    worker.run()
+
+    assert repo.has_pending()
+    assert _nomes(store.load_all()['clients']) == ['A', 'B']
+    repo.flush()
+    worker.run()
+    assert _nomes(store.load_all()['clients']) == ['A', 'B2']
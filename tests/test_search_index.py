@@ -0,0 +1,72 @@
+"""
+Testes do índice de busca de clientes: atualizações incrementais têm de dar
+o mesmo resultado que reconstruir o índice
+"""
+import random
+
+from src.utils.search_index import ClientSearchIndex
+from src.utils.storage import new_client
+
+
+def _clientes(*nomes):
+    return [new_client(nome) for nome in nomes]
+
+
+def test_busca_sem_acentos_e_por_prefixo():
+    index = ClientSearchIndex(_clientes('João da Silva', 'Maria Souza', 'joana'))
+    assert index.search('jo sil') == [0]
+    assert index.search('JOA') == [0, 2]
+    assert index.search('') is None
+
+
+def test_add_update_remove():
+    clients = _clientes('Ana', 'Bruno', 'Carla')
+    index = ClientSearchIndex(clients)
+
+    index.add(new_client('Anabela'))
+    assert index.search('ana') == [0, 3]
+    index.update(1, new_client('Ana Bruna'))
+    assert index.search('ana') == [0, 1, 3]
+    index.remove(0)
+    assert index.search('ana') == [0, 2]
+    assert index.search('carla') == [1]
+    index.remove(1)
+    assert index.search('carla') == []
+    assert len(index) == 2
+
+
+def test_categoria_propria_indexada():
+    client = new_client('Festa')
+    client['percentuais'] = {'Decoração': 40.0, 'Lucro': 60.0}
+    index = ClientSearchIndex([client])
+    assert index.search('decor') == [0]
+    assert index.search('lucro') == []
+
+
+def test_incremental_igual_a_reconstruir():
+    rng = random.Random(3)
+    palavras = ['ana', 'anabela', 'bruno', 'carla', 'casa', 'casamento', 'festa', 'joão']
+
+    def novo():
+        return new_client(' '.join(rng.sample(palavras, 2)))
+
+    clients = [novo() for _ in range(30)]
+    index = ClientSearchIndex(clients)
+    buscas = ['a', 'an', 'ana', 'ana b', 'cas', 'casam', 'jo', 'festa casa']
+
+    for _ in range(300):
+        acao = rng.random()
+        if acao < 0.3:
+            clients.append(novo())
+            index.add(clients[-1])
+        elif acao < 0.5 and clients:
+            posicao = rng.randrange(len(clients))
+            clients.pop(posicao)
+            index.remove(posicao)
+        elif clients:
+            posicao = rng.randrange(len(clients))
+            clients[posicao] = novo()
+            index.update(posicao, clients[posicao])
+        # buscas em sequência, como quem digita, reaproveitando o resultado anterior
+        for texto in buscas:
+            assert index.search(texto) == ClientSearchIndex(clients).search(texto)
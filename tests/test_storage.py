@@ -0,0 +1,98 @@
+"""
+Testes da recuperação do journal (JournalClientStore) e do mapeamento
+posição -> id do SqliteClientStore
+"""
+import os
+import shutil
+
+import pytest
+
+from src.utils.sqlite_storage import SqliteClientStore
+from src.utils.storage import DURABILITY_NONE, JournalClientStore
+
+
+def _journal_store(tmp_path, **kwargs):
+    return JournalClientStore(str(tmp_path / 'clients.json'), str(tmp_path / 'clients.journal'),
+                              durability=DURABILITY_NONE, **kwargs)
+
+
+def _nomes(store):
+    return [c['name'] for c in store.load_all()['clients']]
+
+
+def test_journal_reaplicado_ao_reabrir(tmp_path):
+    store = _journal_store(tmp_path)
+    for nome in ('A', 'B', 'C'):
+        store.create(nome)
+    store.update(1, dict(store.get(1), name='B2'))
+    store.delete(0)
+
+    assert os.path.exists(tmp_path / 'clients.journal')
+    assert _nomes(_journal_store(tmp_path)) == ['B2', 'C']
+
+
+def test_compactacao_ao_atingir_o_limite(tmp_path):
+    store = _journal_store(tmp_path, compact_threshold=3)
+    for nome in ('A', 'B', 'C'):
+        store.create(nome)
+
+    assert not os.path.exists(tmp_path / 'clients.journal')
+    assert _nomes(_journal_store(tmp_path)) == ['A', 'B', 'C']
+
+
+def test_journal_de_geracao_anterior_ignorado(tmp_path):
+    # crash entre gravar o snapshot compactado e apagar o journal
+    store = _journal_store(tmp_path)
+    store.create('A')
+    store.create('B')
+    shutil.copy(tmp_path / 'clients.journal', tmp_path / 'antigo.journal')
+    store.compact()
+    shutil.copy(tmp_path / 'antigo.journal', tmp_path / 'clients.journal')
+
+    reaberto = _journal_store(tmp_path)
+    assert _nomes(reaberto) == ['A', 'B']
+    # o journal velho é descartado na carga, e os novos registros valem
+    assert not os.path.exists(tmp_path / 'clients.journal')
+    reaberto.create('C')
+    assert _nomes(_journal_store(tmp_path)) == ['A', 'B', 'C']
+
+
+def test_ultima_linha_corrompida(tmp_path):
+    # processo morto no meio da escrita de um registro
+    store = _journal_store(tmp_path)
+    store.create('A')
+    store.create('B')
+    with open(tmp_path / 'clients.journal', 'a', encoding='utf-8') as f:
+        f.write('{"op": "create", "client": {"name": "C"')
+
+    reaberto = _journal_store(tmp_path)
+    assert _nomes(reaberto) == ['A', 'B']
+    reaberto.create('D')
+    assert _nomes(_journal_store(tmp_path)) == ['A', 'B', 'D']
+
+
+def test_sqlite_posicoes_apos_exclusao(tmp_path):
+    store = SqliteClientStore(str(tmp_path / 'clients.db'))
+    try:
+        for nome in ('A', 'B', 'C', 'D'):
+            store.create(nome)
+        id_c = store.id_at(2)
+        store.delete(1)
+
+        assert store.id_at(1) == id_c
+        store.update(1, dict(store.get(1), name='C2'))
+        assert store.get_by_id(id_c)['name'] == 'C2'
+        store.delete_by_id(store.id_at(0))
+        assert _nomes(store) == ['C2', 'D']
+        assert all('id' not in c for c in store.load_all()['clients'])
+        with pytest.raises(IndexError):
+            store.get(2)
+    finally:
+        store.close()
+
+    reaberto = SqliteClientStore(str(tmp_path / 'clients.db'))
+    try:
+        assert _nomes(reaberto) == ['C2', 'D']
+        assert reaberto.id_at(0) == id_c
+    finally:
+        reaberto.close()